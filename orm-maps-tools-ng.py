@@ -1,11 +1,3388 @@
 import os
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
-import glob
+import sys
+from PIL import Image, ImageOps
+from PIL.PngImagePlugin import PngInfo
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from collections import namedtuple
+from contextlib import contextmanager
+from array import array
 import threading
+import queue
+import multiprocessing
 import json
 import csv
+import re
+import sqlite3
+import hashlib
+import argparse
+import time
+import struct
+import zlib
+import io
+import math
+import tempfile
+
+# tkinter wird erst von import_gui_modules() geladen, damit der Batch-Modus ohne Display läuft
+tk = filedialog = messagebox = ttk = ImageTk = None
+
+# Parallele Verzeichnis-Scans (os.scandir gibt den GIL während der Systemaufrufe frei)
+SCAN_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Standardwerte aller Einstellungen - die Namen entsprechen den Tk-Variablen der GUI
+SETTING_DEFAULTS = {
+    "use_height_for_ao": True,
+    "overwrite_existing": False,
+    "resume_batch": False,  # abgebrochenen Lauf anhand des Journals fortsetzen
+    "fill_missing_maps": False,
+    "recursive_search": True,
+    "invert_gloss": True,
+    "preferred_resolution": "auto",
+    "target_resolution": "original",
+    "output_format": "PNG",
+    "compression_quality": 95,
+    "encoder_profile": "balanced",  # fast, balanced oder smallest (siehe ENCODER_PROFILES)
+    "orm_workers": os.cpu_count() or 1,  # Worker-Prozesse für die ORM-Erzeugung
+    "orm_memory_budget": 4096,  # MB für alle Worker zusammen; größere Maps werden in Streifen gepackt (0 = aus)
+    "packing_engine": "Pillow",  # Pillow oder NumPy (vorab angelegter Puffer, siehe Befehl benchmark)
+    "packing_layouts": "ORM",  # kommagetrennt, z.B. ORM,ARM,MaskMap,MRAO (siehe PACKING_LAYOUTS)
+    "default_ao_value": 255,
+    "default_roughness_value": 128,
+    "default_metallic_value": 0,
+    "gltf_double_sided": False,
+    "gltf_alpha_mode": "OPAQUE",
+    "gltf_emission_strength": 1.0,
+    "gltf_metallic_factor": 1.0,
+    "gltf_roughness_factor": 1.0,
+    "fold_uniform_maps": True,  # einfarbige ORM als 4×4-Textur bzw. glTF-Faktoren
+    "material_preset": "Standard",
+    "export_log": False,
+    "log_format": "CSV",
+    "validate_resolution": True,
+    "warn_unusual_values": True,
+}
+
+# Auswahllisten der Einstellungen (Comboboxen der GUI und Kommandozeilen-Optionen)
+SETTING_CHOICES = {
+    "preferred_resolution": ["auto", "128", "256", "512", "1024", "2048"],
+    "target_resolution": ["original", "128", "256", "512", "1024", "2048"],
+    "output_format": ["PNG", "JPEG", "JP2"],
+    "encoder_profile": ["fast", "balanced", "smallest"],
+    "gltf_alpha_mode": ["OPAQUE", "MASK", "BLEND"],
+    "material_preset": ["Standard", "Metall", "Holz", "Stein", "Glas", "Stoff"],
+    "log_format": ["CSV", "JSON", "TXT"],
+    "packing_engine": ["Pillow", "NumPy"],
+}
+
+# Standardwerte für fehlende Maps je Material-Preset
+MATERIAL_PRESETS = {
+    "Standard": {"ao": 255, "roughness": 128, "metallic": 0},
+    "Metall": {"ao": 255, "roughness": 30, "metallic": 255},
+    "Holz": {"ao": 200, "roughness": 180, "metallic": 0},
+    "Stein": {"ao": 220, "roughness": 200, "metallic": 0},
+    "Glas": {"ao": 255, "roughness": 10, "metallic": 0},
+    "Stoff": {"ao": 230, "roughness": 220, "metallic": 0}
+}
+
+# Reihenfolge der Map-Typen eines Materials
+MAP_TYPES = ("albedo", "normal", "ao", "roughness", "metallic", "height", "emission")
+MAP_INDEX = {map_type: i for i, map_type in enumerate(MAP_TYPES)}
+
+# Packing-Layouts (ergänzbar in texture_suffixes.json unter "packing_layouts").
+# Kanal: Map-Name, {"source": Map-Name, "invert": true} oder fester Wert 0-255
+PACKING_LAYOUTS = {
+    "ORM": {"suffix": "ORM", "channels": ["ao", "roughness", "metallic"]},  # OpenSim / glTF
+    "ARM": {"suffix": "ARM", "channels": ["ao", "roughness", "metallic"]},  # Unreal
+    "MaskMap": {"suffix": "MaskMap",  # Unity HDRP: Metallic, AO, Detail-Maske, Smoothness
+                "channels": ["metallic", "ao", 0, {"source": "roughness", "invert": True}]},
+    "MRAO": {"suffix": "MRAO", "channels": ["metallic", "roughness", "ao"]},
+}
+LAYOUT_SOURCES = ("ao", "roughness", "metallic")
+
+# Transformationsketten je Map-Typ vor dem Packen (texture_suffixes.json unter "channel_transforms").
+# Schritte: {"invert": true}, {"levels": [ein_min, ein_max, aus_min, aus_max]}, {"gamma": g},
+# {"clamp": [min, max]}, {"curve": [[x, y], ...]} (Werte 0-255, Kurve stückweise linear)
+CHANNEL_TRANSFORM_STEPS = ("invert", "levels", "gamma", "clamp", "curve")
+INVERT_LUT = tuple(255 - i for i in range(256))
+
+# Suffixe, deren Bedeutung je nach Quelle unterschiedlich ist
+SUFFIX_HINTS = {
+    "refl": "Reflection-Maps sind je nach Quelle Specular/Gloss statt Roughness",
+    "specular": "Specular stammt aus dem Spec/Gloss-Workflow und ist kein echtes Metallic",
+    "bump": "Bump-Maps können Height- oder Normal-Daten enthalten",
+}
+
+TextureName = namedtuple("TextureName", "filename base map_type resolution variant suffix rank")
+
+class SuffixMatcher:
+    """Kompiliert die Suffix-Konfiguration zu einem einzigen verankerten Regex.
+    
+    parse() zerlegt einen Dateinamen in einem Schritt in Basisname, Map-Typ,
+    Auflösung und Variante (z.B. -ogl oder Nummern bei Normal-Maps). Der Rang
+    entspricht der Suchreihenfolge aus der JSON (Suffix, Trennzeichen, Endung,
+    Auflösung) - kleinere Werte werden bevorzugt.
+    """
+    
+    CONFIG_KEYS = ("suffixes", "extensions", "separators", "resolutions")  # bestimmen das Parsen
+    
+    def __init__(self, config):
+        suffixes = config.get("suffixes", {})
+        extensions = config.get("extensions", ["png", "jpg", "jpeg", "jp2"])
+        separators = config.get("separators", ["_", "-"])
+        resolutions = config.get("resolutions", ["128", "256", "512", "1024", "2048"])
+        
+        self._suffixes = {}  # casefold -> (map_type, index)
+        self._separators = self._ordered(separators)
+        self._extensions = self._ordered(extensions)
+        self._resolutions = self._ordered(resolutions)
+        for map_type, names in suffixes.items():
+            for name in names:
+                self._suffixes.setdefault(name.casefold(), (map_type, len(self._suffixes)))
+        
+        self.ambiguities = self._find_ambiguities(suffixes, resolutions)
+        
+        def alternation(values):
+            return "|".join(re.escape(v) for v in sorted(values, key=len, reverse=True))
+        
+        self.regex = re.compile(
+            rf"^(?P<base>.+?)(?P<sep>{alternation(self._separators)})"
+            rf"(?P<suffix>{alternation(self._suffixes)})"
+            r"(?P<variant>[-_][a-z0-9]*-ogl|-ogl|[-_](?:gl|dx)|[0-9])?"
+            rf"(?:_(?P<res>{alternation(self._resolutions)}|[1-9][0-9]?k))?"
+            rf"\.(?P<ext>{alternation(self._extensions)})$",
+            re.IGNORECASE,
+        )
+        self._res_in_separator = re.compile(r"([1-9][0-9]?)k", re.IGNORECASE)
+    
+    @staticmethod
+    def _ordered(values):
+        """Case-folded, ohne Duplikate, Reihenfolge bleibt erhalten -> {wert: index}"""
+        ordered = {}
+        for value in values:
+            ordered.setdefault(value.casefold(), len(ordered))
+        return ordered
+    
+    @staticmethod
+    def _find_ambiguities(suffixes, resolutions):
+        """Ermittelt Suffixe, die sich gegenseitig überdecken oder mehrdeutig sind"""
+        owners = {}
+        for map_type, names in suffixes.items():
+            for name in names:
+                owners.setdefault(name.casefold(), set()).add(map_type)
+        
+        messages = []
+        for suffix, types in sorted(owners.items()):
+            if len(types) > 1:
+                messages.append(f"'{suffix}' ist mehreren Map-Typen zugeordnet: {', '.join(sorted(types))}")
+            longer = sorted(other for other in owners if other != suffix and other.startswith(suffix))
+            if longer:
+                messages.append(f"'{suffix}' ist Präfix von {', '.join(repr(o) for o in longer)}")
+            if suffix in SUFFIX_HINTS:
+                messages.append(f"'{suffix}' ({', '.join(sorted(types))}): {SUFFIX_HINTS[suffix]}")
+            if suffix in {r.casefold() for r in resolutions}:
+                messages.append(f"'{suffix}' ist gleichzeitig eine Auflösungsangabe")
+        return messages
+    
+    def parse(self, filename):
+        """Zerlegt einen Dateinamen oder gibt None zurück, wenn kein Suffix passt"""
+        match = self.regex.match(filename)
+        if not match:
+            return None
+        suffix = match.group("suffix").casefold()
+        map_type, suffix_rank = self._suffixes[suffix]
+        sep = match.group("sep").casefold()
+        res = match.group("res")
+        if res:
+            res_rank = self._resolutions.get(res.casefold())
+            if res_rank is None:
+                # 1k/2k/4k/8k nach Größe statt nach Verzeichnis-Reihenfolge
+                res_rank = len(self._resolutions) + int(res[:-1])
+            res_rank += 1
+        else:
+            # ambientCG: Auflösung steckt im Trennzeichen (z.B. _1K-JPG_)
+            res_match = self._res_in_separator.search(sep)
+            res = res_match.group(0) if res_match else None
+            res_rank = 0
+        variant = match.group("variant")
+        rank = (1 if variant else 0, suffix_rank, self._separators[sep],
+                self._extensions[match.group("ext").casefold()], res_rank)
+        return TextureName(filename, match.group("base"), map_type, res, variant, suffix, rank)
+
+class TextureIndex:
+    """In-Memory-Index eines Textur-Verzeichnisbaums.
+    
+    Der Baum wird mit einem einzigen os.scandir-Durchlauf eingelesen (optional parallel
+    über Unterordner). Jeder Dateiname wird dabei einmal vom SuffixMatcher zerlegt und
+    pro Verzeichnis nach Basisname (case-folded) und Map-Typ abgelegt, damit alle
+    späteren Suchen reine Dict-Zugriffe statt glob/exists-Aufrufen sind. Mit einem
+    ScanCatalog werden nur Verzeichnisse neu gelistet, deren mtime sich geändert hat.
+    """
+    
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.dirs = {}  # Verzeichnis -> {basisname (casefold): {map_type: [TextureName]}}
+        self.file_info = {}  # Pfad -> [größe, mtime_ns, breite, höhe]
+        self._mtimes = {}  # Verzeichnis -> st_mtime_ns beim Einlesen
+        self.probed = []  # (Pfad, Breite, Höhe) nachträglich per Header gelesen, für den Katalog
+        self.refreshed = []  # (Pfad, Größe, mtime_ns) per stat als geändert erkannt, für den Katalog
+        self._lock = threading.Lock()
+    
+    def clear(self):
+        with self._lock:
+            self.dirs.clear()
+            self.file_info.clear()
+            self._mtimes.clear()
+    
+    def _list_dir(self, directory, cached=None):
+        """Liest ein einzelnes Verzeichnis ein.
+        
+        Liefert (materialien, Unterordner, mtime, dateiinfos, neu_gelistet). Stimmt die
+        mtime mit dem Katalog-Eintrag cached überein, wird nicht gelistet.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return {}, [], None, {}, False
+        if cached is not None and cached[0] == mtime:
+            _, subdirs, textures, infos = cached
+            return self._group(textures), subdirs, mtime, infos, False
+        
+        textures = []
+        subdirs = []
+        infos = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Versteckte Dateien/Ordner ignorieren (wie glob)
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.path)
+                            continue
+                        parsed = self.matcher.parse(entry.name)
+                        if parsed:
+                            st = entry.stat()
+                            textures.append(parsed)
+                            infos[entry.name] = [st.st_size, st.st_mtime_ns, 0, 0]
+                    except OSError:
+                        continue
+        except OSError:
+            return {}, [], None, {}, False
+        # Bekannte Abmessungen übernehmen, solange Größe und mtime gleich sind
+        if cached is not None:
+            for name, info in infos.items():
+                old = cached[3].get(name)
+                if old and old[:2] == info[:2]:
+                    info[2:] = old[2:]
+        return self._group(textures), subdirs, mtime, infos, True
+    
+    @staticmethod
+    def _group(textures):
+        materials = {}
+        for parsed in textures:
+            by_type = materials.setdefault(parsed.base.casefold(), {})
+            by_type.setdefault(parsed.map_type, []).append(parsed)
+        for by_type in materials.values():
+            for candidates in by_type.values():
+                candidates.sort(key=lambda t: t.rank)
+        return materials
+    
+    def _store(self, directory, materials, mtime, infos):
+        with self._lock:
+            self.dirs[directory] = materials
+            self._mtimes[directory] = mtime
+            for name, info in infos.items():
+                self.file_info[os.path.join(directory, name)] = info
+    
+    def scan(self, root, recursive=True, workers=SCAN_WORKERS, catalog=None):
+        """Indiziert root (und bei recursive alle Unterordner) mit einem Durchlauf.
+        
+        Gibt die Anzahl der tatsächlich neu gelisteten Verzeichnisse zurück.
+        """
+        root = os.path.normpath(root)
+        cache = catalog.load(root) if catalog else {}
+        changed = []
+        seen = []
+        
+        def handle(directory, result):
+            materials, subdirs, mtime, infos, relisted = result
+            if mtime is None:
+                return []
+            self._store(directory, materials, mtime, infos)
+            seen.append(directory)
+            if relisted:
+                textures = [t for by_type in materials.values() for ts in by_type.values() for t in ts]
+                changed.append((directory, mtime, subdirs, textures, infos))
+            return subdirs if recursive else []
+        
+        if workers <= 1:
+            pending = [root]
+            while pending:
+                directory = pending.pop()
+                pending.extend(handle(directory, self._list_dir(directory, cache.get(directory))))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(self._list_dir, root, cache.get(root)): root}
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        directory = futures.pop(future)
+                        for subdir in handle(directory, future.result()):
+                            futures[pool.submit(self._list_dir, subdir, cache.get(subdir))] = subdir
+        
+        if catalog:
+            catalog.store(changed, removed=set(cache) - set(seen) if recursive else ())
+        return len(changed)
+    
+    def materials(self, directory):
+        """Gibt {basisname: {map_type: [TextureName]}} für ein Verzeichnis zurück.
+        
+        Nicht indizierte oder seit dem Einlesen geänderte Verzeichnisse (z.B. nach dem
+        Schreiben neuer Maps) werden einzeln neu eingelesen - ein stat statt vieler exists.
+        """
+        directory = os.path.normpath(directory)
+        with self._lock:
+            materials = self.dirs.get(directory)
+            known_mtime = self._mtimes.get(directory)
+        try:
+            current_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return {}
+        if materials is None or current_mtime != known_mtime:
+            materials, _, mtime, infos, _ = self._list_dir(directory)
+            self._store(directory, materials, mtime, infos)
+        return materials
+    
+    def info(self, path):
+        """[größe, mtime_ns, breite, höhe] aus dem Scan oder None"""
+        with self._lock:
+            return self.file_info.get(os.path.normpath(path))
+    
+    def refresh(self, path):
+        """Aktuelle [größe, mtime_ns, breite, höhe] einer gewählten Quelle per stat.
+        
+        Das Listing aus dem Katalog verrät nur, welche Dateien existieren - in-place
+        überschriebene Dateien ändern die Verzeichnis-mtime nicht. Weicht stat ab, werden
+        die Abmessungen verworfen und die Datei für den Katalog vorgemerkt.
+        """
+        info = self.info(path)
+        if info is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if info[:2] != [st.st_size, st.st_mtime_ns]:
+            info[:] = [st.st_size, st.st_mtime_ns, 0, 0]
+            self.refreshed.append((path, st.st_size, st.st_mtime_ns))
+        return info
+    
+    def dimensions(self, path):
+        """(Breite, Höhe) aus dem Scan; fehlt sie, wird nur der Header gelesen und gemerkt"""
+        info = self.info(path)
+        if info is None:
+            return None
+        if not info[2]:
+            size = probe_image_size(path)
+            if not size:
+                return None
+            info[2:] = size
+            self.probed.append((path, size[0], size[1]))
+        return (info[2], info[3])
+    
+    def candidates(self, directory, base_name, map_type):
+        """Alle Dateien eines Map-Typs für ein Material, bester Rang zuerst"""
+        return self.materials(directory).get(base_name.casefold(), {}).get(map_type, [])
+    
+    def lookup(self, directory, base_name, map_type):
+        """Pfad der bevorzugten Datei eines Map-Typs oder None"""
+        candidates = self.candidates(directory, base_name, map_type)
+        if candidates:
+            return os.path.join(directory, candidates[0].filename)
+        return None
+    
+    def resolution_variants(self, directory, base_name, map_type):
+        """Auflösungsvarianten der bevorzugten Datei als [(längste Seite, Rang, Pfad)].
+        
+        Berücksichtigt nur Kandidaten mit gleichem Suffix und gleicher Variante wie der
+        beste Treffer (z.B. nur NormalGL), die Abmessungen kommen aus der Header-Probe.
+        """
+        candidates = self.candidates(directory, base_name, map_type)
+        if not candidates:
+            return []
+        best = candidates[0].rank[:2]
+        variants = []
+        for candidate in candidates:
+            if candidate.rank[:2] != best:
+                continue
+            path = os.path.join(directory, candidate.filename)
+            size = self.dimensions(path)
+            if size:
+                variants.append((max(size), candidate.rank, path))
+        return variants
+    
+    def iter_textures(self, map_type=None):
+        """Liefert (Verzeichnis, TextureName) für alle indizierten Texturen"""
+        with self._lock:
+            snapshot = list(self.dirs.items())
+        for directory, materials in snapshot:
+            for by_type in materials.values():
+                for candidate_type, candidates in by_type.items():
+                    if map_type is None or candidate_type == map_type:
+                        for candidate in candidates:
+                            yield directory, candidate
+    
+    def file_count(self):
+        with self._lock:
+            return sum(len(candidates) for materials in self.dirs.values()
+                       for by_type in materials.values() for candidates in by_type.values())
+
+class ScanCatalog:
+    """Persistenter Scan-Katalog (SQLite) für inkrementelle Rescans.
+    
+    Speichert pro Verzeichnis die mtime und Unterordner sowie pro Textur Größe, mtime,
+    Abmessungen und das Ergebnis des SuffixMatchers. Ändern sich die Suffix-Einträge von
+    texture_suffixes.json (nicht Layouts oder Transformationen), wird der Katalog verworfen. Hinweis: Die mtime eines Verzeichnisses ändert sich nur
+    beim Anlegen, Löschen oder Umbenennen von Einträgen - in-place überschriebene
+    Dateien erkennt erst der stat der gewählten Quellen (TextureIndex.refresh).
+    """
+    
+    FILENAME = ".orm_catalog.sqlite"
+    SCHEMA_VERSION = "2"
+    
+    def __init__(self, directory, config):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, self.FILENAME)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER, subdirs TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                dir TEXT, name TEXT, size INTEGER, mtime_ns INTEGER, width INTEGER, height INTEGER,
+                base TEXT, map_type TEXT, resolution TEXT, variant TEXT, suffix TEXT, rank TEXT,
+                PRIMARY KEY (dir, name));
+        """)
+        # Nur was der SuffixMatcher auswertet - Packing-Layouts oder Kurven ändern kein Listing
+        scan_config = {key: config.get(key) for key in SuffixMatcher.CONFIG_KEYS}
+        config_hash = hashlib.sha1(json.dumps(scan_config, sort_keys=True).encode("utf-8")).hexdigest()
+        stamp = f"{self.SCHEMA_VERSION}:{config_hash}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+        if not row or row[0] != stamp:
+            # Neue Suffix-Konfiguration: alle zerlegten Namen sind ungültig
+            with self.conn:
+                self.conn.execute("DELETE FROM dirs")
+                self.conn.execute("DELETE FROM files")
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('stamp', ?)", (stamp,))
+    
+    def load(self, root):
+        """Lädt alle Einträge unterhalb von root: {dir: (mtime, subdirs, [TextureName], infos)}"""
+        prefix = os.path.join(root, "")
+        cache = {}
+        for path, mtime, subdirs in self.conn.execute("SELECT path, mtime_ns, subdirs FROM dirs"):
+            if path == root or path.startswith(prefix):
+                cache[path] = (mtime, json.loads(subdirs), [], {})
+        for row in self.conn.execute("SELECT * FROM files"):
+            entry = cache.get(row[0])
+            if entry is None:
+                continue
+            name, size, mtime, width, height, base, map_type, res, variant, suffix, rank = row[1:]
+            entry[2].append(TextureName(name, base, map_type, res, variant, suffix,
+                                        tuple(int(r) for r in rank.split(","))))
+            entry[3][name] = [size, mtime, width, height]
+        return cache
+    
+    def store(self, listings, removed=()):
+        """Schreibt neu gelistete Verzeichnisse und entfernt verschwundene"""
+        with self.conn:
+            for directory in removed:
+                self.conn.execute("DELETE FROM dirs WHERE path = ?", (directory,))
+                self.conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+            for directory, mtime, subdirs, textures, infos in listings:
+                self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)",
+                                  (directory, mtime, json.dumps(subdirs)))
+                self.conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+                self.conn.executemany(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(directory, t.filename, *infos[t.filename], t.base, t.map_type, t.resolution,
+                      t.variant, t.suffix, ",".join(str(r) for r in t.rank)) for t in textures])
+    
+    def store_files(self, updates):
+        """Speichert per stat geänderte Dateien: [(pfad, größe, mtime_ns)], Abmessungen neu proben"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET size = ?, mtime_ns = ?, width = 0, height = 0 WHERE dir = ? AND name = ?",
+                [(size, mtime, os.path.dirname(path), os.path.basename(path))
+                 for path, size, mtime in updates])
+    
+    def store_dimensions(self, updates):
+        """Speichert nachträglich per Header-Probe ermittelte Abmessungen: [(pfad, breite, höhe)]"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET width = ?, height = ? WHERE dir = ? AND name = ?",
+                [(w, h, os.path.dirname(path), os.path.basename(path)) for path, w, h in updates])
+    
+    def close(self):
+        self.conn.close()
+
+def probe_image_size(path):
+    """Liest nur den Bild-Header (Pillow dekodiert lazy) und gibt (Breite, Höhe) zurück"""
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None
+
+class MaterialRecord:
+    """Kompakter Datensatz eines Materials mit allen beim Laden aufgelösten Maps.
+    
+    Pfade, Dateigrößen, mtimes und Abmessungen liegen in Arrays in MAP_TYPES-Reihenfolge,
+    damit auch 10k+ Materialien wenig Speicher brauchen.
+    """
+    
+    __slots__ = ("base_name", "dir", "paths", "file_sizes", "mtimes", "widths", "heights", "resolutions")
+    
+    def __init__(self, base_name, directory):
+        self.base_name = base_name
+        self.dir = directory
+        self.paths = [None] * len(MAP_TYPES)
+        self.file_sizes = array("q", [0] * len(MAP_TYPES))
+        self.mtimes = array("q", [0] * len(MAP_TYPES))
+        self.widths = array("i", [0] * len(MAP_TYPES))
+        self.heights = array("i", [0] * len(MAP_TYPES))
+        self.resolutions = []  # längste Seite aller Albedo-Auflösungsvarianten
+    
+    def set_map(self, map_type, path, info=None):
+        """Setzt (oder entfernt bei None) eine Map und liest Größe, mtime und Header.
+        
+        info ist ein bekanntes [größe, mtime_ns, breite, höhe] aus Index/Katalog; fehlende
+        Abmessungen werden per Header-Probe ergänzt und in info zurückgeschrieben.
+        """
+        i = MAP_INDEX[map_type]
+        self.paths[i] = path
+        self.file_sizes[i] = self.mtimes[i] = self.widths[i] = self.heights[i] = 0
+        if not path:
+            return
+        if info is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+            info = [st.st_size, st.st_mtime_ns, 0, 0]
+        if not info[2]:
+            size = probe_image_size(path)
+            if size:
+                info[2:] = size
+        self.file_sizes[i], self.mtimes[i], self.widths[i], self.heights[i] = info
+    
+    def path(self, map_type):
+        return self.paths[MAP_INDEX[map_type]]
+    
+    def dimensions(self, map_type):
+        """(Breite, Höhe) aus dem Header-Probe oder None"""
+        i = MAP_INDEX[map_type]
+        if self.widths[i]:
+            return (self.widths[i], self.heights[i])
+        return None
+    
+    def file_size(self, map_type):
+        return self.file_sizes[MAP_INDEX[map_type]]
+    
+    def mtime(self, map_type):
+        return self.mtimes[MAP_INDEX[map_type]]
+    
+    def maps(self):
+        """{map_type: pfad} aller vorhandenen Maps"""
+        return {map_type: path for map_type, path in zip(MAP_TYPES, self.paths) if path}
+    
+    def to_row(self):
+        return [self.base_name, self.dir, self.paths, self.file_sizes.tolist(), self.mtimes.tolist(),
+                self.widths.tolist(), self.heights.tolist(), self.resolutions]
+    
+    @classmethod
+    def from_row(cls, row):
+        record = cls(row[0], row[1])
+        record.paths = list(row[2])
+        record.file_sizes = array("q", row[3])
+        record.mtimes = array("q", row[4])
+        record.widths = array("i", row[5])
+        record.heights = array("i", row[6])
+        record.resolutions = list(row[7]) if len(row) > 7 else []
+        return record
+
+class MaterialStore:
+    """Liste aller geladenen Materialien, einmal beim Laden gefüllt und von allen
+    Operationen direkt verwendet. Speichern/Laden erlaubt das Wiederöffnen einer
+    Sitzung ohne erneuten Dateisystem-Scan."""
+    
+    VERSION = 1
+    
+    def __init__(self, records=None):
+        self.records = list(records or [])
+        self.meta = {}
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __iter__(self):
+        return iter(self.records)
+    
+    def __getitem__(self, index):
+        return self.records[index]
+    
+    def append(self, record):
+        self.records.append(record)
+    
+    def save(self, path, meta=None):
+        data = {
+            "version": self.VERSION,
+            "map_types": list(MAP_TYPES),
+            "meta": meta if meta is not None else self.meta,
+            "materials": [record.to_row() for record in self.records],
+        }
+        with atomic_output(path) as temp_path:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != cls.VERSION or data.get("map_types") != list(MAP_TYPES):
+            raise ValueError("Sitzungsdatei hat ein inkompatibles Format")
+        store = cls(MaterialRecord.from_row(row) for row in data.get("materials", []))
+        store.meta = data.get("meta", {})
+        return store
+
+class BuildManifest:
+    """Build-Manifest für inkrementelle Builds (JSON im Ausgabe-Verzeichnis).
+    
+    Merkt sich pro Ausgabedatei einen Fingerabdruck aus den Inhalts-Hashes aller
+    Eingaben und den relevanten Einstellungen. Hashes werden pro Datei mit Größe und
+    mtime zwischengespeichert, sodass unveränderte Dateien nicht erneut gelesen werden.
+    """
+    
+    FILENAME = ".orm_manifest.json"
+    VERSION = 1
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILENAME)
+        self.files = {}  # Pfad -> [größe, mtime_ns, hash]
+        self.outputs = {}  # relativer Ausgabepfad -> [fingerabdruck, größe, mtime_ns]
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.files = data.get("files", {})
+                self.outputs = data.get("outputs", {})
+        except (OSError, ValueError):
+            pass
+    
+    def file_hash(self, path):
+        """Inhalts-Hash einer Datei; bei gleicher Größe und mtime aus dem Manifest"""
+        st = os.stat(path)
+        with self._lock:
+            cached = self.files.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        with self._lock:
+            self.files[path] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+    
+    def fingerprint(self, inputs, params):
+        """Fingerabdruck aus {name: pfad oder None} und den Build-Parametern"""
+        hashes = {}
+        for name, path in inputs.items():
+            try:
+                hashes[name] = self.file_hash(path) if path else None
+            except OSError:
+                hashes[name] = "fehlt"
+        data = json.dumps({"inputs": hashes, "params": params}, sort_keys=True)
+        return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def is_current(self, output_path, fingerprint):
+        """True, wenn die Ausgabe existiert, unverändert ist und zum Fingerabdruck passt"""
+        entry = self.outputs.get(os.path.relpath(output_path, self.directory))
+        if not entry or entry[0] != fingerprint:
+            return False
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return False
+        return entry[1:] == [st.st_size, st.st_mtime_ns]
+    
+    def is_untracked(self, output_path):
+        """True, wenn die Ausgabe existiert, aber nie über das Manifest gebaut wurde"""
+        return (os.path.relpath(output_path, self.directory) not in self.outputs
+                and os.path.exists(output_path))
+    
+    def record(self, output_path, fingerprint):
+        st = os.stat(output_path)
+        with self._lock:
+            self.outputs[os.path.relpath(output_path, self.directory)] = [fingerprint, st.st_size, st.st_mtime_ns]
+    
+    def save(self):
+        with self._lock, atomic_output(self.path) as temp_path:
+            data = {"version": self.VERSION, "files": self.files, "outputs": self.outputs}
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(",", ":"))
+
+class BatchJournal:
+    """Append-only-Journal der abgeschlossenen Materialien eines Batch-Laufs (JSON-Zeilen).
+    
+    Die erste Zeile enthält den Schlüssel des Laufs (Operation und Einstellungen). Beim
+    Fortsetzen werden nur Einträge mit passendem Schlüssel übernommen; eine beim Absturz
+    halb geschriebene letzte Zeile wird ignoriert.
+    """
+    
+    def __init__(self, directory, operation, params, resume=False):
+        self.path = os.path.join(directory, f".orm_journal_{operation}.jsonl")
+        data = json.dumps({"operation": operation, "params": params}, sort_keys=True)
+        self.key = hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+        self.completed = {}
+        self.mismatch = False  # Journal stammt von einem Lauf mit anderen Einstellungen
+        self.stale_parts = 0  # entfernte .part-Reste eines abgebrochenen Laufs
+        if resume:
+            self._read()
+            # Nach einem harten Abbruch (kill -9) räumt atomic_output nicht mehr auf
+            self.stale_parts = remove_stale_parts(directory)
+        if self.completed:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self.file = open(self.path, 'w', encoding='utf-8')
+            self._append({"batch": self.key})
+    
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        if not entries or entries[0].get("batch") != self.key:
+            self.mismatch = bool(entries)
+            return
+        for entry in entries[1:]:
+            if "id" in entry:
+                self.completed[entry["id"]] = entry
+    
+    def _append(self, entry):
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    
+    def is_done(self, item_id):
+        return item_id in self.completed
+    
+    def record(self, item_id, **data):
+        entry = {"id": item_id, **data}
+        self.completed[item_id] = entry
+        self._append(entry)
+    
+    def close(self):
+        self.file.close()
+
+# .{name}.{pid}.{thread}.part aus temp_output_path
+STALE_PART_PATTERN = re.compile(r"^\..+\.(\d+)\.\d+\.part$")
+
+def temp_output_path(path):
+    """Temporärer Dateiname neben der Zieldatei (gleiches Dateisystem für os.replace)"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.part")
+
+def remove_stale_parts(directory):
+    """Entfernt temporäre .part-Dateien anderer (abgebrochener) Prozesse; gibt die Anzahl zurück"""
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    for name in names:
+        match = STALE_PART_PATTERN.match(name)
+        if not match or int(match.group(1)) == os.getpid():
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+@contextmanager
+def atomic_output(path):
+    """Liefert einen temporären Pfad und ersetzt das Ziel erst nach erfolgreichem Schreiben.
+    
+    Bricht der Prozess ab, bleibt am Zielpfad die alte oder gar keine Datei zurück,
+    aber nie eine halb geschriebene.
+    """
+    temp_path = temp_output_path(path)
+    try:
+        yield temp_path
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    os.replace(temp_path, path)
+
+# Encoder-Profile: Kodierzeit gegen Dateigröße.
+# PNG: zlib-Stufe und -Strategie (die Zeilenfilter wählt Pillow adaptiv; Stufe 9 entspricht
+# dem früheren optimize=True und kostet auf glatten Maps ein Vielfaches von Stufe 6).
+# JPEG: Chroma-Subsampling (gepackte Kanäle wie ORM leiden unter 4:2:0), progressive,
+# Huffman-Optimierung. JPEG 2000: Kachelgröße (None = eine Kachel) und Qualitätsschichten.
+ENCODER_PROFILES = {
+    "fast": {"png_level": 1, "png_strategy": zlib.Z_RLE,
+             "jpeg_subsampling": "4:2:0", "jpeg_progressive": False, "jpeg_optimize": False,
+             "j2k_tile": 512, "j2k_layers": 1},
+    "balanced": {"png_level": 6, "png_strategy": zlib.Z_FILTERED,
+                 "jpeg_subsampling": "4:4:4", "jpeg_progressive": False, "jpeg_optimize": True,
+                 "j2k_tile": 1024, "j2k_layers": 3},
+    "smallest": {"png_level": 9, "png_strategy": zlib.Z_DEFAULT_STRATEGY,
+                 "jpeg_subsampling": "4:2:0", "jpeg_progressive": True, "jpeg_optimize": True,
+                 "j2k_tile": None, "j2k_layers": 1},
+}
+J2K_LAYER_STEP = 10  # dB zwischen zwei Qualitätsschichten; Viewer laden die Schichten nacheinander
+
+def j2k_quality_layers(quality, layers):
+    """Aufsteigende dB-Werte der Qualitätsschichten, die oberste ist quality"""
+    return sorted({max(1, quality - J2K_LAYER_STEP * i) for i in range(layers)})
+
+def save_image(img, path, output_format="PNG", quality=95, profile="balanced"):
+    """Speichert Bild im gewählten Format mit Kompression (atomar über eine temporäre Datei)"""
+    options = ENCODER_PROFILES[profile]
+    with atomic_output(path) as temp_path:
+        if output_format == "PNG":
+            img.save(temp_path, "PNG", compress_level=options["png_level"], compress_type=options["png_strategy"])
+        elif output_format == "JPEG":
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img.save(temp_path, "JPEG", quality=quality, subsampling=options["jpeg_subsampling"],
+                     progressive=options["jpeg_progressive"], optimize=options["jpeg_optimize"])
+        elif output_format == "JP2":
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            tile = options["j2k_tile"]
+            img.save(temp_path, "JPEG2000", quality_mode="dB",
+                     quality_layers=j2k_quality_layers(quality, options["j2k_layers"]),
+                     tile_size=(tile, tile) if tile and max(img.size) > tile else None)
+
+# Threads zum Speichern (Pillow gibt den GIL beim Kodieren frei)
+ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+
+class ImageEncoder:
+    """Speichert Bilder in einem Thread-Pool, damit das Kodieren mit dem Dekodieren der
+    nächsten Bilder überlappt.
+    
+    Aufträge werden unter einem Schlüssel (z.B. Material) gesammelt; finish(key) wartet auf
+    sie. Höchstens 2 × workers Bilder warten gleichzeitig im Speicher.
+    """
+    
+    def __init__(self, workers=ENCODE_WORKERS):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers * 2)
+        self.futures = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def submit(self, key, img, path, output_format, quality, profile):
+        # Verzögertes Laden im aufrufenden Thread: der Aufrufer liest das Bild parallel weiter
+        img.load()
+        self.slots.acquire()
+        future = self.pool.submit(save_image, img, path, output_format, quality, profile)
+        future.add_done_callback(lambda future: self.slots.release())
+        self.futures.setdefault(key, []).append(future)
+        return future
+    
+    def finish(self, key):
+        """Wartet auf alle Aufträge eines Schlüssels; gibt ihre Fehler zurück (leer bei Erfolg)"""
+        errors = []
+        for future in self.futures.pop(key, []):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+        return errors
+    
+    def close(self):
+        """Wartet auf alle noch laufenden Aufträge"""
+        self.pool.shutdown(wait=True)
+
+def clone_file(src, dst):
+    """Legt dst als Kopie von src an: Reflink (Copy-on-Write) wenn das Dateisystem es
+    kann, sonst Hardlink, sonst echte Kopie. Gibt die verwendete Methode zurück."""
+    import shutil
+    try:
+        import fcntl
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), 0x40049409, fsrc.fileno())  # FICLONE (Linux: btrfs, XFS)
+        return "reflink"
+    except (ImportError, OSError):
+        if os.path.exists(dst):
+            os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        shutil.copyfile(src, dst)
+        return "kopie"
+
+def save_json(data, path):
+    """Schreibt eine JSON-Datei (z.B. glTF) atomar"""
+    with atomic_output(path) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def png_chunk(chunk_type, data):
+    """Baut einen PNG-Chunk (Länge, Typ, Daten, CRC)"""
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+def iter_png_chunks(f):
+    """Liest (Typ, Daten) aller Chunks ab der aktuellen Dateiposition"""
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        length, chunk_type = struct.unpack(">I4s", header)
+        data = f.read(length)
+        f.read(4)  # CRC
+        yield chunk_type, data
+        if chunk_type == b"IEND":
+            return
+
+# 16/32-Bit-Graustufen (z.B. 16-Bit-Height-Maps)
+WIDE_GRAY_MODES = ("I", "I;16", "I;16B", "I;16L")
+
+def gray_image(img):
+    """Map als L-Bild; 16-Bit-Daten werden auf 8 Bit abgebildet statt bei 255 abgeschnitten"""
+    if img.mode in WIDE_GRAY_MODES:
+        return img.convert("I").point(lambda v: v * (1 / 256)).convert("L")
+    if img.mode == "L":
+        img.load()
+        return img
+    return img.convert("L")
+
+class PNGStripReader:
+    """Liest ein PNG (nicht interlaced) streifenweise als Graustufen, ohne das ganze Bild zu dekodieren.
+    
+    Die gefilterten Zeilen eines Streifens werden zusammen mit der ungefilterten
+    Vorgängerzeile zu einem Mini-PNG verpackt und von Pillow entfiltert. Das Mini-PNG ist
+    ein 8-Bit-Typ mit gleich vielen Bytes pro Pixel (z.B. 16-Bit-Grau als Grau+Alpha) und
+    liefert so die Rohbytes, die mit dem Rohmodus des Originals gelesen werden. Nur 16-Bit-RGB(A)
+    hat kein solches Gegenstück.
+    """
+    
+    CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}  # PNG-Farbtyp -> Kanäle
+    # (Bittiefe, Farbtyp) -> (Modus, Rohmodus) wie im PNG-Plugin von Pillow
+    MODES = {(1, 0): ("1", "1"), (2, 0): ("L", "L;2"), (4, 0): ("L", "L;4"), (8, 0): ("L", "L"),
+             (16, 0): ("I;16", "I;16B"), (8, 2): ("RGB", "RGB"), (1, 3): ("P", "P;1"), (2, 3): ("P", "P;2"),
+             (4, 3): ("P", "P;4"), (8, 3): ("P", "P"), (8, 4): ("LA", "LA"), (16, 4): ("RGBA", "LA;16B"),
+             (8, 6): ("RGBA", "RGBA")}
+    FILTER_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}  # Bytes pro Pixel -> 8-Bit-Farbtyp für das Mini-PNG
+    
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            if self.file.read(8) != PNG_SIGNATURE:
+                raise ValueError("kein PNG")
+            self.palette = None
+            self.chunks = iter_png_chunks(self.file)
+            self.pending = b""
+            for chunk_type, data in self.chunks:
+                if chunk_type == b"IHDR":
+                    self.ihdr = data
+                elif chunk_type == b"PLTE":
+                    self.palette = data
+                elif chunk_type == b"IDAT":
+                    self.pending = data
+                    break
+            width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", self.ihdr)
+            pixel_bytes = max(1, depth * self.CHANNELS.get(color_type, 0) // 8)
+            if interlace or (depth, color_type) not in self.MODES or pixel_bytes not in self.FILTER_TYPES:
+                raise ValueError("PNG-Variante nicht streambar")
+        except Exception:
+            self.file.close()
+            raise
+        self.size = (width, height)
+        self.mode, self.rawmode = self.MODES[(depth, color_type)]
+        self.packed_bytes = (width * depth * self.CHANNELS[color_type] + 7) // 8  # Zeile ohne Filter-Byte
+        self.row_bytes = 1 + self.packed_bytes
+        self.mini_header = (self.packed_bytes // pixel_bytes, self.FILTER_TYPES[pixel_bytes])
+        self.decompressor = zlib.decompressobj()
+        self.prev_row = None
+        self.rows = bytearray()  # dekodierte Graustufen-Zeilen ab buffer_start
+        self.buffer_start = 0
+    
+    def _decode(self, count):
+        """Dekodiert die nächsten count Zeilen als Graustufen-Bytes"""
+        need = count * self.row_bytes
+        filtered = bytearray()
+        # max_length begrenzt den Speicher auf einen Streifen, auch bei stark komprimierten Daten
+        while len(filtered) < need:
+            if not self.pending:
+                # Im Decompressor gepufferte Daten zuerst, erst dann den nächsten IDAT-Chunk lesen
+                data = self.decompressor.decompress(b"", need - len(filtered))
+                if data:
+                    filtered += data
+                    continue
+                chunk_type, self.pending = next(self.chunks, (b"IEND", b""))
+                if chunk_type != b"IDAT":
+                    raise ValueError("PNG-Bilddaten unvollständig")
+            filtered += self.decompressor.decompress(self.pending, need - len(filtered))
+            self.pending = self.decompressor.unconsumed_tail
+        rows = count
+        if self.prev_row is not None:
+            # Filter Up/Average/Paeth der ersten Zeile brauchen die Vorgängerzeile
+            filtered[:0] = b"\x00" + self.prev_row
+            rows += 1
+        mini_width, mini_type = self.mini_header
+        ihdr = struct.pack(">IIBBBBB", mini_width, rows, 8, mini_type, 0, 0, 0)
+        mini = (PNG_SIGNATURE + png_chunk(b"IHDR", ihdr) +
+                png_chunk(b"IDAT", zlib.compress(filtered, 0)) + png_chunk(b"IEND", b""))
+        with Image.open(io.BytesIO(mini)) as img:
+            raw = img.tobytes()
+        if self.prev_row is not None:
+            raw = raw[self.packed_bytes:]
+        self.prev_row = raw[-self.packed_bytes:]
+        img = Image.frombytes(self.mode, (self.size[0], count), raw, "raw", self.rawmode)
+        if self.palette:
+            img.putpalette(self.palette)
+        return gray_image(img).tobytes()
+    
+    def read(self, y0, y1):
+        """Zeilen [y0, y1) als L-Bild; y0 darf nicht vor dem vorherigen Aufruf liegen"""
+        width = self.size[0]
+        buffered_end = self.buffer_start + len(self.rows) // width
+        if y1 > buffered_end:
+            self.rows += self._decode(y1 - buffered_end)
+        del self.rows[:(y0 - self.buffer_start) * width]
+        self.buffer_start = y0
+        return Image.frombytes("L", (width, y1 - y0), bytes(self.rows[:(y1 - y0) * width]))
+    
+    def close(self):
+        self.file.close()
+
+def decode_cost(mode, size):
+    """Geschätzter Spitzenspeicher (Bytes), um ein Bild als Graustufen zu dekodieren"""
+    pixel = {"1": 1, "L": 1, "P": 1, "LA": 4, "I;16": 2, "I;16B": 2, "I;16L": 2}.get(mode, 4)
+    if mode in WIDE_GRAY_MODES:
+        pixel += 9  # Umweg über I (4 Bytes) und point()
+    elif mode != "L":
+        pixel += 1  # L-Kopie
+    return size[0] * size[1] * pixel
+
+def open_reduced_gray(path, target_size, budget=0):
+    """Öffnet eine Map zum Dekodieren als Graustufen: JPEG per draft, JPEG2000 per reduce
+    möglichst nahe an target_size, bei budget (Bytes) höchstens so groß, dass es hineinpasst.
+    
+    Gibt (Bild, dekodierte Größe, geschätzte Kosten, wegen Budget verkleinert) zurück;
+    dekodiert ist noch nichts.
+    """
+    want = target_size
+    first = previous = None
+    while True:
+        img = Image.open(path)
+        width, height = img.size
+        mode = img.mode
+        if img.format == "JPEG":
+            img.draft("L", want)
+            size, mode = img.size, img.mode
+        elif img.format == "JPEG2000":
+            reduce = 0
+            while reduce < 5 and width >> (reduce + 1) >= want[0] and height >> (reduce + 1) >= want[1]:
+                reduce += 1
+            img.reduce = reduce
+            size = (-(-width >> reduce), -(-height >> reduce))
+        else:
+            size = img.size
+        cost = decode_cost(mode, size)
+        first = first or size
+        if not budget or cost <= budget or size == previous:
+            return img, size, cost, size != first
+        # Nächste Stufe: halbe Kantenlänge
+        img.close()
+        previous = size
+        want = (max(1, size[0] // 2), max(1, size[1] // 2))
+
+class SpooledStripReader:
+    """Fallback für JPEG/JP2, 16-Bit-RGB(A)- und interlaced PNG: dekodiert einmal als
+    Graustufen und lagert die Zeilen in eine temporäre Datei aus, aus der streifenweise
+    gelesen wird.
+    
+    JPEG (draft) und JPEG2000 (reduce) werden möglichst nahe an der Zielgröße dekodiert,
+    aber nur so groß, wie das Speicherbudget erlaubt. Was sich nicht verkleinert dekodieren
+    lässt und trotzdem über dem Budget liegt, wird mit Warnung in messages voll dekodiert.
+    """
+    
+    def __init__(self, path, target_size, budget=0, messages=None):
+        img, size, cost, limited = open_reduced_gray(path, target_size, budget)
+        if messages is not None:
+            name = os.path.basename(path)
+            if limited:
+                messages.append(f"WARNUNG {name}: für das Speicherbudget auf {size[0]}x{size[1]} "
+                                f"reduziert dekodiert (Ziel {target_size[0]}x{target_size[1]})")
+            if budget and cost > budget:
+                messages.append(f"WARNUNG {name}: {img.format} lässt sich nicht streifenweise lesen - "
+                                f"Dekodieren braucht ~{cost / 2**20:.0f} MB, Budget {budget / 2**20:.0f} MB")
+        with img:
+            gray = gray_image(img)
+        self.size = gray.size
+        width, height = self.size
+        self.spool = tempfile.TemporaryFile()
+        step = max(1, (1 << 20) // width)  # kleine Blöcke: crop und tobytes kopieren je einmal
+        for y in range(0, height, step):
+            self.spool.write(gray.crop((0, y, width, min(height, y + step))).tobytes())
+        del gray
+    
+    def read(self, y0, y1):
+        # seek/read statt mmap: gelesene Seiten zählen sonst bis zum Schluss zum Prozessspeicher
+        width = self.size[0]
+        self.spool.seek(y0 * width)
+        return Image.frombytes("L", (width, y1 - y0), self.spool.read((y1 - y0) * width))
+    
+    def close(self):
+        self.spool.close()
+
+def open_strip_reader(path, target_size, budget=0, messages=None):
+    """PNG-Streaming wenn möglich, sonst einmal (im Budget) dekodieren und auslagern"""
+    try:
+        return PNGStripReader(path)
+    except ValueError:
+        return SpooledStripReader(path, target_size, budget, messages)
+
+class PNGStripWriter:
+    """Schreibt ein RGB- oder RGBA-PNG streifenweise; nur der aktuelle Streifen liegt im Speicher"""
+    
+    def __init__(self, path, size, mode="RGB", compress_level=9, strategy=zlib.Z_DEFAULT_STRATEGY):
+        self.width, self.height = size
+        self.path = path
+        self.temp_path = temp_output_path(path)
+        self.file = open(self.temp_path, "wb")
+        self.compressor = zlib.compressobj(compress_level, zlib.DEFLATED, zlib.MAX_WBITS, 8, strategy)
+        color_type = 6 if mode == "RGBA" else 2
+        self.file.write(PNG_SIGNATURE + png_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height,
+                                                                        8, color_type, 0, 0, 0)))
+    
+    def write(self, strip):
+        # Pillow filtert die Zeilen in C; die erste Zeile wird ungefiltert übernommen,
+        # weil sich ihr Filter sonst auf die falsche Vorgängerzeile beziehen würde
+        buffer = io.BytesIO()
+        strip.save(buffer, "PNG", compress_level=1)
+        buffer.seek(len(PNG_SIGNATURE))
+        filtered = zlib.decompress(b"".join(data for chunk_type, data in iter_png_chunks(buffer)
+                                            if chunk_type == b"IDAT"))
+        first_row = b"\x00" + strip.crop((0, 0, self.width, 1)).tobytes()
+        data = self.compressor.compress(first_row + filtered[len(first_row):])
+        if data:
+            self.file.write(png_chunk(b"IDAT", data))
+    
+    def close(self):
+        self.file.write(png_chunk(b"IDAT", self.compressor.flush()) + png_chunk(b"IEND", b""))
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+    
+    def abort(self):
+        """Verwirft die unvollständige Ausgabe"""
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+def estimate_orm_memory(source_sizes, final_size, outputs=1):
+    """Grobe Schätzung des Spitzenspeichers beim Packen im Ganzen (Bytes)"""
+    # Dekodierte Quelle (bis 4 Bytes/Pixel) plus Graustufen-Kopie, je Ausgabe RGB(A) plus Encoder-Puffer
+    sources = sum(width * height * 5 for width, height in source_sizes)
+    return sources + final_size[0] * final_size[1] * 8 * outputs
+
+# Kantenlänge der Ersatz-Textur für einfarbige ORM-Maps
+UNIFORM_TEXTURE_SIZE = 4
+
+def probe_uniform_channel(path, probe_rows=64):
+    """Prüft billig, ob eine Map einfarbig sein kann: (möglich, wert).
+    
+    PNG wird streifenweise gelesen (Abbruch beim ersten zweiten Wert) und liefert den
+    genauen Wert. JPEG (draft auf 1/8) und JPEG2000 (niedrigste reduce-Stufe) werden nur
+    verkleinert geprüft; sieht die Probe einfarbig aus, ist der Wert None und bestätigt wird
+    beim Packen. Formate ohne verkleinertes Dekodieren gelten ungeprüft als möglich.
+    """
+    try:
+        reader = PNGStripReader(path)
+    except ValueError:
+        reader = None
+    if reader:
+        try:
+            height = reader.size[1]
+            value = None
+            for y0 in range(0, height, probe_rows):
+                low, high = reader.read(y0, min(height, y0 + probe_rows)).getextrema()
+                if low != high or value not in (None, low):
+                    return False, None
+                value = low
+            return True, value
+        finally:
+            reader.close()
+    img = open_reduced_gray(path, (1, 1))[0]
+    with img:
+        if img.format not in ("JPEG", "JPEG2000"):
+            return True, None
+        try:
+            low, high = gray_image(img).getextrema()
+        except OSError:
+            # Codestream mit weniger Auflösungsstufen: ohne Probe
+            return True, None
+    return low == high, None
+
+def uniform_band_values(bands):
+    """Werte der Bänder, wenn jedes einfarbig ist, sonst None"""
+    extrema = [band.getextrema() for band in bands]
+    if any(low != high for low, high in extrema):
+        return None
+    return tuple(low for low, high in extrema)
+
+def uniform_orm_values(path):
+    """(AO, Roughness, Metallic) einer einfarbigen Mini-ORM-Textur oder None"""
+    size = probe_image_size(path)
+    if not size or max(size) > UNIFORM_TEXTURE_SIZE:
+        return None
+    with Image.open(path) as img:
+        return uniform_band_values(img.convert("RGB").split())
+
+def compile_channel_lut(steps):
+    """Kompiliert eine Transformationskette zu einer 256er-LUT; None, wenn sie nichts ändert.
+    
+    Gerechnet wird in Gleitkomma über die ganze Kette, gerundet erst am Ende.
+    """
+    values = [float(i) for i in range(256)]
+    for step in steps or ():
+        if not isinstance(step, dict) or len(step) != 1:
+            raise ValueError(f"Transformationsschritt muss genau einen Eintrag haben: {step}")
+        (name, arg), = step.items()
+        if name == "invert":
+            if arg:
+                values = [255.0 - v for v in values]
+        elif name == "levels":
+            in_low, in_high, out_low, out_high = (float(x) for x in arg)
+            if in_high <= in_low:
+                raise ValueError(f"levels: Eingangsbereich leer ({in_low}-{in_high})")
+            values = [out_low + (min(max(v, in_low), in_high) - in_low) / (in_high - in_low) * (out_high - out_low)
+                      for v in values]
+        elif name == "gamma":
+            gamma = float(arg)
+            if gamma <= 0:
+                raise ValueError(f"gamma muss positiv sein ({gamma})")
+            values = [255.0 * (min(max(v, 0.0), 255.0) / 255.0) ** (1.0 / gamma) for v in values]
+        elif name == "clamp":
+            low, high = (float(x) for x in arg)
+            values = [min(max(v, low), high) for v in values]
+        elif name == "curve":
+            points = sorted((float(x), float(y)) for x, y in arg)
+            if not points:
+                raise ValueError("curve: keine Stützpunkte")
+            curved = []
+            for v in values:
+                if v <= points[0][0]:
+                    curved.append(points[0][1])
+                elif v >= points[-1][0]:
+                    curved.append(points[-1][1])
+                else:
+                    i = next(i for i, (x, y) in enumerate(points) if x >= v)
+                    (x0, y0), (x1, y1) = points[i - 1], points[i]
+                    curved.append(y0 + (v - x0) / (x1 - x0) * (y1 - y0) if x1 > x0 else y1)
+            values = curved
+        else:
+            raise ValueError(f"Unbekannter Transformationsschritt: {name}")
+    lut = tuple(min(255, max(0, int(round(v)))) for v in values)
+    return None if lut == tuple(range(256)) else lut
+
+def chain_luts(*luts):
+    """Verkettet LUTs (None = unverändert) zu einer; None, wenn das Ergebnis nichts ändert"""
+    result = tuple(range(256))
+    for lut in luts:
+        if lut:
+            result = tuple(lut[v] for v in result)
+    return None if result == tuple(range(256)) else result
+
+class ChannelSources:
+    """Dekodiert jede Quell-Map eines Materials einmal als L-Bild; alle Layouts bedienen sich daraus"""
+    
+    def __init__(self, size):
+        self.size = size
+        self.decoded = {}  # pfad -> L-Bild in Quellgröße
+        self.bands = {}  # (pfad, LUT) -> L-Bild in Zielgröße
+    
+    def source(self, path):
+        if path not in self.decoded:
+            with Image.open(path) as img:
+                self.decoded[path] = gray_image(img)
+        return self.decoded[path]
+    
+    def band(self, path, lut):
+        """Kanal in Zielgröße; die LUT wird vor dem Skalieren angewendet"""
+        key = (path, lut)
+        if key not in self.bands:
+            img = self.source(path)
+            if lut:
+                img = img.point(lut)
+            if img.size != self.size:
+                resample = Image.Resampling.LANCZOS if img.size[0] > self.size[0] else Image.Resampling.BICUBIC
+                img = img.resize(self.size, resample)
+            self.bands[key] = img
+        return self.bands[key]
+
+def pack_orm_pillow(channels, size, sources=None):
+    """Packt die Kanäle mit Pillow: jeder Kanal als eigenes L-Bild, dann Image.merge"""
+    sources = sources or ChannelSources(size)
+    bands = [sources.band(path, lut) if path else Image.new("L", size, value)
+             for path, value, lut in channels]
+    return Image.merge("RGBA" if len(bands) == 4 else "RGB", bands)
+
+def pack_orm_numpy(channels, size, sources=None):
+    """Packt die Kanäle in einen vorab angelegten uint8-Puffer (H×W×3 bzw. ×4).
+    
+    Jeder Kanal wird direkt in seine Ebene des Puffers kopiert und dort per take durch
+    seine LUT geschickt, Füllwerte per Broadcast gesetzt. Das zurückgegebene Bild teilt sich
+    den Speicher mit dem Puffer, der Encoder bekommt ihn ohne weitere Kopie.
+    """
+    import numpy as np
+    sources = sources or ChannelSources(size)
+    width, height = size
+    mode = "RGBA" if len(channels) == 4 else "RGB"
+    packed = np.empty((height, width, len(channels)), dtype=np.uint8)
+    for i, (path, value, lut) in enumerate(channels):
+        plane = packed[:, :, i]
+        if path is None:
+            plane[...] = value
+        elif sources.source(path).size == size:
+            plane[...] = np.asarray(sources.source(path))
+            if lut:
+                np.take(np.array(lut, dtype=np.uint8), plane, out=plane)
+        else:
+            # Beim Skalieren die LUT vor dem Resize anwenden, sonst weicht die Rundung vom Pillow-Pfad ab
+            plane[...] = np.asarray(sources.band(path, lut))
+    return Image.frombuffer(mode, size, packed, "raw", mode, 0, 1)
+
+PACKING_ENGINES = {"Pillow": pack_orm_pillow, "NumPy": pack_orm_numpy}
+
+def read_orm_strip(reader, y0, y1, size, lut, extrema=None):
+    """Ausgabezeilen [y0, y1) eines Kanals; beim Skalieren mit Rand für den Filter.
+    
+    extrema ([min, max] der Quelle) wird mit den gelesenen Zeilen fortgeschrieben.
+    """
+    src_width, src_height = reader.size
+    if reader.size == size:
+        top, bottom = y0, y1
+    else:
+        scale = src_height / size[1]
+        margin = int(3 * max(scale, 1.0)) + 2  # Träger von LANCZOS/BICUBIC
+        top = max(0, int(y0 * scale) - margin)
+        bottom = min(src_height, int(math.ceil(y1 * scale)) + margin)
+    band = reader.read(top, bottom)
+    if extrema is not None:
+        low, high = band.getextrema()
+        extrema[:] = [min(extrema[0], low), max(extrema[1], high)]
+    if reader.size == size:
+        return band.point(lut) if lut else band
+    if lut:
+        band = band.point(lut)
+    resample = Image.Resampling.LANCZOS if src_width > size[0] else Image.Resampling.BICUBIC
+    return band.resize((size[0], y1 - y0), resample, box=(0, y0 * scale - top, src_width, y1 * scale - top))
+
+def pack_orm_streamed(layouts, size, settings, budget, messages=None, extrema=None):
+    """Packt die Layouts in horizontalen Streifen, deren Höhe sich nach dem Speicherbudget richtet.
+    
+    layouts: [(ausgabe, kanäle)] mit ausgabe = {"file", "format"} und kanälen
+    [(pfad oder None, füllwert, LUT oder None)]. Jede Quelle wird pro Streifen nur einmal
+    gelesen. PNG wird direkt streifenweise geschrieben; JPEG/JP2-Encoder brauchen das
+    ganze Bild, dort wird nur die gepackte Ausgabe im Speicher zusammengesetzt. Wo das
+    Budget nicht zu halten ist, landet eine Warnung in messages. In extrema ({pfad: [min, max]})
+    landen die Wertebereiche der Quellen, so lässt sich Einfarbigkeit ohne eigenes Dekodieren prüfen.
+    Gibt die verwendete Streifenhöhe zurück.
+    """
+    width, height = size
+    readers = {}
+    targets = []
+    try:
+        for output, channels in layouts:
+            for path, value, lut in channels:
+                if path and path not in readers:
+                    readers[path] = open_strip_reader(path, size, budget, messages)
+                    if extrema is not None:
+                        extrema[path] = [255, 0]
+        row_cost = width * 8 * len(layouts)
+        for reader in readers.values():
+            row_cost += reader.size[0] * 8 * max(1.0, reader.size[1] / height)
+        strip_height = int(max(1, min(height, budget // row_cost)))
+        
+        for output, channels in layouts:
+            mode = "RGBA" if len(channels) == 4 else "RGB"
+            if output["format"] == "PNG":
+                options = ENCODER_PROFILES[settings["encoder_profile"]]
+                targets.append(PNGStripWriter(output["file"], size, mode, options["png_level"],
+                                              options["png_strategy"]))
+            else:
+                if messages is not None and width * height * 4 > budget:
+                    messages.append(f"WARNUNG {os.path.basename(output['file'])}: {output['format']} wird im "
+                                    f"Ganzen kodiert (~{width * height * 4 / 2**20:.0f} MB, Budget {budget / 2**20:.0f} MB)")
+                targets.append(Image.new(mode, size))
+        for y0 in range(0, height, strip_height):
+            y1 = min(height, y0 + strip_height)
+            strips = {}
+            for (output, channels), target in zip(layouts, targets):
+                bands = []
+                for path, value, lut in channels:
+                    if path is None:
+                        bands.append(Image.new("L", (width, y1 - y0), value))
+                        continue
+                    if (path, lut) not in strips:
+                        strips[(path, lut)] = read_orm_strip(readers[path], y0, y1, size, lut,
+                                                             extrema.get(path) if extrema is not None else None)
+                    bands.append(strips[(path, lut)])
+                strip = Image.merge("RGBA" if len(bands) == 4 else "RGB", bands)
+                if isinstance(target, PNGStripWriter):
+                    target.write(strip)
+                else:
+                    target.paste(strip, (0, y0))
+        for i, ((output, channels), target) in enumerate(zip(layouts, targets)):
+            if isinstance(target, PNGStripWriter):
+                target.close()
+            else:
+                save_image(target, output["file"], output["format"], settings["compression_quality"],
+                           settings["encoder_profile"])
+            targets[i] = None
+        return strip_height
+    finally:
+        for target in targets:
+            if isinstance(target, PNGStripWriter):
+                target.abort()
+        for reader in readers.values():
+            reader.close()
+
+# Einstellungen, die das Ergebnis einer ORM-Map bestimmen (für das Build-Manifest)
+ORM_BUILD_SETTINGS = ("use_height_for_ao", "fill_missing_maps", "invert_gloss", "default_ao_value",
+                      "default_roughness_value", "default_metallic_value", "output_format", "compression_quality",
+                      "encoder_profile", "fold_uniform_maps")
+
+def resolve_packing_layouts(config, names, log=print):
+    """Löst die gewählten Layouts (kommagetrennt) auf.
+    
+    Gibt [{"name", "suffix", "channels": [(quelle oder None, wert, invertieren)]}] zurück;
+    ohne gültiges Layout wird ORM verwendet.
+    """
+    definitions = {**PACKING_LAYOUTS, **config.get("packing_layouts", {})}
+    layouts = []
+    for name in (name.strip() for name in names.split(",")):
+        if not name:
+            continue
+        definition = definitions.get(name)
+        if definition is None:
+            log(f"⚠ Unbekanntes Packing-Layout: {name}")
+            continue
+        channels = []
+        for channel in definition.get("channels", []):
+            if isinstance(channel, str):
+                channel = {"source": channel}
+            elif isinstance(channel, int):
+                channel = {"value": channel}
+            source = channel.get("source")
+            invert = bool(channel.get("invert", False))
+            if source is None:
+                value = int(channel.get("value", 0))
+                channels.append((None, 255 - value if invert else value, False))
+            elif source in LAYOUT_SOURCES:
+                channels.append((source, None, invert))
+            else:
+                log(f"⚠ Packing-Layout {name}: unbekannte Quelle '{source}'")
+                channels = []
+                break
+        if len(channels) not in (3, 4):
+            log(f"⚠ Packing-Layout {name}: 3 oder 4 gültige Kanäle erwartet")
+            continue
+        layouts.append({"name": name, "suffix": definition.get("suffix", name), "channels": channels})
+    return layouts or resolve_packing_layouts({}, "ORM", log)
+
+def resolve_channel_transforms(config, log=print):
+    """Transformationsketten je Map-Typ aus der Konfiguration; ungültige Ketten werden verworfen"""
+    transforms = {}
+    for map_type, steps in config.get("channel_transforms", {}).items():
+        if map_type not in LAYOUT_SOURCES:
+            log(f"⚠ Kanal-Transformation für unbekannten Map-Typ: {map_type}")
+            continue
+        try:
+            if compile_channel_lut(steps):
+                transforms[map_type] = steps
+        except (TypeError, ValueError) as e:
+            log(f"⚠ Kanal-Transformation {map_type} ignoriert: {e}")
+    return transforms
+
+def gltf_layout(layouts):
+    """Erstes Layout mit glTF-Kanalbelegung (R=AO, G=Roughness, B=Metallic) oder None"""
+    for layout in layouts:
+        if layout["channels"] == [(source, None, False) for source in LAYOUT_SOURCES]:
+            return layout
+    return None
+
+def layout_format(layout, output_format):
+    """Ausgabeformat eines Layouts; Layouts mit Alpha-Kanal werden immer als PNG gespeichert"""
+    return "PNG" if len(layout["channels"]) == 4 else output_format
+
+def make_orm_job(material, output_dir, settings, target_size=None, layouts=None, transforms=None):
+    """Beschreibt die Packing-Erzeugung eines Materials als picklebares Dict (für Worker-Prozesse)"""
+    map_types = ("ao", "roughness", "metallic", "height")
+    outputs = []
+    for layout in layouts or resolve_packing_layouts({}, "ORM"):
+        output_format = layout_format(layout, settings["output_format"])
+        outputs.append({
+            "name": layout["name"],
+            "file": os.path.join(output_dir, f"{material.base_name}_{layout['suffix']}.{output_format.lower()}"),
+            "format": output_format,
+            "channels": layout["channels"],
+        })
+    return {
+        "base_name": material.base_name,
+        "files": {map_type: material.path(map_type) for map_type in map_types},
+        "dimensions": {map_type: material.dimensions(map_type) for map_type in map_types},
+        "output_dir": output_dir,
+        "outputs": outputs,
+        "output_file": outputs[0]["file"],  # Schlüssel des Materials in Journal und Manifest
+        "target_size": target_size,
+        "transforms": transforms or {},  # Map-Typ -> Transformationskette
+        "settings": settings,
+        "rebuild": False,  # True: vorhandene Ausgabe ist veraltet und wird ersetzt
+    }
+
+def orm_build_params(job):
+    """Build-Parameter einer ORM-Map für den Fingerabdruck im Manifest"""
+    return {"target_size": job["target_size"],
+            "layouts": [(output["name"], output["format"], output["channels"]) for output in job["outputs"]],
+            "transforms": job["transforms"],
+            **{name: job["settings"][name] for name in ORM_BUILD_SETTINGS}}
+
+def layout_channel(spec, sources):
+    """Kanal eines Layouts aus den Quellen des Materials: (pfad oder None, wert, LUT oder None)"""
+    source, value, invert = spec
+    if source is None:
+        return (None, value, None)
+    path, value, lut = sources[source]
+    if path:
+        return (path, None, chain_luts(lut, INVERT_LUT if invert else None))
+    return (None, 255 - value if invert else value, None)
+
+def orm_layouts(outputs, channels):
+    """Kanäle aller Layouts aus denselben Quellen: jede Map wird nur einmal dekodiert"""
+    sources = dict(zip(LAYOUT_SOURCES, channels))
+    return [(output, [layout_channel(spec, sources) for spec in output["channels"]]) for output in outputs]
+
+def build_orm_map(job, encoder=None):
+    """Erzeugt die ORM-Map eines Materials.
+    
+    Läuft ohne GUI-Zugriff (auch in Worker-Prozessen) und gibt (erfolg, log_meldungen)
+    zurück, die der Aufrufer ins Log übernimmt. Mit encoder (ImageEncoder) wird im
+    Hintergrund gespeichert; fertig ist der Job erst nach finish_orm_job().
+    """
+    base_name = job["base_name"]
+    files = job["files"]
+    dimensions = job["dimensions"]
+    output_dir = job["output_dir"]
+    target_size = job["target_size"]
+    settings = job["settings"]
+    messages = []
+    try:
+        ao_file = files["ao"]
+        roughness_file = files["roughness"]
+        metallic_file = files["metallic"]
+        height_file = files["height"]
+        
+        outputs = job["outputs"]
+        
+        if (all(os.path.exists(output["file"]) for output in outputs) and not settings["overwrite_existing"]
+                and not job["rebuild"]):
+            messages.append(f"Übersprungen: {base_name}")
+            return True, messages
+        
+        ao_type = "ao"
+        if settings["use_height_for_ao"] and not ao_file and height_file:
+            ao_file = height_file
+            ao_type = "height"
+        
+        # Prüfe ob fehlende Maps automatisch aufgefüllt werden sollen
+        if not settings["fill_missing_maps"]:
+            # Alte Logik: Fehlende Maps führen zu Fehler
+            missing_files = []
+            if not ao_file:
+                missing_files.append("ao")
+            if not roughness_file:
+                missing_files.append("roughness")
+            if not metallic_file:
+                missing_files.append("metallic")
+            
+            if missing_files:
+                messages.append(f"FEHLER {base_name}: Fehlende Dateien - {', '.join(missing_files)}")
+                return False, messages
+        
+        # Bestimme Zielgröße
+        if target_size:
+            # Explizite Zielgröße übergeben
+            final_size = (target_size, target_size)
+        else:
+            # Bestimme aus vorhandenen Dateien (Header-Probe vom Laden)
+            final_size = None
+            for map_type in (ao_type, "roughness", "metallic"):
+                if files[map_type]:
+                    final_size = dimensions[map_type]
+                    break
+            
+            # Falls alle fehlen, verwende Standardgröße
+            if not final_size:
+                final_size = (1024, 1024)  # Standardgröße
+        
+        # Validierung: Auflösungskonsistenz (nur wenn nicht skaliert wird)
+        if settings["validate_resolution"] and not target_size:
+            sizes = [tuple(dimensions[map_type]) for map_type in (ao_type, "roughness", "metallic")
+                     if dimensions[map_type]]
+            
+            if len(set(sizes)) > 1:
+                messages.append(f"WARNUNG {base_name}: Inkonsistente Auflösungen - {sizes}")
+        
+        # Quellen der drei Kanäle: Datei (mit LUT) oder Füllwert (AO Weiß, Roughness Mittelgrau, Metallic Schwarz)
+        transforms = job["transforms"]
+        channels = []
+        for map_type, path, label in (("ao", ao_file, "AO"), ("roughness", roughness_file, "Roughness"),
+                                      ("metallic", metallic_file, "Metallic")):
+            if path and os.path.exists(path):
+                # Prüfe ob es Gloss ist und invertieren
+                invert = (map_type == "roughness" and settings["invert_gloss"] and
+                          "gloss" in os.path.basename(path).lower())
+                if invert:
+                    messages.append(f"INFO {base_name}: Gloss zu Roughness invertiert")
+                # Gloss-Inversion und Transformationskette als eine LUT, angewendet beim Packen
+                lut = chain_luts(INVERT_LUT if invert else None, compile_channel_lut(transforms.get(map_type)))
+                channels.append((path, None, lut))
+            elif settings["fill_missing_maps"]:
+                value = settings[f"default_{map_type}_value"]
+                channels.append((None, value, None))
+                messages.append(f"INFO {base_name}: {label} fehlt - verwende Wert {value}")
+            else:
+                raise Exception(f"{label}-Map fehlt")
+        
+        # Einfarbige Kanäle (z.B. schwarzes Metallic, weißes AO) nicht dekodieren und skalieren.
+        # Die Probe liest nur PNG ganz (streifenweise); sonst wird erst beim Packen bestätigt,
+        # das ohnehin dekodiert (im Ganzen) bzw. die Wertebereiche mitschreibt (in Streifen)
+        def fold_channel(i, value):
+            lut = channels[i][2]
+            channels[i] = (None, lut[value] if lut else value, None)
+            messages.append(f"INFO {base_name}: {('AO', 'Roughness', 'Metallic')[i]} einfarbig ({channels[i][1]})")
+        
+        candidates = {}  # Kanal -> Pfad, Probe einfarbig, aber noch unbestätigt
+        if settings["fold_uniform_maps"]:
+            for i, (path, value, lut) in enumerate(channels):
+                if path:
+                    possible, value = probe_uniform_channel(path)
+                    if value is not None:
+                        fold_channel(i, value)
+                    elif possible:
+                        candidates[i] = path
+        
+        os.makedirs(output_dir, exist_ok=True)
+        
+        def uniform_orm():
+            return settings["fold_uniform_maps"] and not any(path for path, value, lut in channels)
+        
+        # Über dem Speicherbudget streifenweise packen statt die Quellen komplett zu dekodieren
+        streamed = False
+        decoded = ChannelSources(final_size)
+        if not uniform_orm():
+            budget = settings["orm_memory_budget"] * 2**20 // max(1, settings["orm_workers"])
+            source_sizes = [dimensions[map_type] or probe_image_size(path) or final_size
+                            for map_type, (path, value, lut) in zip((ao_type, "roughness", "metallic"), channels)
+                            if path]
+            streamed = budget and estimate_orm_memory(source_sizes, final_size, len(outputs)) > budget
+            if streamed:
+                extrema = {}
+                strip_height = pack_orm_streamed(orm_layouts(outputs, channels), final_size, settings, budget,
+                                                 messages, extrema if candidates else None)
+                messages.append(f"INFO {base_name}: in Streifen zu {strip_height} Zeilen gepackt")
+                for i, path in candidates.items():
+                    low, high = extrema[path]
+                    if low == high:
+                        fold_channel(i, low)
+            else:
+                for i, path in candidates.items():
+                    low, high = decoded.source(path).getextrema()
+                    if low == high:
+                        fold_channel(i, low)
+                        del decoded.decoded[path]
+        
+        if uniform_orm():
+            # Auch schon in Streifen gepackte Ausgaben werden durch die kleine Textur ersetzt
+            final_size = (UNIFORM_TEXTURE_SIZE, UNIFORM_TEXTURE_SIZE)
+            decoded = ChannelSources(final_size)
+            streamed = False
+            messages.append(f"INFO {base_name}: ORM einfarbig - {UNIFORM_TEXTURE_SIZE}x{UNIFORM_TEXTURE_SIZE}-Textur")
+        
+        if not streamed:
+            for output, layout_channels in orm_layouts(outputs, channels):
+                try:
+                    packed = PACKING_ENGINES[settings["packing_engine"]](layout_channels, final_size, decoded)
+                except ImportError:
+                    messages.append(f"INFO {base_name}: NumPy nicht installiert - packe mit Pillow")
+                    packed = pack_orm_pillow(layout_channels, final_size, decoded)
+                if encoder:
+                    encoder.submit(job["output_file"], packed, output["file"], output["format"],
+                                   settings["compression_quality"], settings["encoder_profile"])
+                else:
+                    save_image(packed, output["file"], output["format"], settings["compression_quality"],
+                               settings["encoder_profile"])
+        
+        if len(outputs) > 1:
+            messages.append(f"ERFOLG: {base_name} ({', '.join(output['name'] for output in outputs)})")
+        else:
+            messages.append(f"ERFOLG: {base_name}")
+        return True, messages
+        
+    except Exception as e:
+        messages.append(f"FEHLER {base_name}: {str(e)}")
+        return False, messages
+
+def finish_orm_job(encoder, job, success, messages):
+    """Wartet, bis die Ausgaben von build_orm_map(job, encoder) gespeichert sind"""
+    errors = encoder.finish(job["output_file"])
+    if errors and success:
+        messages[-1] = f"FEHLER {job['base_name']}: {str(errors[0])}"
+        success = False
+    return job, success, messages
+
+def run_orm_jobs(jobs, workers=1):
+    """Verarbeitet ORM-Jobs seriell oder verteilt auf einen ProcessPoolExecutor.
+    
+    Liefert (job, erfolg, meldungen) in Fertigstellungs-Reihenfolge.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        # Seriell wird im Thread-Pool gespeichert, während schon die nächsten Materialien
+        # dekodiert werden; gemeldet (und ins Journal übernommen) erst nach dem Speichern
+        with ImageEncoder() as encoder:
+            saving = []
+            for job in jobs:
+                saving.append((job, *build_orm_map(job, encoder)))
+                if len(saving) > ENCODE_WORKERS:
+                    yield finish_orm_job(encoder, *saving.pop(0))
+            while saving:
+                yield finish_orm_job(encoder, *saving.pop(0))
+        return
+    
+    # spawn statt fork: der GUI-Prozess hat laufende Threads und einen Tk-Interpreter
+    context = multiprocessing.get_context("spawn")
+    workers = min(workers, len(jobs))
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    # Nur wenige Jobs im Voraus einreichen: hält der Aufrufer an (Pause, Vorrang eines
+    # interaktiven Jobs) oder schließt den Generator (Abbruch), ruhen die Worker bald
+    remaining = iter(jobs)
+    futures = {}
+    
+    def submit_next():
+        job = next(remaining, None)
+        if job is not None:
+            futures[pool.submit(build_orm_map, job)] = job
+    
+    try:
+        for _ in range(workers * 2):
+            submit_next()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = futures.pop(future)
+                try:
+                    success, messages = future.result()
+                except Exception as e:  # z.B. abgestürzter Worker-Prozess
+                    success, messages = False, [f"FEHLER {job['base_name']}: {str(e)}"]
+                submit_next()
+                yield job, success, messages
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+def load_suffix_config(log=print):
+    """Lädt Suffix-Definitionen aus JSON-Datei (legt sie bei Bedarf mit Standardwerten an)"""
+    config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "texture_suffixes.json")
+    
+    # Standard-Fallback falls JSON fehlt
+    default_config = {
+        "suffixes": {
+            "albedo": ["albedo", "Albedo", "ALBEDO", "alb", "Alb", "ALB", "base", "Base", "BASE",
+                      "basecolor", "BaseColor", "BASECOLOR", "color", "Color", "COLOR",
+                      "col", "Col", "COL", "diffuse", "Diffuse", "DIFFUSE", "diff", "Diff", "DIFF"],
+            "normal": ["normal", "Normal", "NORMAL", "NormalGL", "NormalDX", "nor_gl", "nor_dx",
+                      "norrmal", "norm", "Norm", "NRM", "Nrm", "nrm", "nor", "Nor", "NOR"],
+            "ao": ["ao", "AO", "Ao", "ambient", "Ambient", "AMBIENT", "occlusion", "Occlusion",
+                  "OCCLUSION", "AmbientOcclusion", "ambientOcclusion", "Occlusionc", "ambient-occlusion"],
+            "roughness": ["roughness", "Roughness", "ROUGHNESS", "rough", "Rough", "ROUGH",
+                         "roughnness", "rgh", "RGH", "Rgh", "REFL", "Refl", "refl",
+                         "gloss", "Gloss", "GLOSS"],
+            "metallic": ["metallic", "Metallic", "METALLIC", "metal", "Metal", "METAL", "metalic",
+                        "metallness", "Metallness", "metalness", "Metalness", "mtl", "MTL", "Mtl",
+                        "Metalness", "specular", "Specular", "SPECULAR"],
+            "height": ["height", "Height", "HEIGHT", "disp", "Disp", "DISP",
+                      "displacement", "Displacement", "DISPLACEMENT", "bump", "Bump", "BUMP"],
+            "emission": ["emission", "Emission", "EMISSION", "emissive", "Emissive", "EMISSIVE",
+                        "emiss", "Emiss", "emis", "Emis", "emi", "Emi", "glow", "Glow", "GLOW"]
+        },
+        "extensions": ["png", "jpg", "jpeg", "jp2"],
+        "separators": ["_", "-"],
+        "resolutions": ["128", "256", "512", "1024", "2048"],
+        "packing_layouts": PACKING_LAYOUTS,
+        "channel_transforms": {map_type: [] for map_type in LAYOUT_SOURCES}
+    }
+    
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                log(f"✓ Suffix-Konfiguration geladen: {config_file}")
+                return config
+        # Erstelle Standard-Konfigurationsdatei
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": "1.0",
+                "description": "Texture suffix definitions - Edit to add custom naming conventions",
+                **default_config,
+                "comments": {
+                    "albedo": "Base color / diffuse textures",
+                    "normal": "Normal maps (OpenGL format preferred)",
+                    "ao": "Ambient Occlusion maps",
+                    "roughness": "Roughness maps (also detects gloss maps for inversion)",
+                    "metallic": "Metallic maps (also legacy specular)",
+                    "height": "Height/Displacement/Bump maps",
+                    "emission": "Emissive/Glow maps",
+                    "packing_layouts": "Channel packing layouts (R, G, B[, A]): map name (ao, roughness, metallic), "
+                                       "{\"source\": name, \"invert\": true} or a constant 0-255",
+                    "channel_transforms": "Per-map steps applied before packing, in order: {\"invert\": true}, "
+                                          "{\"levels\": [in_min, in_max, out_min, out_max]}, {\"gamma\": g}, "
+                                          "{\"clamp\": [min, max]}, {\"curve\": [[x, y], ...]}"
+                }
+            }, f, indent=2, ensure_ascii=False)
+        log(f"✓ Standard-Konfiguration erstellt: {config_file}")
+    except Exception as e:
+        log(f"⚠ Fehler beim Laden der Suffix-Konfiguration: {e}")
+        log("  Verwende eingebaute Standard-Werte")
+    return default_config
+
+def compile_suffix_matcher(config, log=print):
+    """Kompiliert die Suffixe einmal zu einem Matcher und meldet Mehrdeutigkeiten"""
+    matcher = SuffixMatcher(config)
+    if matcher.ambiguities:
+        log(f"⚠ {len(matcher.ambiguities)} mehrdeutige Suffixe in der Konfiguration:")
+        for message in matcher.ambiguities:
+            log(f"  - {message}")
+    return matcher
+
+# Job-Scheduler: interaktive Jobs (ein Material) vor Batch-Jobs, gleichzeitig höchstens
+# JOB_BATCH_LANES Batch-Jobs und nie zwei mit überlappenden Ausgabeordnern
+JOB_LANES = ("interactive", "batch")
+JOB_BATCH_LANES = 2
+JOB_HISTORY = 8  # beendete Jobs, die noch in der Liste stehen
+JOB_GATE_POLL = 0.2  # Sekunden; Batch-Jobs prüfen beim Warten auf interaktive Jobs den Abbruch
+
+class JobCancelled(BaseException):
+    """Abbruch über JobControl.cancel(). Wie KeyboardInterrupt von BaseException abgeleitet,
+    damit die except-Exception-Blöcke pro Material den Abbruch nicht verschlucken."""
+
+class JobControl:
+    """Abbruch- und Pause-Schalter eines Jobs; die Pipeline fragt ihn vor jedem Material ab"""
+    
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.running = threading.Event()
+        self.running.set()
+        self.gate = None  # vom Scheduler gesetzt: hält Batch-Jobs an, solange interaktive laufen
+    
+    @property
+    def paused(self):
+        return not self.running.is_set()
+    
+    def pause(self):
+        self.running.clear()
+    
+    def resume(self):
+        self.running.set()
+    
+    def cancel(self):
+        self.cancelled.set()
+        self.running.set()  # pausierten Job aufwecken, damit er den Abbruch bemerkt
+    
+    def checkpoint(self):
+        """Wartet bei Pause und vor interaktiven Jobs; wirft JobCancelled nach cancel()"""
+        self.running.wait()
+        if self.gate:
+            self.gate(self)
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+def paths_overlap(a, b):
+    """True, wenn beide Pfade gleich sind oder einer im anderen liegt"""
+    a = os.path.join(os.path.normcase(os.path.abspath(a)), "")
+    b = os.path.join(os.path.normcase(os.path.abspath(b)), "")
+    return a.startswith(b) or b.startswith(a)
+
+class SchedulerJob:
+    """Ein Auftrag im JobScheduler; function(control) läuft in einem eigenen Thread"""
+    
+    def __init__(self, job_id, name, function, outputs, lane):
+        self.id = job_id
+        self.name = name
+        self.function = function
+        self.outputs = [path for path in outputs if path]
+        self.lane = lane
+        self.control = JobControl()
+        self.state = "wartet"
+        self.blocked_by = None  # Job mit überlappendem Ausgabeordner, auf den gewartet wird
+        self.result = None
+        self.error = None
+    
+    def conflicts(self, other):
+        return any(paths_overlap(a, b) for a in self.outputs for b in other.outputs)
+    
+    def describe(self):
+        state = "pausiert" if self.state == "läuft" and self.control.paused else self.state
+        if self.blocked_by:
+            state += f" (Ausgabe belegt von #{self.blocked_by.id})"
+        return f"#{self.id} {self.name}: {state}"
+
+class JobScheduler:
+    """Warteschlange für lange Operationen mit Abbruch, Pause und Konflikterkennung.
+    
+    Interaktive Jobs laufen sofort (einer zur Zeit); laufende Batch-Jobs halten dafür am
+    nächsten Material an. Batch-Jobs starten in Einreihungsreihenfolge, sobald ein Platz
+    frei ist und kein laufender oder früher eingereihter Job in dieselben Ordner schreibt.
+    on_change(job) wird bei jeder Zustandsänderung aus dem jeweiligen Thread aufgerufen.
+    """
+    
+    def __init__(self, batch_lanes=JOB_BATCH_LANES, on_change=None):
+        self.batch_lanes = batch_lanes
+        self.on_change = on_change or (lambda job: None)
+        self.condition = threading.Condition()
+        self.pending = []
+        self.running = []
+        self.finished = []
+        self.next_id = 1
+    
+    def submit(self, name, function, outputs=(), lane="batch"):
+        if lane not in JOB_LANES:
+            raise ValueError(f"Unbekannte Job-Spur: {lane}")
+        with self.condition:
+            job = SchedulerJob(self.next_id, name, function, outputs, lane)
+            self.next_id += 1
+            if lane == "batch":
+                job.control.gate = self.yield_to_interactive
+            self.pending.append(job)
+            started = self.dispatch()
+        self.on_change(job)
+        for other in started:
+            self.on_change(other)
+        return job
+    
+    def queue_order(self):
+        """Eingereihte Jobs: interaktive zuerst, sonst in Einreihungsreihenfolge"""
+        return sorted(self.pending, key=lambda job: (JOB_LANES.index(job.lane), job.id))
+    
+    def dispatch(self):
+        """Startet alle Jobs, die jetzt laufen dürfen (Aufruf mit gehaltener Condition)"""
+        started = []
+        batch_running = [job for job in self.running if job.lane == "batch"]
+        ahead = []  # früher eingereihte Batch-Jobs behalten bei Konflikten ihren Vorrang
+        for job in self.queue_order():
+            if job.lane == "interactive":
+                if any(other.lane == "interactive" for other in self.running + started):
+                    continue
+            else:
+                job.blocked_by = next((other for other in batch_running + ahead if job.conflicts(other)), None)
+                if job.blocked_by or len(batch_running) >= self.batch_lanes:
+                    ahead.append(job)
+                    continue
+                batch_running.append(job)
+            self.pending.remove(job)
+            self.running.append(job)
+            job.state = "läuft"
+            started.append(job)
+            threading.Thread(target=self.run, args=(job,), daemon=True).start()
+        return started
+    
+    def run(self, job):
+        try:
+            job.control.checkpoint()  # vor dem Start pausiert oder abgebrochen
+            job.result = job.function(job.control)
+            job.state = "fertig"
+        except JobCancelled:
+            job.state = "abgebrochen"
+        except Exception as e:
+            job.state = "Fehler"
+            job.error = e
+        with self.condition:
+            self.running.remove(job)
+            self.finished = (self.finished + [job])[-JOB_HISTORY:]
+            started = self.dispatch()
+            self.condition.notify_all()
+        self.on_change(job)
+        for other in started:
+            self.on_change(other)
+    
+    def yield_to_interactive(self, control):
+        """Gate der Batch-Jobs: wartet, solange interaktive Jobs eingereiht sind oder laufen"""
+        with self.condition:
+            job = next((job for job in self.running if job.control is control), None)
+            while (job and not control.cancelled.is_set() and
+                   any(other.lane == "interactive" for other in self.pending + self.running)):
+                if job.state != "zurückgestellt":
+                    job.state = "zurückgestellt"
+                    self.on_change(job)
+                self.condition.wait(JOB_GATE_POLL)
+            if job and job.state == "zurückgestellt":
+                job.state = "läuft"
+                self.on_change(job)
+    
+    def cancel(self, job):
+        """Bricht einen Job ab: eingereihte sofort, laufende am nächsten Material"""
+        with self.condition:
+            job.control.cancel()
+            if job in self.pending:
+                self.pending.remove(job)
+                job.state = "abgebrochen"
+                self.finished = (self.finished + [job])[-JOB_HISTORY:]
+                started = self.dispatch()
+            else:
+                started = []
+            self.condition.notify_all()
+        self.on_change(job)
+        for other in started:
+            self.on_change(other)
+    
+    def jobs(self):
+        """Alle Jobs für die Anzeige: laufende, eingereihte, zuletzt beendete"""
+        with self.condition:
+            return self.running + self.queue_order() + self.finished
+    
+    def active(self):
+        with self.condition:
+            return self.running + self.pending
+
+class ORMPipeline:
+    """Verarbeitung ohne GUI: Laden → fehlende Maps → ORM → Skalierung → glTF.
+    
+    Einstellungen sind ein Dict mit den Namen aus SETTING_DEFAULTS. Log, Status und
+    Fortschritt gehen an Callbacks, damit GUI und Kommandozeile dieselbe Logik nutzen.
+    Jede Operation gibt eine Zusammenfassung als Dict zurück.
+    """
+    
+    def __init__(self, input_dir, output_dir="", settings=None, suffix_config=None, suffix_matcher=None,
+                 materials=None, log=print, status=None, progress=None, control=None):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.settings = {**SETTING_DEFAULTS, **(settings or {})}
+        self.log = log
+        self.status = status or (lambda text: None)
+        self.progress = progress or (lambda value: None)
+        self.control = control or JobControl()  # Abbruch/Pause zwischen zwei Materialien
+        self.suffix_config = suffix_config if suffix_config is not None else load_suffix_config(log)
+        self.suffix_matcher = suffix_matcher or compile_suffix_matcher(self.suffix_config, log)
+        self.texture_index = TextureIndex(self.suffix_matcher)
+        self.materials = materials if materials is not None else MaterialStore()
+    
+    @property
+    def extension(self):
+        return self.settings["output_format"].lower()
+    
+    def save_image(self, img, path):
+        """Speichert Bild im gewählten Format mit Kompression"""
+        save_image(img, path, self.settings["output_format"], self.settings["compression_quality"],
+                   self.settings["encoder_profile"])
+    
+    def find_texture_file(self, directory, base_name, map_type):
+        """Sucht die bevorzugte Datei eines Map-Typs über den Verzeichnis-Index"""
+        return self.texture_index.lookup(directory, base_name, map_type)
+    
+    def packing_layouts(self):
+        """Gewählte Packing-Layouts (Einstellung packing_layouts, Definitionen aus der Konfiguration)"""
+        return resolve_packing_layouts(self.suffix_config, self.settings["packing_layouts"], self.log)
+    
+    def channel_transforms(self):
+        """Transformationsketten je Map-Typ aus der Konfiguration"""
+        return resolve_channel_transforms(self.suffix_config, self.log)
+    
+    def orm_output_dir(self):
+        """Zielordner der ORM-Maps; bei gesetzter Zielauflösung ein Unterordner"""
+        if self.settings["target_resolution"] != "original":
+            return os.path.join(self.output_dir, self.settings["target_resolution"])
+        return self.output_dir
+    
+    def target_size(self):
+        """Zielauflösung in Pixeln oder None bei original"""
+        if self.settings["target_resolution"] == "original":
+            return None
+        return int(self.settings["target_resolution"])
+    
+    def selection_size(self):
+        """Auflösung für die Wahl zwischen Varianten: bevorzugte Auflösung, bei auto die Zielauflösung"""
+        if self.settings["preferred_resolution"] != "auto":
+            return int(self.settings["preferred_resolution"])
+        return self.target_size()
+    
+    def select_texture_file(self, directory, base_name, map_type, source_choices):
+        """Wählt bei mehreren Auflösungsvarianten die kleinste, die mindestens die
+        Zielauflösung hat, damit nicht unnötig 8k dekodiert wird. Ohne Ziel (Original)
+        oder wenn keine reicht, wird die größte Variante genommen."""
+        target = self.selection_size()
+        variants = self.texture_index.resolution_variants(directory, base_name, map_type)
+        if len(variants) < 2:
+            return self.find_texture_file(directory, base_name, map_type)
+        fitting = [variant for variant in variants if target and variant[0] >= target]
+        side, _, path = min(fitting) if fitting else min(variants, key=lambda v: (-v[0], v[1]))
+        goal = f"{target}px" if target else "Original"
+        self.log(f"Quelle {base_name} {map_type}: {os.path.basename(path)} ({side}px) für Ziel {goal} "
+                 f"- Varianten: {', '.join(str(v[0]) for v in sorted(variants))}")
+        source_choices.append({"material": base_name, "map_type": map_type, "file": path,
+                               "size": side, "target": target,
+                               "variants": " ".join(str(v[0]) for v in sorted(variants))})
+        return path
+    
+    def load_textures(self):
+        import shutil
+        input_dir = self.input_dir
+        output_dir = self.output_dir
+        self.status("Suche Texturen...")
+        # Verzeichnisbaum einmal indizieren; unveränderte Ordner kommen aus dem Scan-Katalog
+        catalog = None
+        try:
+            catalog = ScanCatalog(output_dir or input_dir, self.suffix_config)
+        except Exception as e:
+            self.log(f"WARNUNG: Scan-Katalog nicht verfügbar: {e}")
+        self.texture_index = TextureIndex(self.suffix_matcher)
+        relisted = self.texture_index.scan(input_dir, recursive=self.settings["recursive_search"], catalog=catalog)
+        summary = {"textures": self.texture_index.file_count(), "dirs": len(self.texture_index.dirs),
+                   "relisted": relisted, "materials": 0}
+        self.log(f"Indiziert: {summary['textures']} Texturen in {summary['dirs']} Ordnern "
+                 f"({relisted} neu gelistet)")
+        if self.suffix_matcher.ambiguities:
+            self.log(f"Hinweis: {len(self.suffix_matcher.ambiguities)} mehrdeutige Suffixe (siehe Konsole)")
+        # Alle Albedo-Texturen finden (Basisname liefert der Matcher direkt)
+        # Auflösungsvarianten (z.B. brick_diff_1k/_4k) ergeben ein gemeinsames Material
+        albedo_groups = {}
+        for directory, parsed in self.texture_index.iter_textures("albedo"):
+            albedo_groups.setdefault((directory, parsed.base.casefold()), (directory, parsed.base))
+        if not albedo_groups:
+            if catalog:
+                catalog.close()
+            self.log("Keine Texturen gefunden!")
+            self.status("Fehler: Keine Texturen gefunden")
+            return summary
+        # Löse jedes Material einmal auf und kopiere alle relevanten Texturen ins Ausgabe-Verzeichnis
+        materials = MaterialStore()
+        source_choices = []
+        for texture_dir, base_name_clean in albedo_groups.values():
+            try:
+                self.control.checkpoint()
+            except JobCancelled:
+                if catalog:
+                    catalog.close()
+                raise
+            material = MaterialRecord(base_name_clean, output_dir if output_dir else texture_dir)
+            material.resolutions = sorted({variant[0] for variant in
+                                           self.texture_index.resolution_variants(texture_dir, base_name_clean, "albedo")})
+            for map_type in MAP_TYPES:
+                found_file = self.select_texture_file(texture_dir, base_name_clean, map_type, source_choices)
+                if not found_file:
+                    continue
+                # Gewählte Quelle immer per stat prüfen - in-place Änderungen sieht das Listing nicht
+                info = self.texture_index.refresh(found_file)
+                if info is None:
+                    continue
+                # Abmessungen (nur Header) einmalig erfassen
+                self.texture_index.dimensions(found_file)
+                found_file_out = found_file
+                if output_dir and os.path.abspath(os.path.dirname(found_file)) != os.path.abspath(output_dir):
+                    dst = os.path.join(output_dir, os.path.basename(found_file))
+                    try:
+                        # Unveränderte Kopien (gleiche Größe und mtime) nicht erneut kopieren
+                        st = os.stat(dst) if os.path.exists(dst) else None
+                        if not st or st.st_size != info[0] or st.st_mtime_ns != info[1]:
+                            with atomic_output(dst) as temp_path:
+                                shutil.copy2(found_file, temp_path)
+                        found_file_out = dst
+                    except Exception as copy_err:
+                        self.log(f"WARNUNG: Konnte {found_file} nicht kopieren: {copy_err}")
+                material.set_map(map_type, found_file_out, info)
+            materials.append(material)
+        if catalog:
+            catalog.store_files(self.texture_index.refreshed)
+            catalog.store_dimensions(self.texture_index.probed)
+            catalog.close()
+        if source_choices and self.settings["export_log"]:
+            self.export_process_log(source_choices, "source_selection")
+        self.materials = materials
+        summary["materials"] = len(materials)
+        variants = sum(1 for material in materials if len(material.resolutions) > 1)
+        self.log(f"Gefunden: {len(self.materials)} Textur-Sets"
+                 + (f" ({variants} mit mehreren Auflösungen)" if variants else ""))
+        self.status(f"{len(self.materials)} Texturen geladen")
+        return summary
+    
+    def generate_missing_maps(self):
+        """Generiert nur fehlende Einzeltexturen (AO, Roughness, Metallic) als separate Dateien"""
+        self.status("Generiere fehlende Maps...")
+        self.progress(0)
+        
+        generated = 0
+        skipped = 0
+        log_data = []
+        fill_maps = {}  # (größe, wert, format, qualität) -> zuerst geschriebene Datei
+        fill_stats = {}
+        
+        def write_fill_map(size, value, path):
+            # Jede einfarbige Map wird einmal kodiert, weitere Dateien teilen sich die Daten
+            key = (size, value, self.settings["output_format"], self.settings["compression_quality"],
+                   self.settings["encoder_profile"])
+            source = fill_maps.get(key)
+            if source and os.path.exists(source):
+                with atomic_output(path) as temp_path:
+                    method = clone_file(source, temp_path)
+            else:
+                self.save_image(Image.new("L", size, value), path)
+                fill_maps[key] = path
+                method = "kodiert"
+            fill_stats[method] = fill_stats.get(method, 0) + 1
+        
+        for i, material in enumerate(self.materials):
+            self.control.checkpoint()
+            base_name = material.base_name
+            texture_dir = material.dir
+            output_dir = self.output_dir or texture_dir
+            
+            progress_percent = (i / len(self.materials)) * 100
+            self.progress(progress_percent)
+            self.status(f"Prüfe: {base_name}")
+            
+            # Prüfe welche Maps fehlen (aus dem beim Laden aufgelösten Material)
+            ao_file = material.path("ao")
+            roughness_file = material.path("roughness")
+            metallic_file = material.path("metallic")
+            
+            # Bestimme Zielgröße (Header-Probe vom Laden)
+            target_size = material.dimensions("albedo") or (1024, 1024)
+            
+            created_maps = []
+            
+            # Erstelle fehlende AO
+            if not ao_file:
+                ao_value = self.settings["default_ao_value"]
+                ao_path = os.path.join(output_dir, f"{base_name}_ao.{self.extension}")
+                os.makedirs(output_dir, exist_ok=True)
+                write_fill_map(target_size, ao_value, ao_path)
+                material.set_map("ao", ao_path)
+                created_maps.append("AO")
+            
+            # Erstelle fehlende Roughness oder invertiere Gloss
+            if not roughness_file or (roughness_file and "gloss" in os.path.basename(roughness_file).lower() and self.settings["invert_gloss"]):
+                rough_path = os.path.join(output_dir, f"{base_name}_roughness.{self.extension}")
+                os.makedirs(output_dir, exist_ok=True)
+                if roughness_file and "gloss" in os.path.basename(roughness_file).lower():
+                    # Invertiere Gloss zu Roughness
+                    gloss_img = Image.open(roughness_file).convert("L")
+                    rough_img = ImageOps.invert(gloss_img)
+                    self.save_image(rough_img, rough_path)
+                    created_maps.append("Roughness (invertiert)")
+                else:
+                    # Erstelle neue
+                    rough_value = self.settings["default_roughness_value"]
+                    write_fill_map(target_size, rough_value, rough_path)
+                    created_maps.append("Roughness")
+                
+                material.set_map("roughness", rough_path)
+            
+            # Erstelle fehlende Metallic
+            if not metallic_file:
+                metal_value = self.settings["default_metallic_value"]
+                metal_path = os.path.join(output_dir, f"{base_name}_metallic.{self.extension}")
+                os.makedirs(output_dir, exist_ok=True)
+                write_fill_map(target_size, metal_value, metal_path)
+                material.set_map("metallic", metal_path)
+                created_maps.append("Metallic")
+            
+            if created_maps:
+                self.log(f"Erstellt für {base_name}: {', '.join(created_maps)}")
+                generated += 1
+                log_data.append({"material": base_name, "created": ", ".join(created_maps)})
+            else:
+                skipped += 1
+        
+        self.progress(100)
+        self.status("Fehlende Maps generiert!")
+        self.log("=" * 50)
+        self.log(f"Materialien mit erstellten Maps: {generated}, Vollständig: {skipped}")
+        if fill_stats:
+            self.log("Einfarbige Maps: " + ", ".join(f"{count} {method}" for method, count in sorted(fill_stats.items())))
+        
+        # Export Log
+        if self.settings["export_log"] and log_data:
+            self.export_process_log(log_data, "missing_maps")
+        
+        return {"generated": generated, "complete": skipped, "fill_maps": fill_stats}
+    
+    def export_process_log(self, log_data, operation_name):
+        """Exportiert Verarbeitungslog"""
+        try:
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_dir = self.output_dir or self.input_dir
+            log_file = None
+            
+            if self.settings["log_format"] == "CSV":
+                log_file = os.path.join(output_dir, f"log_{operation_name}_{timestamp}.csv")
+                with open(log_file, 'w', newline='', encoding='utf-8') as f:
+                    if log_data:
+                        writer = csv.DictWriter(f, fieldnames=log_data[0].keys())
+                        writer.writeheader()
+                        writer.writerows(log_data)
+                        
+            elif self.settings["log_format"] == "JSON":
+                log_file = os.path.join(output_dir, f"log_{operation_name}_{timestamp}.json")
+                with open(log_file, 'w', encoding='utf-8') as f:
+                    json.dump(log_data, f, indent=2, ensure_ascii=False)
+                    
+            elif self.settings["log_format"] == "TXT":
+                log_file = os.path.join(output_dir, f"log_{operation_name}_{timestamp}.txt")
+                with open(log_file, 'w', encoding='utf-8') as f:
+                    for entry in log_data:
+                        f.write(f"{entry}\n")
+            
+            if log_file:
+                self.log(f"Log gespeichert: {os.path.basename(log_file)}")
+            
+        except Exception as e:
+            self.log(f"Log-Export-Fehler: {str(e)}")
+    
+    def open_journal(self, directory, operation, params):
+        """Journal eines Batch-Laufs; bei resume_batch werden fertige Materialien übernommen"""
+        journal = BatchJournal(directory, operation, params, self.settings["resume_batch"])
+        if journal.mismatch:
+            self.log(f"WARNUNG: Journal {os.path.basename(journal.path)} passt nicht zu den Einstellungen - "
+                     "starte neu")
+        if journal.stale_parts:
+            self.log(f"Abgebrochene Schreibvorgänge entfernt: {journal.stale_parts} .part-Dateien")
+        return journal
+    
+    def generate_orm_maps(self):
+        """Erzeugt ORM-Maps aller Materialien (bei Zielauflösung skaliert in einen Unterordner)"""
+        output_dir = self.orm_output_dir()
+        os.makedirs(output_dir, exist_ok=True)
+        
+        self.status("Generiere ORM-Maps...")
+        self.progress(0)
+        
+        processed = 0
+        errors = 0
+        
+        # Verwende Skalierung wenn gesetzt
+        target_size = self.target_size()
+        
+        layouts = self.packing_layouts()
+        transforms = self.channel_transforms()
+        jobs = [make_orm_job(material, output_dir, self.settings, target_size, layouts, transforms)
+                for material in self.materials]
+        
+        # Build-Manifest: nur Materialien mit geänderten Eingaben oder Einstellungen neu bauen
+        manifest = BuildManifest(output_dir)
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            fingerprints = list(pool.map(lambda job: manifest.fingerprint(job["files"], orm_build_params(job)), jobs))
+        journal = self.open_journal(output_dir, "orm", {"target_size": target_size, "layouts": layouts,
+                                                         "transforms": transforms, **{
+            name: self.settings[name] for name in ORM_BUILD_SETTINGS}})
+        pending = []
+        skipped = 0
+        resumed = 0
+        adopted = 0
+        for job, fingerprint in zip(jobs, fingerprints):
+            job["fingerprint"] = fingerprint
+            output_files = [output["file"] for output in job["outputs"]]
+            entry = journal.completed.get(job["output_file"])
+            if (entry and entry.get("fingerprint") == fingerprint
+                    and all(os.path.exists(output_file) for output_file in output_files)):
+                # Im abgebrochenen Lauf bereits fertig geworden
+                for output_file in output_files:
+                    manifest.record(output_file, fingerprint)
+                resumed += 1
+                continue
+            if not self.settings["overwrite_existing"] and all(
+                    manifest.is_current(output_file, fingerprint) for output_file in output_files):
+                skipped += 1
+                continue
+            if not self.settings["overwrite_existing"] and all(
+                    manifest.is_untracked(output_file) for output_file in output_files):
+                # Vorhandene Ausgaben ohne Manifest-Eintrag (älterer Lauf, von Hand) übernehmen;
+                # neu gebaut wird erst, wenn sich Eingaben oder Einstellungen ändern
+                for output_file in output_files:
+                    manifest.record(output_file, fingerprint)
+                adopted += 1
+                skipped += 1
+                continue
+            job["rebuild"] = True
+            pending.append(job)
+        if resumed:
+            self.log(f"Fortgesetzt: {resumed} Materialien bereits im abgebrochenen Lauf erzeugt")
+        if skipped:
+            self.log(f"Unverändert (übersprungen): {skipped} Materialien")
+        if adopted:
+            self.log(f"Davon vorhandene Ausgaben ohne Manifest-Eintrag übernommen: {adopted}")
+        
+        workers = max(1, self.settings["orm_workers"])
+        if workers > 1 and len(pending) > 1:
+            self.log(f"ORM-Erzeugung mit {workers} Worker-Prozessen")
+        
+        results = run_orm_jobs(pending, workers)
+        try:
+            for i, (job, success, messages) in enumerate(results, 1):
+                for message in messages:
+                    self.log(message)
+                
+                progress_percent = (i / len(pending)) * 100
+                self.progress(progress_percent)
+                self.status(f"Verarbeitet: {job['base_name']}")
+                
+                if success:
+                    processed += 1
+                    for output in job["outputs"]:
+                        manifest.record(output["file"], job["fingerprint"])
+                    journal.record(job["output_file"], fingerprint=job["fingerprint"])
+                else:
+                    errors += 1
+                self.control.checkpoint()
+        finally:
+            # Bei Abbruch: nicht gestartete Jobs verwerfen, Fertiges bleibt im Journal
+            results.close()
+            journal.close()
+            manifest.save()
+        
+        self.progress(100)
+        self.status("Fertig!")
+        self.log("=" * 50)
+        self.log(f"Erfolgreich: {processed}, Unverändert: {skipped}, Fortgesetzt: {resumed}, Fehler: {errors}")
+        return {"processed": processed, "skipped": skipped, "resumed": resumed, "errors": errors,
+                "output_dir": output_dir}
+    
+    def create_single_orm_map(self, material, output_dir, target_size=None):
+        success, messages = build_orm_map(make_orm_job(material, output_dir, self.settings, target_size,
+                                                       self.packing_layouts(), self.channel_transforms()))
+        for message in messages:
+            self.log(message)
+        return success
+    
+    def batch_scale(self, target_size):
+        """Skaliert alle Texturen auf Zielauflösung und erzeugt daraus ORM- und GLTF-Dateien.
+        
+        Pro Material wird jede Map einmal dekodiert, skaliert und kodiert; die ORM-Map
+        entsteht aus den skalierten Kanälen im Speicher, das GLTF aus den bekannten Ergebnissen.
+        """
+        base_output_dir = self.output_dir or self.input_dir
+        output_dir = os.path.join(base_output_dir, str(target_size))
+        os.makedirs(output_dir, exist_ok=True)
+        size = (target_size, target_size)
+        ext = self.extension
+        
+        self.status(f"Skaliere Texturen auf {target_size}x{target_size}...")
+        self.progress(0)
+        
+        processed = 0
+        total_files = 0
+        orm_created = 0
+        gltf_created = 0
+        resumed = 0
+        errors = 0
+        
+        layouts = self.packing_layouts()
+        orm_layout = gltf_layout(layouts)
+        transforms = self.channel_transforms()
+        luts = {map_type: compile_channel_lut(steps) for map_type, steps in transforms.items()}
+        journal = self.open_journal(output_dir, "scale", {"target_size": target_size, "layouts": layouts,
+                                                           "transforms": transforms, **{
+            name: value for name, value in self.settings.items()
+            if name in ORM_BUILD_SETTINGS or name.startswith("gltf_")}})
+        # Gespeichert wird im Thread-Pool, während die nächsten Maps dekodiert und skaliert werden
+        encoder = ImageEncoder()
+        for i, material in enumerate(self.materials):
+            try:
+                self.control.checkpoint()
+            except JobCancelled:
+                encoder.close()
+                journal.close()
+                raise
+            base_name = material.base_name
+            material_id = os.path.join(material.dir, base_name)
+            
+            progress_percent = (i / len(self.materials)) * 100
+            self.progress(progress_percent)
+            self.status(f"Skaliere: {base_name}")
+            
+            if journal.is_done(material_id):
+                resumed += 1
+                continue
+            
+            failed = False
+            submitted = {}  # map_type bzw. "orm" -> Future des Speicherns
+            channels = {}
+            orm_constant = None
+            
+            # Alle Texturen dieses Materials (beim Laden aufgelöst)
+            for map_type in MAP_TYPES:
+                texture_file = material.path(map_type)
+                if not texture_file or not os.path.exists(texture_file):
+                    continue
+                try:
+                    img = Image.open(texture_file)
+                    
+                    # Nur skalieren wenn nötig
+                    if img.size != size:
+                        # Verwende LANCZOS für beste Qualität beim Verkleinern
+                        # und BICUBIC für Vergrößern
+                        if img.size[0] > target_size:
+                            resample = Image.Resampling.LANCZOS
+                        else:
+                            resample = Image.Resampling.BICUBIC
+                        
+                        img = img.resize(size, resample)
+                    
+                    output_path = os.path.join(output_dir, f"{base_name}_{map_type}.{ext}")
+                    submitted[map_type] = encoder.submit(
+                        material_id, img, output_path, self.settings["output_format"],
+                        self.settings["compression_quality"], self.settings["encoder_profile"])
+                    total_files += 1
+                    
+                    # ORM-Kanäle im Speicher behalten statt sie wieder von der Platte zu lesen
+                    if map_type in ("ao", "roughness", "metallic"):
+                        channels[map_type] = gray_image(img)
+                        if luts.get(map_type):
+                            channels[map_type] = channels[map_type].point(luts[map_type])
+                    
+                except Exception as e:
+                    self.log(f"Fehler bei {base_name}_{map_type}: {str(e)}")
+                    failed = True
+            
+            processed += 1
+            
+            # ORM und weitere Packing-Layouts aus den skalierten Kanälen
+            try:
+                if len(channels) == 3 or self.settings["fill_missing_maps"]:
+                    sources = {map_type: channels.get(map_type) or
+                               Image.new("L", size, self.settings[f"default_{map_type}_value"])
+                               for map_type in LAYOUT_SOURCES}
+                    orm_constant = (uniform_band_values([sources[map_type] for map_type in LAYOUT_SOURCES])
+                                    if self.settings["fold_uniform_maps"] else None)
+                    if orm_constant:
+                        sources = {map_type: Image.new("L", (UNIFORM_TEXTURE_SIZE, UNIFORM_TEXTURE_SIZE), value)
+                                   for map_type, value in zip(LAYOUT_SOURCES, orm_constant)}
+                    band_size = sources["ao"].size
+                    inverted = {}
+                    for layout in layouts:
+                        bands = []
+                        for source, value, invert in layout["channels"]:
+                            if source is None:
+                                bands.append(Image.new("L", band_size, value))
+                            elif invert:
+                                if source not in inverted:
+                                    inverted[source] = ImageOps.invert(sources[source])
+                                bands.append(inverted[source])
+                            else:
+                                bands.append(sources[source])
+                        output_format = layout_format(layout, self.settings["output_format"])
+                        future = encoder.submit(
+                            material_id, Image.merge("RGBA" if len(bands) == 4 else "RGB", bands),
+                            os.path.join(output_dir, f"{base_name}_{layout['suffix']}.{output_format.lower()}"),
+                            output_format, self.settings["compression_quality"], self.settings["encoder_profile"])
+                        if layout is orm_layout:
+                            submitted["orm"] = future
+                    orm_created += 1
+                    if len(layouts) > 1:
+                        self.log(f"ORM erstellt: {base_name} ({', '.join(layout['name'] for layout in layouts)})")
+                    else:
+                        self.log(f"ORM erstellt: {base_name}")
+            except Exception as e:
+                self.log(f"Fehler bei ORM für {base_name}: {str(e)}")
+                failed = True
+            channels.clear()
+            for error in encoder.finish(material_id):
+                self.log(f"Fehler beim Speichern ({base_name}): {str(error)}")
+                failed = True
+            # Das GLTF verweist nur auf Dateien, deren Speichern bestätigt ist
+            written = {key for key, future in submitted.items() if future.exception() is None}
+            
+            # GLTF aus den geschriebenen Dateien (relative Pfade)
+            try:
+                gltf_textures = {}
+                for map_type, texture_key in [("albedo", "baseColor"), ("normal", "normal"), ("emission", "emission")]:
+                    if map_type in written:
+                        gltf_textures[texture_key] = f"./{target_size}/{base_name}_{map_type}.{ext}"
+                if "orm" in written:
+                    gltf_textures['orm'] = f"./{target_size}/{base_name}_{orm_layout['suffix']}.{ext}"
+                
+                # Erstelle GLTF nur wenn mindestens eine Textur vorhanden ist
+                if gltf_textures:
+                    gltf_data = self.create_gltf_structure(base_name, gltf_textures, orm_constant)
+                    gltf_file = os.path.join(output_dir, f"{base_name}.gltf")
+                    save_json(gltf_data, gltf_file)
+                    
+                    gltf_created += 1
+                    self.log(f"GLTF erstellt: {base_name}.gltf")
+            
+            except Exception as e:
+                self.log(f"Fehler bei GLTF für {base_name}: {str(e)}")
+                failed = True
+            
+            # Nur fehlerfrei abgeschlossene Materialien ins Journal (Fehler beim Fortsetzen erneut versuchen)
+            if not failed:
+                journal.record(material_id)
+            else:
+                errors += 1
+        encoder.close()
+        journal.close()
+        
+        self.progress(100)
+        self.status("Batch-Verarbeitung abgeschlossen!")
+        self.log("=" * 50)
+        self.log("Zusammenfassung:")
+        self.log(f"  Texturen: {total_files}")
+        self.log(f"  ORM-Maps: {orm_created}")
+        self.log(f"  GLTF-Dateien: {gltf_created}")
+        if resumed:
+            self.log(f"  Fortgesetzt (bereits fertig): {resumed}")
+        if errors:
+            self.log(f"  Fehlerhafte Materialien: {errors}")
+        self.log(f"  Zielordner: {output_dir}")
+        return {"materials": processed, "textures": total_files, "orm": orm_created, "gltf": gltf_created,
+                "resumed": resumed, "errors": errors, "output_dir": output_dir}
+    
+    def generate_gltf(self):
+        """Generiert GLTF-Dateien mit allen PBR-Texturen (immer ins Ausgabeverzeichnis)"""
+        import shutil
+        self.status("Generiere GLTF-Dateien...")
+        self.progress(0)
+        output_dir = self.output_dir or os.getcwd()
+        os.makedirs(output_dir, exist_ok=True)
+        orm_layout = gltf_layout(self.packing_layouts())
+        if not orm_layout:
+            self.log("WARNUNG: Kein Packing-Layout mit glTF-Kanälen (AO, Roughness, Metallic) gewählt - GLTF ohne ORM")
+        generated = 0
+        errors = 0
+        for i, material in enumerate(self.materials):
+            self.control.checkpoint()
+            base_name = material.base_name
+            progress_percent = (i / len(self.materials)) * 100
+            self.progress(progress_percent)
+            self.status(f"GLTF: {base_name}")
+            try:
+                # Alle Texturen des Materials ins Ausgabeverzeichnis kopieren
+                texture_files = {}
+                for map_type, src in material.maps().items():
+                    if os.path.exists(src):
+                        dst = os.path.join(output_dir, f"{base_name}_{map_type}.{self.extension}")
+                        if not os.path.abspath(src) == os.path.abspath(dst):
+                            try:
+                                with atomic_output(dst) as temp_path:
+                                    shutil.copy2(src, temp_path)
+                            except Exception as copy_err:
+                                self.log(f"WARNUNG: Konnte {src} nicht kopieren: {copy_err}")
+                        texture_files[map_type] = dst
+                # ORM Map ggf. erzeugen oder kopieren
+                orm_file = orm_layout and os.path.join(output_dir, f"{base_name}_{orm_layout['suffix']}.{self.extension}")
+                if orm_file and not os.path.exists(orm_file):
+                    # Versuche ORM zu erzeugen
+                    self.create_single_orm_map(material, output_dir)
+                orm_constant = None
+                if orm_file and os.path.exists(orm_file):
+                    texture_files['orm'] = orm_file
+                    if self.settings["fold_uniform_maps"]:
+                        orm_constant = uniform_orm_values(orm_file)
+                # Erstelle Texture-Dictionary für GLTF
+                gltf_textures = {}
+                if 'albedo' in texture_files:
+                    gltf_textures['baseColor'] = f"./{os.path.basename(texture_files['albedo'])}"
+                if 'normal' in texture_files:
+                    gltf_textures['normal'] = f"./{os.path.basename(texture_files['normal'])}"
+                if 'emission' in texture_files:
+                    gltf_textures['emission'] = f"./{os.path.basename(texture_files['emission'])}"
+                if 'orm' in texture_files:
+                    gltf_textures['orm'] = f"./{os.path.basename(texture_files['orm'])}"
+                # GLTF-Datei schreiben
+                gltf_data = self.create_gltf_structure(base_name, gltf_textures, orm_constant)
+                gltf_file = os.path.join(output_dir, f"{base_name}.gltf")
+                save_json(gltf_data, gltf_file)
+                self.log(f"GLTF: {os.path.basename(gltf_file)}")
+                generated += 1
+            except Exception as e:
+                self.log(f"FEHLER GLTF {base_name}: {str(e)}")
+                errors += 1
+        self.progress(100)
+        self.status("GLTF-Generierung abgeschlossen!")
+        self.log("=" * 50)
+        self.log(f"GLTF: {generated} erstellt, {errors} Fehler")
+        return {"generated": generated, "errors": errors, "output_dir": output_dir}
+    
+    def create_gltf_structure(self, material_name, textures, orm_constant=None):
+        """Erstellt GLTF 2.0 JSON-Struktur - kompatibel mit SecondLife/OpenSim.
+        
+        orm_constant: (AO, Roughness, Metallic) einer einfarbigen ORM-Map; Roughness und
+        Metallic werden dann zu Faktoren, die Textur bleibt nur für nicht-weiße Occlusion.
+        """
+        gltf = {
+            "asset": {
+                "generator": "ORM-Maps-Tools NG - Advanced Edition",
+                "version": "2.0"
+            },
+            "scene": 0,
+            "scenes": [{"nodes": [0]}],
+            "nodes": [{"mesh": 0}],
+            "meshes": [{
+                "primitives": [{
+                    "attributes": {
+                        "POSITION": 1,
+                        "TEXCOORD_0": 2
+                    },
+                    "indices": 0,
+                    "material": 0
+                }]
+            }],
+            "materials": [{
+                "doubleSided": self.settings["gltf_double_sided"],
+                "name": material_name,
+                "pbrMetallicRoughness": {
+                    "metallicFactor": self.settings["gltf_metallic_factor"],
+                    "roughnessFactor": self.settings["gltf_roughness_factor"]
+                },
+                "alphaMode": self.settings["gltf_alpha_mode"]
+            }],
+            "textures": [],
+            "images": [],
+            "samplers": [{
+                "magFilter": 9729,
+                "minFilter": 9987,
+                "wrapS": 33648,
+                "wrapT": 33648
+            }],
+            "buffers": [{
+                "uri": "data:application/gltf-buffer;base64,AAABAAIAAQADAAIAAAAAAAAAAAAAAAAAAACAPwAAAAAAAAAAAAAAAAAAgD8AAAAAAACAPwAAgD8AAAAAAAAAAAAAgD8AAAAAAACAPwAAgD8AAAAAAAAAAAAAAAAAAAAAAACAPwAAAAAAAAAA",
+                "byteLength": 108
+            }],
+            "bufferViews": [
+                {
+                    "buffer": 0,
+                    "byteOffset": 0,
+                    "byteLength": 12,
+                    "target": 34963
+                },
+                {
+                    "buffer": 0,
+                    "byteOffset": 12,
+                    "byteLength": 96,
+                    "byteStride": 12,
+                    "target": 34962
+                }
+            ],
+            "accessors": [
+                {
+                    "bufferView": 0,
+                    "byteOffset": 0,
+                    "componentType": 5123,
+                    "count": 6,
+                    "type": "SCALAR",
+                    "max": [3],
+                    "min": [0]
+                },
+                {
+                    "bufferView": 1,
+                    "byteOffset": 0,
+                    "componentType": 5126,
+                    "count": 4,
+                    "type": "VEC3",
+                    "max": [1.0, 1.0, 0.0],
+                    "min": [0.0, 0.0, 0.0]
+                },
+                {
+                    "bufferView": 1,
+                    "byteOffset": 48,
+                    "componentType": 5126,
+                    "count": 4,
+                    "type": "VEC2",
+                    "max": [1.0, 1.0],
+                    "min": [0.0, 0.0]
+                }
+            ]
+        }
+        
+        # Füge Texturen in richtiger Reihenfolge hinzu (wie C# Reference)
+        image_index = 0
+        texture_index = 0
+        
+        # 1. Normal Map (Index 0)
+        if 'normal' in textures:
+            gltf['images'].append({
+                "mimeType": "image/png",
+                "name": f"{material_name}_normal",
+                "uri": textures['normal']
+            })
+            gltf['textures'].append({"source": image_index})
+            gltf['materials'][0]['normalTexture'] = {"index": texture_index}
+            image_index += 1
+            texture_index += 1
+        
+        # 2. Base Color / Albedo (Index 1)
+        if 'baseColor' in textures:
+            gltf['images'].append({
+                "mimeType": "image/png",
+                "name": f"{material_name}_baseColor",
+                "uri": textures['baseColor']
+            })
+            gltf['textures'].append({"source": image_index})
+            gltf['materials'][0]['pbrMetallicRoughness']['baseColorTexture'] = {"index": texture_index}
+            image_index += 1
+            texture_index += 1
+        
+        # Einfarbige ORM-Map: Werte in die Faktoren falten (weißes AO braucht keine Textur)
+        if 'orm' in textures and orm_constant:
+            ao, roughness, metallic = orm_constant
+            pbr = gltf['materials'][0]['pbrMetallicRoughness']
+            pbr['metallicFactor'] = round(self.settings["gltf_metallic_factor"] * metallic / 255, 4)
+            pbr['roughnessFactor'] = round(self.settings["gltf_roughness_factor"] * roughness / 255, 4)
+            if ao == 255:
+                textures = {key: uri for key, uri in textures.items() if key != 'orm'}
+        
+        # 3. ORM Map (Index 2) - WICHTIG: Wird für metallicRoughness UND occlusion verwendet
+        if 'orm' in textures:
+            gltf['images'].append({
+                "mimeType": "image/png",
+                "name": f"{material_name}_orm",
+                "uri": textures['orm']
+            })
+            gltf['textures'].append({"source": image_index})
+            
+            # ORM Format: R=Occlusion, G=Roughness, B=Metallic
+            # MetallicRoughness nutzt G+B Kanäle
+            if not orm_constant:
+                gltf['materials'][0]['pbrMetallicRoughness']['metallicRoughnessTexture'] = {"index": texture_index}
+            # Occlusion nutzt R Kanal
+            gltf['materials'][0]['occlusionTexture'] = {"index": texture_index}
+            image_index += 1
+            texture_index += 1
+        
+        # 4. Emission Map (optional)
+        if 'emission' in textures:
+            gltf['images'].append({
+                "mimeType": "image/png",
+                "name": f"{material_name}_emission",
+                "uri": textures['emission']
+            })
+            gltf['textures'].append({"source": image_index})
+            gltf['materials'][0]['emissiveTexture'] = {"index": texture_index}
+            
+            # Emission Strength
+            strength = self.settings["gltf_emission_strength"]
+            gltf['materials'][0]['emissiveFactor'] = [strength, strength, strength]
+        
+        return gltf
+
+# Vorschau: Kantenlänge bei Zoom 1, Nachbarn in jede Richtung zum Vorladen, Dekodier-Threads
+PREVIEW_SIZE = 200
+PREVIEW_PREFETCH = 2
+PREVIEW_WORKERS = min(4, os.cpu_count() or 1)
+PREVIEW_POLL_MS = 30
+PREVIEW_CACHE_BUDGET = 128 * 2**20  # Bytes dekodierter Vorschaubilder im Speicher
+
+# Vorschaufelder: (Schlüssel, Text wenn die Map fehlt)
+PREVIEW_SLOTS = (("normal", "Normal fehlt"), ("albedo", "Albedo fehlt"), ("ao", "AO fehlt"),
+                 ("roughness", "Roughness fehlt"), ("metallic", "Metallic fehlt"),
+                 ("emission", "Emission fehlt"), ("orm", "Noch nicht generiert"))
+PREVIEW_FALLBACK_TEXTS = {**dict(PREVIEW_SLOTS), "combined": "Albedo fehlt"}
+
+# Eingaben der kombinierten Vorschau (Reihenfolge der Argumente von render_combined_preview)
+COMBINED_PREVIEW_MAPS = ("albedo", "normal", "ao", "roughness", "metallic", "height", "emission")
+
+# Platten-Cache für Vorschaubilder (pro Benutzer, über Sitzungen hinweg); ungenutzte Einträge verfallen
+APP_CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or
+                             os.path.join(os.path.expanduser("~"), ".cache"), "orm-maps-tools-ng")
+THUMBNAIL_CACHE_DIR = os.path.join(APP_CACHE_DIR, "thumbnails")
+THUMBNAIL_CACHE_MAX_AGE = 30 * 24 * 3600  # Sekunden
+
+# Modi, die Vorschau-Cache und Tk direkt darstellen; alles andere wird nach RGB(A) konvertiert
+THUMBNAIL_MODES = ("1", "L", "LA", "P", "RGB", "RGBA")
+
+def thumbnail_bucket(size):
+    """Zoom-Stufe der Cache-Datei: nächste Zweierpotenz ab 128 Pixeln"""
+    return max(128, 1 << (size - 1).bit_length())
+
+def thumbnail_cache_path(path, bucket, cache_dir=THUMBNAIL_CACHE_DIR):
+    """Cache-Datei einer Vorschau; Schlüssel aus Pfad, Zoom-Stufe, mtime und Dateigröße"""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{bucket}|{stat.st_mtime_ns}|{stat.st_size}"
+    name = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, name[:2], f"{name}.png")
+
+def decode_reduced(path, size):
+    """Dekodiert eine Map nur so groß wie für eine Vorschau mit Kantenlänge size nötig: (Bild, Originalgröße)"""
+    with Image.open(path) as img:
+        source_size = img.size
+        if img.format == "JPEG":
+            # DCT-Skalierung schon beim Dekodieren (1/2, 1/4 oder 1/8)
+            img.draft(img.mode, (size, size))
+        elif img.format == "JPEG2000":
+            # Jede Auflösungsstufe des Codestreams halbiert die Kantenlänge (OpenJPEG-Standard: 6 Stufen)
+            reduce = 0
+            while reduce < 5 and max(source_size) >> (reduce + 1) >= size:
+                reduce += 1
+            img.reduce = reduce
+            try:
+                img.load()
+            except OSError:
+                # Codestream mit weniger Auflösungsstufen: voll dekodieren
+                if not reduce:
+                    raise
+                img = Image.open(path)
+                img.load()
+        if img.mode in WIDE_GRAY_MODES:
+            # 16-Bit-Height-Maps: auf 8 Bit abbilden, sonst kann weder reduce noch Tk damit umgehen
+            img = gray_image(img)
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        img.load()  # schon klein genug: thumbnail hat nichts dekodiert
+        if img.mode not in THUMBNAIL_MODES:
+            img = img.convert("RGBA" if "A" in img.mode else "RGB")
+        return img, source_size
+
+def load_preview_thumbnail(path, size, cache_dir=THUMBNAIL_CACHE_DIR):
+    """Verkleinerte Vorschau einer Map: (Bild, Originalgröße). Läuft im Thread-Pool.
+    
+    Zuerst aus dem Platten-Cache; sonst reduziert dekodiert (nie in voller Auflösung
+    für eine 200px-Vorschau) und in der Zoom-Stufe dort abgelegt.
+    """
+    bucket = thumbnail_bucket(size)
+    cache_file = thumbnail_cache_path(path, bucket, cache_dir) if cache_dir else None
+    img = None
+    if cache_file:
+        try:
+            with Image.open(cache_file) as cached:
+                cached.load()
+                source_size = tuple(int(x) for x in cached.info["source_size"].split("x"))
+                img = cached
+            os.utime(cache_file)  # zuletzt benutzt, für prune_thumbnail_cache
+        except (OSError, KeyError, ValueError):
+            img = None
+    if img is None:
+        img, source_size = decode_reduced(path, bucket)
+        if cache_file:
+            try:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                info = PngInfo()
+                info.add_text("source_size", f"{source_size[0]}x{source_size[1]}")
+                with atomic_output(cache_file) as temp_path:
+                    img.save(temp_path, "PNG", pnginfo=info, compress_level=1)
+            except OSError:
+                pass  # ohne Cache weiter
+    if max(img.size) > size:
+        img = img.copy()
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return img, source_size
+
+def prune_thumbnail_cache(cache_dir=THUMBNAIL_CACHE_DIR, max_age=THUMBNAIL_CACHE_MAX_AGE):
+    """Löscht Cache-Dateien, die länger als max_age Sekunden nicht benutzt wurden"""
+    limit = time.time() - max_age
+    removed = 0
+    for directory, subdirs, names in os.walk(cache_dir):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                if os.stat(path).st_mtime < limit:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+    return removed
+
+def image_bytes(img):
+    """Speicherbedarf eines dekodierten Bildes"""
+    return img.size[0] * img.size[1] * len(img.getbands())
+
+class PreviewCache:
+    """Speicherbegrenzter LRU-Cache für Vorschaubilder.
+    
+    Pro Datei ein dekodiertes Basisbild in der größten bisher angeforderten Zoom-Stufe;
+    kleinere Zoom-Stufen werden daraus abgeleitet und mitgezählt. Einträge verfallen,
+    sobald sich mtime oder Größe der Datei ändern (z.B. neu erzeugte ORM-Map). Thread-sicher.
+    """
+    
+    def __init__(self, budget=PREVIEW_CACHE_BUDGET, cache_dir=THUMBNAIL_CACHE_DIR):
+        self.budget = budget
+        self.cache_dir = cache_dir
+        self.entries = {}  # pfad -> Eintrag, älteste zuerst
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def stamp(path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    @staticmethod
+    def combined_stamp(files):
+        """Stempel aller Eingaben einer kombinierten Vorschau (None für fehlende Maps)"""
+        return tuple(PreviewCache.stamp(path) if path else None for path in files)
+    
+    def lookup(self, key, size, stamp):
+        """Gültiger Eintrag, der die Zoom-Stufe abdeckt, oder None (mit gehaltenem Lock aufrufen)"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry["stamp"] != stamp:
+            self.drop(key)
+            self.invalidations += 1
+            return None
+        if thumbnail_bucket(size) > entry["bucket"]:
+            return None
+        self.entries[key] = self.entries.pop(key)  # ans Ende: zuletzt benutzt
+        return entry
+    
+    def store(self, key, stamp, bucket, base, source_size):
+        """Legt ein Basisbild ab (mit gehaltenem Lock aufrufen)"""
+        self.misses += 1
+        if key in self.entries:
+            self.drop(key)
+        self.entries[key] = {"stamp": stamp, "bucket": bucket, "base": base, "source_size": source_size,
+                             "levels": {}, "bytes": image_bytes(base)}
+        self.bytes += image_bytes(base)
+        return self.entries[key]
+    
+    def level(self, entry, size):
+        """Zoom-Stufe aus dem Basisbild (mit gehaltenem Lock aufrufen)"""
+        if size not in entry["levels"]:
+            img = entry["base"]
+            if max(img.size) > size:
+                img = img.copy()
+                img.thumbnail((size, size), Image.Resampling.LANCZOS)
+                entry["bytes"] += image_bytes(img)
+                self.bytes += image_bytes(img)
+            entry["levels"][size] = img
+            self.evict()
+        return entry["levels"][size], entry["source_size"]
+    
+    def cached(self, path, size):
+        """True, wenn die Vorschau ohne Dekodieren verfügbar ist"""
+        try:
+            stamp = self.stamp(path)
+        except OSError:
+            return False
+        with self.lock:
+            return self.lookup(path, size, stamp) is not None
+    
+    def peek(self, path, size):
+        """(Bild, Originalgröße) aus dem Speicher oder None; dekodiert nie"""
+        try:
+            stamp = self.stamp(path)
+        except OSError:
+            return None
+        with self.lock:
+            entry = self.lookup(path, size, stamp)
+            if entry is None:
+                return None
+            self.hits += 1
+            return self.level(entry, size)
+    
+    def get(self, path, size):
+        """(Bild, Originalgröße); bei Fehlgriff aus dem Platten-Cache bzw. reduziert dekodiert"""
+        result = self.peek(path, size)
+        if result:
+            return result
+        stamp = self.stamp(path)
+        bucket = thumbnail_bucket(size)
+        base, source_size = load_preview_thumbnail(path, bucket, self.cache_dir)
+        with self.lock:
+            return self.level(self.store(path, stamp, bucket, base, source_size), size)
+    
+    def cached_combined(self, files):
+        try:
+            stamp = self.combined_stamp(files)
+        except OSError:
+            return False
+        with self.lock:
+            return self.lookup(("combined", files), PREVIEW_SIZE, stamp) is not None
+    
+    def peek_combined(self, files):
+        """Kombinierte Vorschau (Bild, Originalgröße der Albedo) aus dem Speicher oder None"""
+        try:
+            stamp = self.combined_stamp(files)
+        except OSError:
+            return None
+        with self.lock:
+            entry = self.lookup(("combined", files), PREVIEW_SIZE, stamp)
+            if entry is None:
+                return None
+            self.hits += 1
+            return entry["base"], entry["source_size"]
+    
+    def get_combined(self, files):
+        """Kombinierte Vorschau eines Materials; die Eingaben kommen als Vorschaubilder aus diesem Cache"""
+        result = self.peek_combined(files)
+        if result:
+            return result
+        stamp = self.combined_stamp(files)
+        result = render_combined_preview(*files, load=self.get)
+        if result is None:
+            raise ValueError("Albedo fehlt")
+        with self.lock:
+            entry = self.store(("combined", files), stamp, thumbnail_bucket(PREVIEW_SIZE), *result)
+            self.evict()
+            return entry["base"], entry["source_size"]
+    
+    def drop(self, key):
+        self.bytes -= self.entries.pop(key)["bytes"]
+    
+    def evict(self):
+        """Verdrängt die am längsten unbenutzten Dateien, bis das Budget eingehalten ist"""
+        while self.bytes > self.budget and len(self.entries) > 1:
+            self.drop(next(iter(self.entries)))
+            self.evictions += 1
+    
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations, "bytes": self.bytes, "entries": len(self.entries)}
+
+def render_combined_preview(albedo_file, normal_file, ao_file, roughness_file, metallic_file,
+                            height_file, emission_file=None, load=load_preview_thumbnail):
+    """Kombinierte Vorschau - zeigt wie das Material aussehen würde: (Bild, Originalgröße der Albedo).
+    
+    Alle Eingaben werden nur in Vorschaugröße dekodiert (load liefert (Bild, Originalgröße),
+    z.B. PreviewCache.get) und in dieser Größe verrechnet. None ohne Albedo.
+    """
+    # Lade Basis-Textur (Albedo)
+    if not albedo_file or not os.path.exists(albedo_file):
+        return None
+    
+    base_img, source_size = load(albedo_file, PREVIEW_SIZE)
+    size = base_img.size
+    
+    # Erstelle Pixel-Arrays für Verarbeitung
+    import numpy as np
+    albedo_data = np.array(base_img.convert('RGB'), dtype=np.float32) / 255.0
+    
+    def channel(path, mode):
+        """Map in Vorschaugröße als float32-Array 0-1"""
+        img = load(path, PREVIEW_SIZE)[0].convert(mode)
+        if img.size != size:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+        return np.asarray(img, dtype=np.float32) / 255.0
+    
+    # Lade AO und multipliziere mit Albedo (dunkelt Schatten ab)
+    if ao_file and os.path.exists(ao_file):
+        ao_data = channel(ao_file, 'L')
+        albedo_data *= ao_data[:, :, np.newaxis]
+    
+    # Simuliere Roughness-Effekt (weichere Albedo bei hoher Roughness)
+    if roughness_file and os.path.exists(roughness_file):
+        rough_data = channel(roughness_file, 'L')
+        # Leichtes Blur für raue Bereiche simulieren
+        roughness_factor = 0.85 + (rough_data * 0.15)
+        albedo_data *= roughness_factor[:, :, np.newaxis]
+    
+    # Simuliere Metallic-Effekt (metallische Bereiche reflektieren mehr)
+    if metallic_file and os.path.exists(metallic_file):
+        metal_data = channel(metallic_file, 'L')
+        # Metallische Bereiche sind glänzender (heller)
+        metallic_boost = 1.0 + (metal_data * 0.3)
+        albedo_data *= metallic_boost[:, :, np.newaxis]
+    
+    # Addiere Emission (selbstleuchtend, unabhängig von Beleuchtung)
+    if emission_file and os.path.exists(emission_file):
+        emission_data = channel(emission_file, 'RGB')
+        # Emission wird addiert (nicht multipliziert) - leuchtet selbst
+        albedo_data += emission_data * 0.5  # 50% Stärke für bessere Sichtbarkeit
+    
+    # Konvertiere zurück zu Bild
+    result_data = np.clip(albedo_data * 255.0, 0, 255).astype(np.uint8)
+    return Image.fromarray(result_data, mode='RGB'), source_size
+
+# PBR-Vorschau: Kantenlänge des Bildes, der Material-Texturen und Lichtstärke
+PBR_PREVIEW_SIZE = 384
+PBR_TEXTURE_SIZE = 256
+PBR_PREVIEW_SHAPES = ("Kugel", "Ebene")
+PBR_LIGHT_INTENSITY = 3.0
+PBR_AMBIENT = 0.12
+
+def load_pbr_textures(files, defaults, luts=None, load=load_preview_thumbnail, size=PBR_TEXTURE_SIZE):
+    """Material-Eingaben der PBR-Vorschau als float32-Arrays (size×size, Werte 0-1).
+    
+    files: Map-Typ -> Pfad oder None, defaults: Füllwerte 0-255 für fehlende ORM-Maps,
+    luts: Map-Typ -> LUT (Gloss-Inversion, Kanal-Transformationen wie beim Packen).
+    """
+    import numpy as np
+    luts = luts or {}
+    
+    def read(path, mode):
+        img = load(path, size)[0].convert(mode)
+        if img.size != (size, size):
+            img = img.resize((size, size), Image.Resampling.LANCZOS)
+        return img
+    
+    textures = {}
+    albedo_file = files.get("albedo")
+    textures["albedo"] = (np.asarray(read(albedo_file, "RGB"), dtype=np.float32) / 255.0 if albedo_file
+                          else np.full((size, size, 3), 0.8, dtype=np.float32))
+    for map_type in LAYOUT_SOURCES:
+        path = files.get(map_type)
+        if path:
+            img = read(path, "L")
+            if luts.get(map_type):
+                img = img.point(luts[map_type])
+            textures[map_type] = np.asarray(img, dtype=np.float32) / 255.0
+        else:
+            textures[map_type] = np.full((size, size), defaults[map_type] / 255.0, dtype=np.float32)
+    for map_type in ("normal", "emission"):
+        path = files.get(map_type)
+        textures[map_type] = np.asarray(read(path, "RGB"), dtype=np.float32) / 255.0 if path else None
+    return textures
+
+class PBRPreview:
+    """Cook-Torrance-Vorschau (GGX, Smith, Schlick) einer Kugel oder Ebene mit NumPy.
+    
+    Beim Anlegen werden alle Material-Eingaben einmal auf die sichtbaren Pixel abgebildet
+    (bilinear, Normal-Map in Weltkoordinaten) und alles lichtunabhängige vorberechnet.
+    shade() rechnet für eine neue Lichtrichtung nur noch einen vektorisierten Durchgang.
+    Orthografische Kamera, Blickrichtung +Z; Normal-Maps im OpenGL-Format (Y oben).
+    """
+    
+    def __init__(self, textures, shape="Kugel", size=PBR_PREVIEW_SIZE):
+        import numpy as np
+        self.size = size
+        coords = (np.arange(size, dtype=np.float32) + 0.5) / size * 2.0 - 1.0
+        x, y = np.meshgrid(coords, -coords)  # y nach oben
+        
+        if shape == "Kugel":
+            self.mask = x * x + y * y < 1.0
+            px, py = x[self.mask], y[self.mask]
+            pz = np.sqrt(np.maximum(0.0, 1.0 - px * px - py * py))
+            geometric = np.stack([px, py, pz], axis=1)
+            phi = np.arctan2(px, pz)
+            # Vorderseite zeigt die Textur genau einmal (u 0.5-1.5 mit Wiederholung)
+            u = phi / np.pi + 1.0
+            v = np.arccos(np.clip(py, -1.0, 1.0)) / np.pi
+            tangent = np.stack([np.cos(phi), np.zeros_like(phi), -np.sin(phi)], axis=1)
+            bitangent = np.cross(geometric, tangent)
+        else:
+            self.mask = np.ones((size, size), dtype=bool)
+            count = size * size
+            geometric = np.tile(np.array([0.0, 0.0, 1.0], dtype=np.float32), (count, 1))
+            tangent = np.tile(np.array([1.0, 0.0, 0.0], dtype=np.float32), (count, 1))
+            bitangent = np.tile(np.array([0.0, 1.0, 0.0], dtype=np.float32), (count, 1))
+            u = (x[self.mask] + 1.0) / 2.0
+            v = (1.0 - y[self.mask]) / 2.0
+        
+        def sample(texture):
+            """Bilineare Abtastung mit Wiederholung an (u, v)"""
+            height, width = texture.shape[:2]
+            fx = (u % 1.0) * width - 0.5
+            fy = np.clip(v, 0.0, 1.0) * height - 0.5
+            x0 = np.floor(fx).astype(np.int32)
+            y0 = np.floor(fy).astype(np.int32)
+            wx, wy = fx - x0, fy - y0
+            if texture.ndim == 3:
+                wx, wy = wx[:, None], wy[:, None]
+            x1 = (x0 + 1) % width
+            x0 %= width
+            y1 = np.clip(y0 + 1, 0, height - 1)
+            y0 = np.clip(y0, 0, height - 1)
+            top = texture[y0, x0] * (1 - wx) + texture[y0, x1] * wx
+            bottom = texture[y1, x0] * (1 - wx) + texture[y1, x1] * wx
+            return (top * (1 - wy) + bottom * wy).astype(np.float32)
+        
+        albedo = sample(textures["albedo"]) ** 2.2  # sRGB -> linear
+        ao = sample(textures["ao"])
+        roughness = np.clip(sample(textures["roughness"]), 0.04, 1.0)
+        metallic = sample(textures["metallic"])[:, None]
+        
+        normal = geometric
+        if textures.get("normal") is not None:
+            local = sample(textures["normal"]) * 2.0 - 1.0
+            normal = (tangent * local[:, 0:1] + bitangent * local[:, 1:2] + geometric * local[:, 2:3])
+        self.normal = (normal / np.maximum(np.linalg.norm(normal, axis=1, keepdims=True), 1e-6)).astype(np.float32)
+        
+        # Lichtunabhängige Terme
+        self.n_dot_v = np.clip(self.normal[:, 2], 1e-4, 1.0)
+        alpha = roughness * roughness
+        self.alpha2 = alpha * alpha
+        self.k = (roughness + 1.0) ** 2 / 8.0
+        self.g_view = self.n_dot_v / (self.n_dot_v * (1.0 - self.k) + self.k)
+        self.f0 = 0.04 * (1.0 - metallic) + albedo * metallic
+        self.diffuse = albedo * (1.0 - metallic) / np.pi
+        self.ambient = albedo * ao[:, None] * PBR_AMBIENT
+        if textures.get("emission") is not None:
+            self.ambient = self.ambient + sample(textures["emission"]) ** 2.2
+        self.output = np.full((size, size, 3), 48, dtype=np.uint8)  # Hintergrund
+    
+    def shade(self, light):
+        """Rendert das Bild für die Lichtrichtung light (x, y, z; wird normiert)"""
+        import numpy as np
+        light = np.asarray(light, dtype=np.float32)
+        light /= max(float(np.linalg.norm(light)), 1e-6)
+        half = light + np.array([0.0, 0.0, 1.0], dtype=np.float32)
+        half /= max(float(np.linalg.norm(half)), 1e-6)
+        
+        n_dot_l = np.clip(self.normal @ light, 0.0, 1.0)
+        n_dot_h = np.clip(self.normal @ half, 0.0, 1.0)
+        v_dot_h = max(float(half[2]), 0.0)  # Blickrichtung ist konstant
+        
+        distribution = self.alpha2 / (np.pi * (n_dot_h * n_dot_h * (self.alpha2 - 1.0) + 1.0) ** 2)
+        geometry = self.g_view * n_dot_l / (n_dot_l * (1.0 - self.k) + self.k)
+        fresnel = self.f0 + (1.0 - self.f0) * (1.0 - v_dot_h) ** 5
+        specular = fresnel * (distribution * geometry / (4.0 * self.n_dot_v * n_dot_l + 1e-4))[:, None]
+        color = self.ambient + ((1.0 - fresnel) * self.diffuse + specular) * (PBR_LIGHT_INTENSITY * n_dot_l)[:, None]
+        
+        # Reinhard-Tonemapping und Gamma
+        color = (color / (1.0 + color)) ** (1.0 / 2.2)
+        self.output[self.mask] = (np.clip(color, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+        return Image.fromarray(self.output, mode="RGB")
+
+def pbr_light_direction(x, y, size):
+    """Lichtrichtung aus einer Mausposition im Vorschaubild (virtueller Trackball)"""
+    lx = max(-1.0, min(1.0, x / size * 2.0 - 1.0))
+    ly = max(-1.0, min(1.0, 1.0 - y / size * 2.0))
+    return (lx, ly, max(0.15, math.sqrt(max(0.0, 1.0 - lx * lx - ly * ly))))
+
+# GUI-Ereignisse aus Worker-Threads: Abstand der Abarbeitung im Tk-Hauptthread
+UI_DRAIN_MS = 50
+
+# Log-Ansicht behält nur die letzten Zeilen; das vollständige Log geht in eine Datei pro Sitzung
+LOG_VIEW_LINES = 2000
+LOG_DIR = os.path.join(APP_CACHE_DIR, "logs")
+LOG_KEEP_FILES = 20
+
+def open_session_log(directory=LOG_DIR, keep=LOG_KEEP_FILES):
+    """Neue Log-Datei der Sitzung; die ältesten über keep hinaus werden gelöscht. None, wenn nicht möglich."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        old = sorted(name for name in os.listdir(directory) if name.startswith("session_") and name.endswith(".log"))
+        for name in old[:max(0, len(old) - keep + 1)]:
+            os.remove(os.path.join(directory, name))
+        return open(os.path.join(directory, time.strftime("session_%Y%m%d_%H%M%S.log")), "a", encoding="utf-8")
+    except OSError:
+        return None
 
 class ORMGeneratorGUI:
     def __init__(self, root):
@@ -34,115 +3411,82 @@ class ORMGeneratorGUI:
         self.progress = tk.DoubleVar()
         self.status = tk.StringVar(value="Bereit")
         self.current_texture_index = 0
-        self.texture_list = []
+        self.materials = MaterialStore()
         self.zoom_level = 1.0
         
-        # Preview Images Cache
+        # Preview Images Cache: dekodierte Bilder im PreviewCache, laufende Aufträge als Futures
         self.preview_images = {}
-        self.preview_cache = {}
+        self.preview_cache = PreviewCache()
+        self.preview_jobs = {}
+        self.preview_pool = ThreadPoolExecutor(max_workers=PREVIEW_WORKERS)
+        self.preview_token = 0  # verwirft Ergebnisse, wenn inzwischen weitergeblättert wurde
+        self.preview_pool.submit(prune_thumbnail_cache)
         self.normal_preview_widget = None
         self.combined_preview_widget = None
         
         # Optionen - Basic
-        self.use_height_for_ao = tk.BooleanVar(value=True)
-        self.overwrite_existing = tk.BooleanVar(value=False)
-        self.fill_missing_maps = tk.BooleanVar(value=False)
-        self.recursive_search = tk.BooleanVar(value=True)
-        self.invert_gloss = tk.BooleanVar(value=True)
+        self.use_height_for_ao = tk.BooleanVar(value=SETTING_DEFAULTS["use_height_for_ao"])
+        self.overwrite_existing = tk.BooleanVar(value=SETTING_DEFAULTS["overwrite_existing"])
+        self.resume_batch = tk.BooleanVar(value=SETTING_DEFAULTS["resume_batch"])
+        self.fill_missing_maps = tk.BooleanVar(value=SETTING_DEFAULTS["fill_missing_maps"])
+        self.recursive_search = tk.BooleanVar(value=SETTING_DEFAULTS["recursive_search"])
+        self.invert_gloss = tk.BooleanVar(value=SETTING_DEFAULTS["invert_gloss"])
         
         # Optionen - Erweitert
-        self.preferred_resolution = tk.StringVar(value="auto")
-        self.target_resolution = tk.StringVar(value="original")  # Skalierungsziel
-        self.output_format = tk.StringVar(value="PNG")
-        self.compression_quality = tk.IntVar(value=95)
+        self.preferred_resolution = tk.StringVar(value=SETTING_DEFAULTS["preferred_resolution"])
+        self.target_resolution = tk.StringVar(value=SETTING_DEFAULTS["target_resolution"])  # Skalierungsziel
+        self.output_format = tk.StringVar(value=SETTING_DEFAULTS["output_format"])
+        self.compression_quality = tk.IntVar(value=SETTING_DEFAULTS["compression_quality"])
+        self.encoder_profile = tk.StringVar(value=SETTING_DEFAULTS["encoder_profile"])
+        self.orm_workers = tk.IntVar(value=SETTING_DEFAULTS["orm_workers"])
+        self.orm_memory_budget = tk.IntVar(value=SETTING_DEFAULTS["orm_memory_budget"])
+        self.packing_engine = tk.StringVar(value=SETTING_DEFAULTS["packing_engine"])
+        self.packing_layouts = tk.StringVar(value=SETTING_DEFAULTS["packing_layouts"])
         
         # Standardwerte für fehlende Maps
-        self.default_ao_value = tk.IntVar(value=255)
-        self.default_roughness_value = tk.IntVar(value=128)
-        self.default_metallic_value = tk.IntVar(value=0)
+        self.default_ao_value = tk.IntVar(value=SETTING_DEFAULTS["default_ao_value"])
+        self.default_roughness_value = tk.IntVar(value=SETTING_DEFAULTS["default_roughness_value"])
+        self.default_metallic_value = tk.IntVar(value=SETTING_DEFAULTS["default_metallic_value"])
         
         # GLTF Optionen
-        self.gltf_double_sided = tk.BooleanVar(value=False)
-        self.gltf_alpha_mode = tk.StringVar(value="OPAQUE")
-        self.gltf_emission_strength = tk.DoubleVar(value=1.0)
-        self.gltf_metallic_factor = tk.DoubleVar(value=1.0)
-        self.gltf_roughness_factor = tk.DoubleVar(value=1.0)
+        self.gltf_double_sided = tk.BooleanVar(value=SETTING_DEFAULTS["gltf_double_sided"])
+        self.gltf_alpha_mode = tk.StringVar(value=SETTING_DEFAULTS["gltf_alpha_mode"])
+        self.gltf_emission_strength = tk.DoubleVar(value=SETTING_DEFAULTS["gltf_emission_strength"])
+        self.gltf_metallic_factor = tk.DoubleVar(value=SETTING_DEFAULTS["gltf_metallic_factor"])
+        self.gltf_roughness_factor = tk.DoubleVar(value=SETTING_DEFAULTS["gltf_roughness_factor"])
+        self.fold_uniform_maps = tk.BooleanVar(value=SETTING_DEFAULTS["fold_uniform_maps"])
         
         # Material Preset
-        self.material_preset = tk.StringVar(value="Standard")
+        self.material_preset = tk.StringVar(value=SETTING_DEFAULTS["material_preset"])
         
         # Export Log
-        self.export_log = tk.BooleanVar(value=False)
-        self.log_format = tk.StringVar(value="CSV")
+        self.export_log = tk.BooleanVar(value=SETTING_DEFAULTS["export_log"])
+        self.log_format = tk.StringVar(value=SETTING_DEFAULTS["log_format"])
         
         # Validation
-        self.validate_resolution = tk.BooleanVar(value=True)
-        self.warn_unusual_values = tk.BooleanVar(value=True)
+        self.validate_resolution = tk.BooleanVar(value=SETTING_DEFAULTS["validate_resolution"])
+        self.warn_unusual_values = tk.BooleanVar(value=SETTING_DEFAULTS["warn_unusual_values"])
+        
+        # Ereignisse aus Worker-Threads (Log, Status, Fortschritt, Dialoge), gebündelt im Tk-Hauptthread
+        self.ui_events = queue.SimpleQueue()
+        self.log_file = open_session_log()
+        
+        # Lange Operationen laufen als Jobs (Warteschlange, Abbruch, Pause, Ausgabe-Konflikte)
+        self.scheduler = JobScheduler(on_change=lambda job: self.post(self.job_changed, job))
+        self.job_list_ids = []
         
         # Hotkeys
         self.setup_hotkeys()
         
         self.setup_ui()
+        if self.log_file:
+            self.log(f"Log-Datei: {self.log_file.name}")
+        self.root.after(UI_DRAIN_MS, self.drain_ui_events)
     
     def load_suffix_config(self):
-        """Lädt Suffix-Definitionen aus JSON-Datei"""
-        config_file = os.path.join(os.path.dirname(__file__), "texture_suffixes.json")
-        
-        # Standard-Fallback falls JSON fehlt
-        default_config = {
-            "suffixes": {
-                "albedo": ["albedo", "Albedo", "ALBEDO", "alb", "Alb", "ALB", "base", "Base", "BASE",
-                          "basecolor", "BaseColor", "BASECOLOR", "color", "Color", "COLOR",
-                          "col", "Col", "COL", "diffuse", "Diffuse", "DIFFUSE", "diff", "Diff", "DIFF"],
-                "normal": ["normal", "Normal", "NORMAL", "NormalGL", "NormalDX", "nor_gl", "nor_dx",
-                          "norrmal", "norm", "Norm", "NRM", "Nrm", "nrm", "nor", "Nor", "NOR"],
-                "ao": ["ao", "AO", "Ao", "ambient", "Ambient", "AMBIENT", "occlusion", "Occlusion",
-                      "OCCLUSION", "AmbientOcclusion", "ambientOcclusion", "Occlusionc", "ambient-occlusion"],
-                "roughness": ["roughness", "Roughness", "ROUGHNESS", "rough", "Rough", "ROUGH",
-                             "roughnness", "rgh", "RGH", "Rgh", "REFL", "Refl", "refl",
-                             "gloss", "Gloss", "GLOSS"],
-                "metallic": ["metallic", "Metallic", "METALLIC", "metal", "Metal", "METAL", "metalic",
-                            "metallness", "Metallness", "metalness", "Metalness", "mtl", "MTL", "Mtl",
-                            "Metalness", "specular", "Specular", "SPECULAR"],
-                "height": ["height", "Height", "HEIGHT", "disp", "Disp", "DISP",
-                          "displacement", "Displacement", "DISPLACEMENT", "bump", "Bump", "BUMP"],
-                "emission": ["emission", "Emission", "EMISSION", "emissive", "Emissive", "EMISSIVE",
-                            "emiss", "Emiss", "emis", "Emis", "emi", "Emi", "glow", "Glow", "GLOW"]
-            },
-            "extensions": ["png", "jpg", "jpeg", "jp2"],
-            "separators": ["_", "-"],
-            "resolutions": ["128", "256", "512", "1024", "2048"]
-        }
-        
-        try:
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    self.suffix_config = config
-                    print(f"✓ Suffix-Konfiguration geladen: {config_file}")
-            else:
-                # Erstelle Standard-Konfigurationsdatei
-                with open(config_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        "version": "1.0",
-                        "description": "Texture suffix definitions - Edit to add custom naming conventions",
-                        **default_config,
-                        "comments": {
-                            "albedo": "Base color / diffuse textures",
-                            "normal": "Normal maps (OpenGL format preferred)",
-                            "ao": "Ambient Occlusion maps",
-                            "roughness": "Roughness maps (also detects gloss maps for inversion)",
-                            "metallic": "Metallic maps (also legacy specular)",
-                            "height": "Height/Displacement/Bump maps",
-                            "emission": "Emissive/Glow maps"
-                        }
-                    }, f, indent=2, ensure_ascii=False)
-                self.suffix_config = default_config
-                print(f"✓ Standard-Konfiguration erstellt: {config_file}")
-        except Exception as e:
-            print(f"⚠ Fehler beim Laden der Suffix-Konfiguration: {e}")
-            print("  Verwende eingebaute Standard-Werte")
-            self.suffix_config = default_config
+        """Lädt Suffix-Definitionen aus JSON-Datei und kompiliert den Matcher"""
+        self.suffix_config = load_suffix_config()
+        self.suffix_matcher = compile_suffix_matcher(self.suffix_config)
     
     def get_suffixes(self, map_type):
         """Gibt Suffixe für einen Map-Typ zurück"""
@@ -160,6 +3504,84 @@ class ORMGeneratorGUI:
         """Gibt Auflösungs-Suffixe zurück"""
         return self.suffix_config.get("resolutions", ["128", "256", "512", "1024", "2048"])
     
+    def get_settings(self):
+        """Momentaufnahme aller Einstellungen als Dict (für Worker-Threads und -Prozesse)"""
+        return {name: getattr(self, name).get() for name in SETTING_DEFAULTS}
+    
+    def create_pipeline(self):
+        """Pipeline mit den aktuellen Einstellungen; Log, Status und Fortschritt gehen an die GUI"""
+        return ORMPipeline(self.input_dir.get(), self.output_dir.get(), self.get_settings(),
+                           self.suffix_config, self.suffix_matcher, self.materials,
+                           log=self.log, status=self.set_status, progress=self.set_progress)
+    
+    def submit_job(self, name, function, outputs, lane="batch"):
+        """Reiht function(pipeline) im JobScheduler ein. Einstellungen gelten ab dem Klick,
+        die Materialien ab dem Start (ein vorher eingereihter Ladejob kann sie noch ändern)."""
+        pipeline = self.create_pipeline()
+        
+        def run(control):
+            pipeline.control = control
+            pipeline.materials = self.materials
+            return function(pipeline)
+        
+        job = self.scheduler.submit(name, run, outputs, lane)
+        if job.state == "wartet":
+            reason = (f"Ausgabe belegt von #{job.blocked_by.id} {job.blocked_by.name}" if job.blocked_by
+                      else "alle Plätze belegt")
+            self.log(f"Job #{job.id} {name} eingereiht ({reason})")
+        return job
+    
+    def job_changed(self, job):
+        """Zustandsänderung eines Jobs (im Hauptthread)"""
+        if job.state == "abgebrochen":
+            self.log(f"Job #{job.id} {job.name} abgebrochen")
+            self.set_status(f"Abgebrochen: {job.name}")
+        elif job.state == "Fehler":
+            self.log(f"FEHLER Job #{job.id} {job.name}: {job.error}")
+        self.update_job_list()
+    
+    def update_job_list(self):
+        jobs = self.scheduler.jobs()
+        selected = {self.job_list_ids[index] for index in self.job_list.curselection()
+                    if index < len(self.job_list_ids)}
+        self.job_list.delete(0, tk.END)
+        self.job_list_ids = [job.id for job in jobs]
+        for index, job in enumerate(jobs):
+            self.job_list.insert(tk.END, job.describe())
+            if job.id in selected:
+                self.job_list.selection_set(index)
+    
+    def selected_jobs(self):
+        """Markierte aktive Jobs; ohne Markierung alle aktiven"""
+        active = self.scheduler.active()
+        selected = {self.job_list_ids[index] for index in self.job_list.curselection()
+                    if index < len(self.job_list_ids)}
+        return [job for job in active if job.id in selected] if selected else active
+    
+    def toggle_pause_jobs(self):
+        jobs = self.selected_jobs()
+        if not jobs:
+            return
+        # Sind alle pausiert, weiterlaufen lassen, sonst alle anhalten
+        resume = all(job.control.paused for job in jobs)
+        for job in jobs:
+            if resume:
+                job.control.resume()
+            else:
+                job.control.pause()
+        self.log(f"{'Fortgesetzt' if resume else 'Pausiert (am nächsten Material)'}: "
+                 + ", ".join(f"#{job.id} {job.name}" for job in jobs))
+        self.update_job_list()
+    
+    def cancel_jobs(self):
+        jobs = self.selected_jobs()
+        if not jobs:
+            return
+        if not messagebox.askyesno("Abbrechen", "Jobs abbrechen?\n" + "\n".join(job.describe() for job in jobs)):
+            return
+        for job in jobs:
+            self.scheduler.cancel(job)
+    
     def setup_hotkeys(self):
         """Richtet Tastaturkürzel ein"""
         self.root.bind('<Left>', lambda e: self.prev_texture())
@@ -168,6 +3590,7 @@ class ORMGeneratorGUI:
         self.root.bind('<Control-l>', lambda e: self.load_textures())
         self.root.bind('<Control-g>', lambda e: self.generate_gltf())
         self.root.bind('<Control-m>', lambda e: self.generate_missing_maps())
+        self.root.bind('<Control-r>', lambda e: self.regenerate_current_orm())
         self.root.bind('<Control-plus>', lambda e: self.zoom_in())
         self.root.bind('<Control-minus>', lambda e: self.zoom_out())
         self.root.bind('<Control-0>', lambda e: self.reset_zoom())
@@ -331,6 +3754,9 @@ class ORMGeneratorGUI:
         ttk.Checkbutton(basic_frame, text="Gloss zu Roughness invertieren", 
                        variable=self.invert_gloss).grid(row=4, column=0, sticky=tk.W, pady=2)
         
+        ttk.Checkbutton(basic_frame, text="Abgebrochenen Batch fortsetzen", 
+                       variable=self.resume_batch).grid(row=5, column=0, sticky=tk.W, pady=2)
+        
         # Tab 2: Erweiterte Optionen
         advanced_frame = ttk.Frame(options_notebook, padding="5")
         options_notebook.add(advanced_frame, text="Erweitert")
@@ -338,20 +3764,20 @@ class ORMGeneratorGUI:
         # Auflösung
         ttk.Label(advanced_frame, text="Bevorzugte Auflösung:").grid(row=0, column=0, sticky=tk.W, pady=2)
         resolution_combo = ttk.Combobox(advanced_frame, textvariable=self.preferred_resolution, 
-                                       values=["auto", "128", "256", "512", "1024", "2048"], width=10, state="readonly")
+                                       values=SETTING_CHOICES["preferred_resolution"], width=10, state="readonly")
         resolution_combo.grid(row=0, column=1, sticky=tk.W, pady=2)
         
         # Zielauflösung (Skalierung)
         ttk.Label(advanced_frame, text="Zielauflösung:").grid(row=3, column=0, sticky=tk.W, pady=2)
         target_res_combo = ttk.Combobox(advanced_frame, textvariable=self.target_resolution, 
-                                       values=["original", "128", "256", "512", "1024", "2048"], width=10, state="readonly")
+                                       values=SETTING_CHOICES["target_resolution"], width=10, state="readonly")
         target_res_combo.grid(row=3, column=1, sticky=tk.W, pady=2)
         ttk.Label(advanced_frame, text="(Skaliert alle Texturen)", font=("Arial", 7), foreground="gray").grid(row=3, column=2, sticky=tk.W, pady=2, padx=5)
         
         # Output Format
         ttk.Label(advanced_frame, text="Ausgabeformat:").grid(row=1, column=0, sticky=tk.W, pady=2)
         format_combo = ttk.Combobox(advanced_frame, textvariable=self.output_format, 
-                                    values=["PNG", "JPEG", "JP2"], width=10, state="readonly")
+                                    values=SETTING_CHOICES["output_format"], width=10, state="readonly")
         format_combo.grid(row=1, column=1, sticky=tk.W, pady=2)
         
         # Compression Quality
@@ -365,7 +3791,7 @@ class ORMGeneratorGUI:
         # Zielauflösung (Skalierung)
         ttk.Label(advanced_frame, text="Speicher-Auflösung:").grid(row=3, column=0, sticky=tk.W, pady=2)
         target_res_combo = ttk.Combobox(advanced_frame, textvariable=self.target_resolution, 
-                                       values=["original", "128", "256", "512", "1024", "2048"], width=10, state="readonly")
+                                       values=SETTING_CHOICES["target_resolution"], width=10, state="readonly")
         target_res_combo.grid(row=3, column=1, sticky=tk.W, pady=2)
         ttk.Label(advanced_frame, text="(nur Ausgabe)", font=("Arial", 7), foreground="gray").grid(row=3, column=2, sticky=tk.W, pady=2, padx=5)
         
@@ -376,6 +3802,33 @@ class ORMGeneratorGUI:
                               foreground="darkgreen")
         info_label.grid(row=4, column=0, columnspan=3, sticky=tk.W, pady=(5, 10))
         
+        # Parallele ORM-Erzeugung
+        ttk.Label(advanced_frame, text="Worker-Prozesse:").grid(row=5, column=0, sticky=tk.W, pady=2)
+        workers_spinbox = ttk.Spinbox(advanced_frame, from_=1, to=128, textvariable=self.orm_workers, width=10)
+        workers_spinbox.grid(row=5, column=1, sticky=tk.W, pady=2)
+        
+        ttk.Label(advanced_frame, text="Speicherbudget (MB):").grid(row=6, column=0, sticky=tk.W, pady=2)
+        budget_spinbox = ttk.Spinbox(advanced_frame, from_=0, to=65536, increment=256,
+                                     textvariable=self.orm_memory_budget, width=10)
+        budget_spinbox.grid(row=6, column=1, sticky=tk.W, pady=2)
+        ttk.Label(advanced_frame, text="(große Maps in Streifen, 0 = aus)", font=("Arial", 7), foreground="gray").grid(row=6, column=2, sticky=tk.W, pady=2, padx=5)
+        
+        ttk.Label(advanced_frame, text="Pack-Engine:").grid(row=7, column=0, sticky=tk.W, pady=2)
+        engine_combo = ttk.Combobox(advanced_frame, textvariable=self.packing_engine, 
+                                    values=SETTING_CHOICES["packing_engine"], width=10, state="readonly")
+        engine_combo.grid(row=7, column=1, sticky=tk.W, pady=2)
+        ttk.Label(advanced_frame, text="(NumPy: ein Puffer statt Einzelbilder)", font=("Arial", 7), foreground="gray").grid(row=7, column=2, sticky=tk.W, pady=2, padx=5)
+        
+        ttk.Label(advanced_frame, text="Packing-Layouts:").grid(row=8, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(advanced_frame, textvariable=self.packing_layouts, width=20).grid(row=8, column=1, sticky=tk.W, pady=2)
+        ttk.Label(advanced_frame, text=f"({', '.join(PACKING_LAYOUTS)})", font=("Arial", 7), foreground="gray").grid(row=8, column=2, sticky=tk.W, pady=2, padx=5)
+        
+        ttk.Label(advanced_frame, text="Encoder-Profil:").grid(row=9, column=0, sticky=tk.W, pady=2)
+        profile_combo = ttk.Combobox(advanced_frame, textvariable=self.encoder_profile,
+                                     values=SETTING_CHOICES["encoder_profile"], width=10, state="readonly")
+        profile_combo.grid(row=9, column=1, sticky=tk.W, pady=2)
+        ttk.Label(advanced_frame, text="(fast: schnell, smallest: kleinste Dateien)", font=("Arial", 7), foreground="gray").grid(row=9, column=2, sticky=tk.W, pady=2, padx=5)
+        
         # Tab 3: Standardwerte
         defaults_frame = ttk.Frame(options_notebook, padding="5")
         options_notebook.add(defaults_frame, text="Standardwerte")
@@ -395,7 +3848,7 @@ class ORMGeneratorGUI:
         # Material Presets
         ttk.Label(defaults_frame, text="Material Preset:").grid(row=3, column=0, sticky=tk.W, pady=2)
         preset_combo = ttk.Combobox(defaults_frame, textvariable=self.material_preset, 
-                                   values=["Standard", "Metall", "Holz", "Stein", "Glas", "Stoff"], 
+                                   values=SETTING_CHOICES["material_preset"], 
                                    width=10, state="readonly")
         preset_combo.grid(row=3, column=1, sticky=tk.W, pady=2)
         preset_combo.bind('<<ComboboxSelected>>', self.apply_material_preset)
@@ -409,7 +3862,7 @@ class ORMGeneratorGUI:
         
         ttk.Label(gltf_frame, text="Alpha Mode:").grid(row=1, column=0, sticky=tk.W, pady=2)
         alpha_combo = ttk.Combobox(gltf_frame, textvariable=self.gltf_alpha_mode, 
-                                  values=["OPAQUE", "MASK", "BLEND"], width=10, state="readonly")
+                                  values=SETTING_CHOICES["gltf_alpha_mode"], width=10, state="readonly")
         alpha_combo.grid(row=1, column=1, sticky=tk.W, pady=2)
         
         ttk.Label(gltf_frame, text="Emission Stärke:").grid(row=2, column=0, sticky=tk.W, pady=2)
@@ -427,6 +3880,9 @@ class ORMGeneratorGUI:
                                    variable=self.gltf_roughness_factor, length=150)
         roughness_scale.grid(row=4, column=1, sticky=tk.W, pady=2)
         
+        ttk.Checkbutton(gltf_frame, text="Einfarbige Maps als Faktoren (4×4-ORM)", 
+                       variable=self.fold_uniform_maps).grid(row=5, column=0, columnspan=2, sticky=tk.W, pady=2)
+        
         # Tab 5: Validierung & Export
         validation_frame = ttk.Frame(options_notebook, padding="5")
         options_notebook.add(validation_frame, text="Validierung")
@@ -442,7 +3898,7 @@ class ORMGeneratorGUI:
         
         ttk.Label(validation_frame, text="Log Format:").grid(row=3, column=0, sticky=tk.W, pady=2)
         log_combo = ttk.Combobox(validation_frame, textvariable=self.log_format, 
-                                values=["CSV", "JSON", "TXT"], width=10, state="readonly")
+                                values=SETTING_CHOICES["log_format"], width=10, state="readonly")
         log_combo.grid(row=3, column=1, sticky=tk.W, pady=2)
         
         # Buttons mit Farben und Beschriftung
@@ -468,7 +3924,7 @@ class ORMGeneratorGUI:
         
         # Zweite Reihe Buttons
         button_frame2 = tk.Frame(actions_frame, bg="#F0F4F8")
-        button_frame2.pack(pady=(2, 5), padx=5)
+        button_frame2.pack(pady=2, padx=5)
         
         tk.Button(button_frame2, text="🔍 Skalieren", command=self.batch_scale_textures,
                  bg="#6A4C93", fg="white", font=("Arial", 9), relief="raised", bd=2).pack(side=tk.LEFT, padx=3)
@@ -479,6 +3935,34 @@ class ORMGeneratorGUI:
         tk.Button(button_frame2, text="📦📦 Batch GLTF", command=self.batch_export_gltf,
                  bg="#0466C8", fg="white", font=("Arial", 9), relief="raised", bd=2).pack(side=tk.LEFT, padx=3)
         
+        tk.Button(button_frame2, text="⚡ ORM aktuelles Material (Ctrl+R)", command=self.regenerate_current_orm,
+                 bg="#9D0208", fg="white", font=("Arial", 9), relief="raised", bd=2).pack(side=tk.LEFT, padx=3)
+        
+        # Dritte Reihe: Sitzung
+        button_frame3 = tk.Frame(actions_frame, bg="#F0F4F8")
+        button_frame3.pack(pady=(2, 5), padx=5)
+        
+        tk.Button(button_frame3, text="💾 Sitzung speichern", command=self.save_session,
+                 bg="#546E7A", fg="white", font=("Arial", 9), relief="raised", bd=2).pack(side=tk.LEFT, padx=3)
+        
+        tk.Button(button_frame3, text="📂 Sitzung laden", command=self.load_session,
+                 bg="#546E7A", fg="white", font=("Arial", 9), relief="raised", bd=2).pack(side=tk.LEFT, padx=3)
+        
+        # Jobs: laufende, eingereihte und zuletzt beendete Operationen
+        jobs_frame = tk.LabelFrame(control_frame, text="🧵 Jobs", font=("Arial", 9, "bold"),
+                                  bg="#F0F4F8", fg="#006494", relief="ridge", bd=2)
+        jobs_frame.grid(row=6, column=0, columnspan=2, pady=(0, 5), padx=5, sticky="ew")
+        self.job_list = tk.Listbox(jobs_frame, height=4, font=("Consolas", 9), selectmode=tk.EXTENDED,
+                                   activestyle="none")
+        self.job_list.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+        job_buttons = tk.Frame(jobs_frame, bg="#F0F4F8")
+        job_buttons.grid(row=0, column=1, sticky="n", padx=(0, 5), pady=5)
+        tk.Button(job_buttons, text="⏸ Pause / Weiter", command=self.toggle_pause_jobs,
+                 bg="#78909C", fg="white", font=("Arial", 9), relief="raised", bd=2).pack(fill=tk.X, pady=1)
+        tk.Button(job_buttons, text="✖ Abbrechen", command=self.cancel_jobs,
+                 bg="#C62828", fg="white", font=("Arial", 9), relief="raised", bd=2).pack(fill=tk.X, pady=1)
+        jobs_frame.columnconfigure(0, weight=1)
+        
         # Fortschritt mit Farbe
         progress_label = tk.Label(control_frame, text="⏳ Fortschritt:", font=("Arial", 9, "bold"), 
                                  bg="#F0F4F8", fg="#006494")
@@ -585,6 +4069,11 @@ class ORMGeneratorGUI:
         self.combined_preview = tk.Label(preview_frame, text="Keine Vorschau", relief="ridge", 
                                         bg="#E0F2F1", bd=3)
         self.combined_preview.grid(row=6, column=2, padx=5, pady=5)
+        self.combined_preview.bind("<Button-1>", lambda e: self.show_pbr_preview())
+        
+        self.preview_cache_label = tk.Label(preview_frame, text="", font=("Arial", 8),
+                                            bg="#FFF3E0", fg="#8D6E63")
+        self.preview_cache_label.grid(row=7, column=0, columnspan=3, pady=(10, 0))
         
         # Grid-Konfiguration
         main_frame.columnconfigure(1, weight=1)
@@ -594,15 +4083,7 @@ class ORMGeneratorGUI:
     def apply_material_preset(self, event=None):
         """Wendet Material-Presets an"""
         preset = self.material_preset.get()
-        
-        presets = {
-            "Standard": {"ao": 255, "roughness": 128, "metallic": 0},
-            "Metall": {"ao": 255, "roughness": 30, "metallic": 255},
-            "Holz": {"ao": 200, "roughness": 180, "metallic": 0},
-            "Stein": {"ao": 220, "roughness": 200, "metallic": 0},
-            "Glas": {"ao": 255, "roughness": 10, "metallic": 0},
-            "Stoff": {"ao": 230, "roughness": 220, "metallic": 0}
-        }
+        presets = MATERIAL_PRESETS
         
         if preset in presets:
             self.default_ao_value.set(presets[preset]["ao"])
@@ -627,26 +4108,89 @@ class ORMGeneratorGUI:
     
     def refresh_current_preview(self):
         """Aktualisiert Vorschau mit neuem Zoom"""
-        if self.texture_list:
+        if self.materials:
             self.show_current_texture()
     
+    def show_pbr_preview(self):
+        """Öffnet die beleuchtete PBR-Vorschau des aktuellen Materials"""
+        if not self.materials:
+            return
+        
+        material = self.materials[self.current_texture_index]
+        files = self.preview_files(material)
+        roughness_file = files["roughness"]
+        gloss = (roughness_file and self.invert_gloss.get() and "gloss" in os.path.basename(roughness_file).lower())
+        transforms = resolve_channel_transforms(self.suffix_config, self.log)
+        luts = {map_type: chain_luts(INVERT_LUT if map_type == "roughness" and gloss else None,
+                                     compile_channel_lut(transforms.get(map_type)))
+                for map_type in LAYOUT_SOURCES}
+        defaults = {map_type: getattr(self, f"default_{map_type}_value").get() for map_type in LAYOUT_SOURCES}
+        
+        window = tk.Toplevel(self.root)
+        window.title(f"PBR-Vorschau: {material.base_name}")
+        shape = tk.StringVar(value=PBR_PREVIEW_SHAPES[0])
+        controls = ttk.Frame(window, padding="5")
+        controls.pack(fill=tk.X)
+        ttk.Combobox(controls, textvariable=shape, values=PBR_PREVIEW_SHAPES, state="readonly",
+                     width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="Ziehen mit der Maus: Lichtrichtung").pack(side=tk.LEFT, padx=10)
+        timing = ttk.Label(controls, text="")
+        timing.pack(side=tk.RIGHT, padx=5)
+        image_label = tk.Label(window, text="Lade...", width=PBR_PREVIEW_SIZE // 8, bg="#303030", fg="white")
+        image_label.pack(padx=5, pady=5)
+        
+        state = {"light": (-0.5, 0.5, 0.7), "preview": None, "textures": None}
+        
+        def render():
+            if state["preview"] is None:
+                return
+            started = time.perf_counter()
+            photo = ImageTk.PhotoImage(state["preview"].shade(state["light"]))
+            image_label.image = photo
+            image_label.config(image=photo, text='', width=PBR_PREVIEW_SIZE)
+            timing.config(text=f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        
+        def rebuild(*args):
+            if state["textures"] is not None:
+                state["preview"] = PBRPreview(state["textures"], shape.get())
+                render()
+        
+        def drag(event):
+            state["light"] = pbr_light_direction(event.x, event.y, PBR_PREVIEW_SIZE)
+            render()
+        
+        # Eingaben aus dem Vorschau-Cache im Thread-Pool, danach nur noch Beleuchtung
+        future = self.preview_pool.submit(load_pbr_textures, files, defaults, luts, self.preview_cache.get)
+        
+        def poll():
+            if not window.winfo_exists():
+                return
+            if not future.done():
+                window.after(PREVIEW_POLL_MS, poll)
+                return
+            try:
+                state["textures"] = future.result()
+                rebuild()
+            except ImportError:
+                image_label.config(text="NumPy wird für die PBR-Vorschau benötigt")
+            except Exception as e:
+                image_label.config(text=f"Fehler: {str(e)[:40]}")
+        
+        shape.trace_add("write", rebuild)
+        image_label.bind("<Button-1>", drag)
+        image_label.bind("<B1-Motion>", drag)
+        poll()
+    
     def show_histogram(self, map_type):
         """Zeigt Histogramm für eine Map an"""
-        if not self.texture_list:
+        if not self.materials:
             return
         
-        texture_info = self.texture_list[self.current_texture_index]
-        base_name = texture_info['base_name']
-        texture_dir = texture_info['dir']
+        material = self.materials[self.current_texture_index]
+        base_name = material.base_name
         
-        # Finde entsprechende Datei mit JSON-Konfiguration
-        file_path = None
-        if map_type == "AO":
-            file_path = self.find_texture_file(texture_dir, base_name, self.get_suffixes("ao"))
-        elif map_type == "Roughness":
-            file_path = self.find_texture_file(texture_dir, base_name, self.get_suffixes("roughness"))
-        elif map_type == "Metallic":
-            file_path = self.find_texture_file(texture_dir, base_name, self.get_suffixes("metallic"))
+        # Pfad kommt direkt aus dem beim Laden aufgelösten Material
+        file_path = material.path({"AO": "ao", "Roughness": "roughness", "Metallic": "metallic"}[map_type])
         
         if not file_path or not os.path.exists(file_path):
             messagebox.showinfo("Info", f"{map_type} Map nicht gefunden")
@@ -735,7 +4279,7 @@ class ORMGeneratorGUI:
     
     def batch_scale_textures(self):
         """Skaliert alle Texturen auf Zielauflösung"""
-        if not self.texture_list:
+        if not self.materials:
             messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
             return
         
@@ -748,194 +4292,74 @@ class ORMGeneratorGUI:
         if messagebox.askyesno("Batch Skalierung", 
                               f"Alle Texturen auf {target_size}x{target_size} skalieren?\n" +
                               f"Output: {self.output_dir.get() or self.input_dir.get()}\\{target_size}\\"):
-            thread = threading.Thread(target=self._batch_scale_thread, args=(target_size,))
-            thread.daemon = True
-            thread.start()
+            self.submit_job(f"Skalieren {target_size}",
+                            lambda pipeline: self._batch_scale_thread(pipeline, target_size),
+                            [os.path.join(self.output_dir.get() or self.input_dir.get(), str(target_size))])
     
-    def _batch_scale_thread(self, target_size):
+    def _batch_scale_thread(self, pipeline, target_size):
         """Thread für Batch-Skalierung"""
         try:
-            base_output_dir = self.output_dir.get() or self.input_dir.get()
-            output_dir = os.path.join(base_output_dir, str(target_size))
-            os.makedirs(output_dir, exist_ok=True)
-            
-            self.status.set(f"Skaliere Texturen auf {target_size}x{target_size}...")
-            self.progress.set(0)
-            
-            processed = 0
-            total_files = 0
-            
-            for i, texture_info in enumerate(self.texture_list):
-                base_name = texture_info['base_name']
-                texture_dir = texture_info['dir']
-                
-                progress_percent = (i / len(self.texture_list)) * 100
-                self.progress.set(progress_percent)
-                self.status.set(f"Skaliere: {base_name}")
-                
-                # Finde alle Texturen für dieses Material
-                all_textures = [
-                    ("albedo", texture_info['albedo_file']),
-                    ("normal", self.find_texture_file_with_ogl(texture_dir, base_name, self.get_suffixes("normal"))),
-                    ("ao", self.find_texture_file(texture_dir, base_name, self.get_suffixes("ao"))),
-                    ("roughness", self.find_texture_file(texture_dir, base_name, self.get_suffixes("roughness"))),
-                    ("metallic", self.find_texture_file(texture_dir, base_name, self.get_suffixes("metallic"))),
-                    ("height", self.find_texture_file(texture_dir, base_name, self.get_suffixes("height"))),
-                    ("emission", self.find_texture_file(texture_dir, base_name, self.get_suffixes("emission")))
-                ]
-                
-                for map_type, texture_file in all_textures:
-                    if texture_file and os.path.exists(texture_file):
-                        try:
-                            img = Image.open(texture_file)
-                            
-                            # Nur skalieren wenn nötig
-                            if img.size != (target_size, target_size):
-                                # Verwende LANCZOS für beste Qualität beim Verkleinern
-                                # und BICUBIC für Vergrößern
-                                if img.size[0] > target_size:
-                                    resample = Image.Resampling.LANCZOS
-                                else:
-                                    resample = Image.Resampling.BICUBIC
-                                
-                                img = img.resize((target_size, target_size), resample)
-                            
-                            # Generiere Ausgabename
-                            ext = self.output_format.get().lower()
-                            output_name = f"{base_name}_{map_type}.{ext}"
-                            output_path = os.path.join(output_dir, output_name)
-                            
-                            self.save_image_with_format(img, output_path)
-                            total_files += 1
-                            
-                        except Exception as e:
-                            self.log(f"Fehler bei {base_name}_{map_type}: {str(e)}")
-                
-                processed += 1
-            
-            # Jetzt ORM-Maps für die skalierten Texturen generieren
-            self.log("=" * 50)
-            self.log("Generiere ORM-Maps für skalierte Texturen...")
-            orm_created = 0
-            
-            for i, texture_info in enumerate(self.texture_list):
-                base_name = texture_info['base_name']
-                
-                progress_percent = (i / len(self.texture_list)) * 100
-                self.progress.set(progress_percent)
-                self.status.set(f"ORM: {base_name}")
-                
-                # Erstelle ORM aus den skalierten Texturen
-                try:
-                    # Lade skalierte Texturen
-                    ao_file = os.path.join(output_dir, f"{base_name}_ao.{self.output_format.get().lower()}")
-                    roughness_file = os.path.join(output_dir, f"{base_name}_roughness.{self.output_format.get().lower()}")
-                    metallic_file = os.path.join(output_dir, f"{base_name}_metallic.{self.output_format.get().lower()}")
-                    
-                    # Prüfe ob alle Maps vorhanden sind
-                    maps_exist = os.path.exists(ao_file) and os.path.exists(roughness_file) and os.path.exists(metallic_file)
-                    
-                    if maps_exist or self.fill_missing_maps.get():
-                        # Lade oder erstelle Maps
-                        if os.path.exists(ao_file):
-                            ao_img = Image.open(ao_file).convert("L")
-                        else:
-                            ao_img = Image.new("L", (target_size, target_size), self.default_ao_value.get())
-                        
-                        if os.path.exists(roughness_file):
-                            roughness_img = Image.open(roughness_file).convert("L")
-                        else:
-                            roughness_img = Image.new("L", (target_size, target_size), self.default_roughness_value.get())
-                        
-                        if os.path.exists(metallic_file):
-                            metallic_img = Image.open(metallic_file).convert("L")
-                        else:
-                            metallic_img = Image.new("L", (target_size, target_size), self.default_metallic_value.get())
-                        
-                        # Erstelle ORM
-                        orm_map = Image.merge("RGB", (ao_img, roughness_img, metallic_img))
-                        orm_path = os.path.join(output_dir, f"{base_name}_ORM.{self.output_format.get().lower()}")
-                        self.save_image_with_format(orm_map, orm_path)
-                        orm_created += 1
-                        self.log(f"ORM erstellt: {base_name}")
-                    
-                except Exception as e:
-                    self.log(f"Fehler bei ORM für {base_name}: {str(e)}")
-            
-            # Jetzt GLTF-Dateien erstellen
-            self.log("=" * 50)
-            self.log("Generiere GLTF-Dateien...")
-            gltf_created = 0
-            
-            for i, texture_info in enumerate(self.texture_list):
-                base_name = texture_info['base_name']
-                
-                progress_percent = (i / len(self.texture_list)) * 100
-                self.progress.set(progress_percent)
-                self.status.set(f"GLTF: {base_name}")
-                
-                try:
-                    # Erstelle Texture-Dictionary mit relativen Pfaden
-                    gltf_textures = {}
-                    
-                    # Prüfe welche Texturen existieren
-                    for map_type, texture_key in [("albedo", "baseColor"), ("normal", "normal"), ("emission", "emission")]:
-                        texture_path = os.path.join(output_dir, f"{base_name}_{map_type}.{self.output_format.get().lower()}")
-                        if os.path.exists(texture_path):
-                            gltf_textures[texture_key] = f"./{target_size}/{base_name}_{map_type}.{self.output_format.get().lower()}"
-                    
-                    # ORM Map
-                    orm_path = os.path.join(output_dir, f"{base_name}_ORM.{self.output_format.get().lower()}")
-                    if os.path.exists(orm_path):
-                        gltf_textures['orm'] = f"./{target_size}/{base_name}_ORM.{self.output_format.get().lower()}"
-                    
-                    # Erstelle GLTF nur wenn mindestens eine Textur vorhanden ist
-                    if gltf_textures:
-                        gltf_data = self._create_gltf_structure(base_name, gltf_textures)
-                        gltf_file = os.path.join(output_dir, f"{base_name}.gltf")
-                        
-                        with open(gltf_file, 'w') as f:
-                            import json
-                            json.dump(gltf_data, f, indent=2)
-                        
-                        gltf_created += 1
-                        self.log(f"GLTF erstellt: {base_name}.gltf")
-                
-                except Exception as e:
-                    self.log(f"Fehler bei GLTF für {base_name}: {str(e)}")
-            
-            self.progress.set(100)
-            self.status.set("Batch-Verarbeitung abgeschlossen!")
-            self.log("=" * 50)
-            self.log("Zusammenfassung:")
-            self.log(f"  Texturen: {total_files}")
-            self.log(f"  ORM-Maps: {orm_created}")
-            self.log(f"  GLTF-Dateien: {gltf_created}")
-            self.log(f"  Zielordner: {output_dir}")
-            
-            messagebox.showinfo("Fertig", 
-                              "Batch-Verarbeitung abgeschlossen!\n" +
-                              f"Materialien: {processed}\n" +
-                              f"Texturen: {total_files}\n" +
-                              f"ORM-Maps: {orm_created}\n" +
-                              f"GLTF-Dateien: {gltf_created}\n" +
-                              f"Größe: {target_size}x{target_size}\n" +
-                              f"Ordner: {target_size}\\")
+            summary = pipeline.batch_scale(target_size)
+            self.post(messagebox.showinfo, "Fertig",
+                      "Batch-Verarbeitung abgeschlossen!\n" +
+                      f"Materialien: {summary['materials']}\n" +
+                      f"Texturen: {summary['textures']}\n" +
+                      f"ORM-Maps: {summary['orm']}\n" +
+                      f"GLTF-Dateien: {summary['gltf']}\n" +
+                      f"Größe: {target_size}x{target_size}\n" +
+                      f"Ordner: {target_size}\\")
             
         except Exception as e:
             self.log(f"FEHLER: {str(e)}")
-            self.status.set("Fehler bei Skalierung")
-            messagebox.showerror("Fehler", f"Fehler bei Skalierung:\n{str(e)}")
+            self.set_status("Fehler bei Skalierung")
+            self.post(messagebox.showerror, "Fehler", f"Fehler bei Skalierung:\n{str(e)}")
     
     def batch_export_gltf(self):
         """Exportiert alle Materialien als GLTF"""
-        if not self.texture_list:
+        if not self.materials:
             messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
             return
         
-        if messagebox.askyesno("Batch Export", f"Alle {len(self.texture_list)} Materialien als GLTF exportieren?"):
+        if messagebox.askyesno("Batch Export", f"Alle {len(self.materials)} Materialien als GLTF exportieren?"):
             self.generate_gltf()
     
+    def save_session(self):
+        """Speichert die aufgelösten Materialien, um die Sitzung ohne Scan wieder zu öffnen"""
+        if not self.materials:
+            messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
+            return
+        
+        path = filedialog.asksaveasfilename(title="Sitzung speichern", defaultextension=".json",
+                                            initialdir=self.output_dir.get() or self.input_dir.get(),
+                                            initialfile="orm_session.json",
+                                            filetypes=[("ORM Sitzung", "*.json")])
+        if not path:
+            return
+        try:
+            self.materials.save(path, {"input_dir": self.input_dir.get(), "output_dir": self.output_dir.get()})
+            self.log(f"Sitzung gespeichert: {os.path.basename(path)} ({len(self.materials)} Materialien)")
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Sitzung konnte nicht gespeichert werden:\n{str(e)}")
+    
+    def load_session(self):
+        """Lädt eine gespeicherte Sitzung ohne das Dateisystem erneut zu durchsuchen"""
+        path = filedialog.askopenfilename(title="Sitzung laden", filetypes=[("ORM Sitzung", "*.json")])
+        if not path:
+            return
+        try:
+            materials = MaterialStore.load(path)
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Sitzung konnte nicht geladen werden:\n{str(e)}")
+            return
+        self.input_dir.set(materials.meta.get("input_dir", ""))
+        self.output_dir.set(materials.meta.get("output_dir", ""))
+        self.materials = materials
+        self.current_texture_index = 0
+        self.log(f"Sitzung geladen: {os.path.basename(path)} ({len(materials)} Materialien)")
+        self.status.set(f"{len(materials)} Texturen geladen")
+        if self.materials:
+            self.show_current_texture()
+    
     def browse_input_dir(self):
         directory = filedialog.askdirectory(title="Eingabe-Verzeichnis auswählen")
         if directory:
@@ -950,245 +4374,200 @@ class ORMGeneratorGUI:
             self.output_dir.set(directory)
     
     def log(self, message):
-        self.log_text.insert(tk.END, message + "\n")
+        """Log-Zeile; aus jedem Thread aufrufbar"""
+        self.ui_events.put(("log", message))
+    
+    def set_status(self, text):
+        self.ui_events.put(("status", text))
+    
+    def set_progress(self, value):
+        self.ui_events.put(("progress", value))
+    
+    def post(self, function, *args):
+        """Führt einen Tk-Aufruf (z.B. messagebox) aus einem Worker-Thread im Hauptthread aus"""
+        self.ui_events.put(("call", (function, args)))
+    
+    def drain_ui_events(self):
+        """Arbeitet die angesammelten Ereignisse ab: Log-Zeilen in einem Rutsch, von Status
+        und Fortschritt nur der letzte Wert. Läuft alle UI_DRAIN_MS im Tk-Hauptthread."""
+        # Zuerst neu planen: ein modaler Dialog aus einem Aufruf blockiert so nicht das Log
+        self.root.after(UI_DRAIN_MS, self.drain_ui_events)
+        lines = []
+        status = progress = None
+        for _ in range(self.ui_events.qsize()):
+            try:
+                kind, payload = self.ui_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "log":
+                lines.append(payload)
+            elif kind == "status":
+                status = payload
+            elif kind == "progress":
+                progress = payload
+            else:
+                # Reihenfolge zu den Log-Zeilen erhalten
+                self.write_log(lines)
+                lines = []
+                function, args = payload
+                function(*args)
+        self.write_log(lines)
+        if status is not None:
+            self.status.set(status)
+        if progress is not None:
+            self.progress.set(progress)
+    
+    def write_log(self, lines):
+        """Hängt Zeilen an die Log-Datei und an die Log-Ansicht (Ringpuffer von LOG_VIEW_LINES Zeilen) an"""
+        if not lines:
+            return
+        if self.log_file:
+            stamp = time.strftime("%H:%M:%S")
+            self.log_file.write("".join(f"{stamp} {line}\n" for line in lines))
+            self.log_file.flush()
+        self.log_text.insert(tk.END, "\n".join(lines[-LOG_VIEW_LINES:]) + "\n")
+        excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - LOG_VIEW_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         self.log_text.see(tk.END)
-        self.root.update_idletasks()
     
     def load_textures(self):
         if not self.input_dir.get():
             messagebox.showerror("Fehler", "Bitte Eingabe-Verzeichnis auswählen!")
             return
         
-        thread = threading.Thread(target=self._load_textures_thread)
-        thread.daemon = True
-        thread.start()
+        self.submit_job("Texturen laden", self._load_textures_thread,
+                        [self.output_dir.get() or self.input_dir.get()])
     
-    def _load_textures_thread(self):
-        import shutil
-        input_dir = self.input_dir.get()
-        output_dir = self.output_dir.get()
-        self.status.set("Suche Texturen...")
-        self.log_text.delete(1.0, tk.END)
-        # Alle Albedo-Texturen finden
-        albedo_files = []
-        albedo_suffixes = self.get_suffixes("albedo")
-        extensions = self.get_extensions()
-        separators = self.get_separators()
-        resolutions = self.get_resolutions()
-        preferred_res = self.preferred_resolution.get()
-        for suffix in albedo_suffixes:
-            for ext in extensions:
-                for sep in separators:
-                    pattern = f"*{sep}{suffix}.{ext}"
-                    albedo_files.extend(glob.glob(os.path.join(input_dir, pattern)))
-                    if self.recursive_search.get():
-                        albedo_files.extend(glob.glob(os.path.join(input_dir, "**", pattern), recursive=True))
-                    if preferred_res == "auto":
-                        search_resolutions = resolutions
-                    else:
-                        search_resolutions = [preferred_res] + [r for r in resolutions if r != preferred_res]
-                    for res in search_resolutions:
-                        pattern_res = f"*{sep}{suffix}_{res}.{ext}"
-                        albedo_files.extend(glob.glob(os.path.join(input_dir, pattern_res)))
-                        if self.recursive_search.get():
-                            albedo_files.extend(glob.glob(os.path.join(input_dir, "**", pattern_res), recursive=True))
-        albedo_files = list(set(albedo_files))
-        if not albedo_files:
-            self.log("Keine Texturen gefunden!")
-            self.status.set("Fehler: Keine Texturen gefunden")
-            return
-        # Extrahiere Base-Namen und kopiere alle relevanten Texturen ins Ausgabe-Verzeichnis
-        self.texture_list = []
-        map_types = [
-            ("albedo", self.get_suffixes("albedo")),
-            ("normal", self.get_suffixes("normal")),
-            ("ao", self.get_suffixes("ao")),
-            ("roughness", self.get_suffixes("roughness")),
-            ("metallic", self.get_suffixes("metallic")),
-            ("height", self.get_suffixes("height")),
-            ("emission", self.get_suffixes("emission")),
-        ]
-        for albedo_file in albedo_files:
-            base_name = os.path.basename(albedo_file)
-            base_name_clean = None
-            for suffix in albedo_suffixes:
-                for ext in extensions:
-                    for sep in separators:
-                        full_suffix = f"{sep}{suffix}.{ext}"
-                        if base_name.endswith(full_suffix):
-                            base_name_clean = base_name[:-(len(full_suffix))]
-                            break
-                        for res in resolutions:
-                            full_suffix_res = f"{sep}{suffix}_{res}.{ext}"
-                            if base_name.endswith(full_suffix_res):
-                                base_name_clean = base_name[:-(len(full_suffix_res))]
-                                break
-                        else:
-                            continue
-                        break
-                    else:
-                        continue
-                    break
-                else:
-                    continue
-                break
-            if base_name_clean is None:
-                continue
-            texture_entry = {'base_name': base_name_clean, 'dir': output_dir if output_dir else os.path.dirname(albedo_file)}
-            # Kopiere und finde alle relevanten Texturen
-            for map_type, suffixes in map_types:
-                found_file = None
-                if map_type == "albedo":
-                    found_file = albedo_file
-                elif map_type == "normal":
-                    found_file = self.find_texture_file_with_ogl(os.path.dirname(albedo_file), base_name_clean, suffixes)
-                else:
-                    found_file = self.find_texture_file(os.path.dirname(albedo_file), base_name_clean, suffixes)
-                if found_file and os.path.exists(found_file):
-                    if output_dir and os.path.abspath(os.path.dirname(found_file)) != os.path.abspath(output_dir):
-                        dst = os.path.join(output_dir, os.path.basename(found_file))
-                        try:
-                            shutil.copy2(found_file, dst)
-                            found_file_out = dst
-                        except Exception as copy_err:
-                            self.log(f"WARNUNG: Konnte {found_file} nicht kopieren: {copy_err}")
-                            found_file_out = found_file
-                    else:
-                        found_file_out = found_file
-                    texture_entry[f"{map_type}_file"] = found_file_out
-                else:
-                    texture_entry[f"{map_type}_file"] = None
-            self.texture_list.append(texture_entry)
+    def _load_textures_thread(self, pipeline):
+        self.post(self.log_text.delete, 1.0, tk.END)
+        pipeline.load_textures()
+        self.materials = pipeline.materials
         self.current_texture_index = 0
-        self.log(f"Gefunden: {len(self.texture_list)} Textur-Sets")
-        self.status.set(f"{len(self.texture_list)} Texturen geladen")
-        if self.texture_list:
-            self.show_current_texture()
+        if self.materials:
+            self.post(self.show_current_texture)
     
-    def show_current_texture(self):
-        if not self.texture_list:
-            return
-        
-        texture_info = self.texture_list[self.current_texture_index]
-        base_name = texture_info['base_name']
-        texture_dir = texture_info['dir']
-        
-        self.texture_label.config(text=f"Textur {self.current_texture_index + 1}/{len(self.texture_list)}: {base_name}")
-        
-        # Finde Textur-Dateien mit JSON-Konfiguration
-        normal_file = self.find_texture_file_with_ogl(texture_dir, base_name, self.get_suffixes("normal"))
-        ao_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("ao"))
-        roughness_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("roughness"))
-        metallic_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("metallic"))
-        height_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("height"))
-        emission_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("emission"))
+    def preview_files(self, material):
+        """Dateien der Vorschaufelder eines Materials (None = fehlt)"""
+        files = {map_type: material.path(map_type) for map_type in MAP_TYPES}
         
         # Falls AO fehlt, Height verwenden
-        if not ao_file and height_file and self.use_height_for_ao.get():
-            ao_file = height_file
+        if not files["ao"] and files["height"] and self.use_height_for_ao.get():
+            files["ao"] = files["height"]
         
         # ORM Datei prüfen
-        output_dir = self.output_dir.get() or os.path.join(texture_dir, "ORM_Maps")
-        orm_file = os.path.join(output_dir, f"{base_name}_ORM.png")
-        
-        # Zeige Previews
-        self.show_preview_image(normal_file, self.normal_preview, "Normal fehlt")
-        self.show_preview_image(texture_info['albedo_file'], self.albedo_preview, "Albedo fehlt")
-        self.show_preview_image(ao_file, self.ao_preview, "AO fehlt")
-        self.show_preview_image(roughness_file, self.roughness_preview, "Roughness fehlt")
-        self.show_preview_image(metallic_file, self.metallic_preview, "Metallic fehlt")
-        self.show_preview_image(emission_file, self.emission_preview, "Emission fehlt")
-        
-        # Erstelle kombinierte Preview (alle Bestandteile)
-        self.create_combined_preview(texture_info['albedo_file'], normal_file, ao_file, 
-                                    roughness_file, metallic_file, height_file, emission_file)
-        
-        if os.path.exists(orm_file):
-            self.show_preview_image(orm_file, self.orm_preview, "ORM Map")
-        else:
-            self.orm_preview.config(image='', text="Noch nicht generiert")
-    
-    def find_texture_file(self, directory, base_name, suffixes):
-        extensions = self.get_extensions()
-        separators = self.get_separators()
-        resolutions = self.get_resolutions()
-        
-        for suffix in suffixes:
-            for sep in separators:
-                for ext in extensions:
-                    # Standard: material_rough.jpg
-                    path = os.path.join(directory, f"{base_name}{sep}{suffix}.{ext}")
-                    if os.path.exists(path):
-                        return path
-                    
-                    # Polyhaven: material_rough_1k.jpg
-                    for res in resolutions:
-                        path_res = os.path.join(directory, f"{base_name}{sep}{suffix}_{res}.{ext}")
-                        if os.path.exists(path_res):
-                            return path_res
-        return None
+        output_dir = self.output_dir.get() or os.path.join(material.dir, "ORM_Maps")
+        files["orm"] = os.path.join(output_dir, f"{material.base_name}_ORM.png")
+        return {slot: path if path and os.path.exists(path) else None for slot, path in files.items()}
     
-    def find_texture_file_with_ogl(self, directory, base_name, suffixes):
-        """Spezielle Suche für Normal-Maps die oft -ogl oder Nummern haben"""
-        extensions = self.get_extensions()
-        separators = self.get_separators()
-        resolutions = self.get_resolutions()
-        
-        # Erst normale Suche (inkl. Polyhaven-Auflösungen)
-        result = self.find_texture_file(directory, base_name, suffixes)
-        if result:
-            return result
-        
-        # Dann mit -ogl und Nummern
-        import glob as glob_mod
-        for suffix in suffixes:
-            for sep in separators:
-                for ext in extensions:
-                    # Polyhaven: material_nor_gl_1k.jpg (with underscore before resolution)
-                    for res in resolutions:
-                        # Pattern: *_nor_gl_1k.jpg
-                        pattern = os.path.join(directory, f"{base_name}{sep}{suffix}_{res}.{ext}")
-                        matches = glob_mod.glob(pattern)
-                        if matches:
-                            return matches[0]
-                    
-                    # Mit -ogl Suffix: material_normal-ogl.jpg
-                    pattern = os.path.join(directory, f"{base_name}{sep}{suffix}*-ogl.{ext}")
-                    matches = glob_mod.glob(pattern)
-                    if matches:
-                        return matches[0]
-                    
-                    # Mit Nummern: material_normal4.jpg
-                    pattern = os.path.join(directory, f"{base_name}{sep}{suffix}[0-9].{ext}")
-                    matches = glob_mod.glob(pattern)
-                    if matches:
-                        return matches[0]
-        
-        return None
+    def request_preview(self, index):
+        """Vorschau eines Materials: {feld: (Bild, Originalgröße), Future oder None}.
+        
+        Treffer im PreviewCache kommen direkt zurück, der Rest wird im Thread-Pool geladen.
+        """
+        files = self.preview_files(self.materials[index])
+        size = int(PREVIEW_SIZE * self.zoom_level)
+        requests = {}
+        for slot, fallback_text in PREVIEW_SLOTS:
+            path = files[slot]
+            requests[slot] = path and (self.preview_cache.peek(path, size) or
+                                       self.submit_preview(("thumbnail", path, size), self.preview_cache.get, path, size))
+        combined = tuple(files[map_type] for map_type in COMBINED_PREVIEW_MAPS)
+        requests["combined"] = files["albedo"] and (self.preview_cache.peek_combined(combined) or
+                                                    self.submit_preview(("combined", combined),
+                                                                        self.preview_cache.get_combined, combined))
+        return requests
     
-    def show_preview_image(self, file_path, label_widget, fallback_text):
-        if not file_path or not os.path.exists(file_path):
-            label_widget.config(image='', text=fallback_text)
+    def prefetch_preview(self, index):
+        """Lädt die Vorschau eines Nachbar-Materials vor; gibt die laufenden Futures zurück"""
+        files = self.preview_files(self.materials[index])
+        size = int(PREVIEW_SIZE * self.zoom_level)
+        futures = [self.submit_preview(("thumbnail", path, size), self.preview_cache.get, path, size)
+                   for path in (files[slot] for slot, fallback_text in PREVIEW_SLOTS)
+                   if path and not self.preview_cache.cached(path, size)]
+        combined = tuple(files[map_type] for map_type in COMBINED_PREVIEW_MAPS)
+        if files["albedo"] and not self.preview_cache.cached_combined(combined):
+            futures.append(self.submit_preview(("combined", combined), self.preview_cache.get_combined, combined))
+        return futures
+    
+    def submit_preview(self, key, function, *args):
+        """Auftrag in den Thread-Pool; laufende Aufträge werden wiederverwendet"""
+        future = self.preview_jobs.get(key)
+        # Fertige Ergebnisse liegen im PreviewCache; fehlen sie dort (verdrängt oder
+        # Datei geändert), wird neu geladen
+        if future is None or future.done():
+            future = self.preview_pool.submit(function, *args)
+            self.preview_jobs[key] = future
+        return future
+    
+    def show_current_texture(self):
+        if not self.materials:
             return
         
+        material = self.materials[self.current_texture_index]
+        base_name = material.base_name
+        
+        resolutions = f" ({'/'.join(map(str, material.resolutions))}px)" if len(material.resolutions) > 1 else ""
+        self.texture_label.config(text=f"Textur {self.current_texture_index + 1}/{len(self.materials)}: {base_name}{resolutions}")
+        
+        # Aktuelles Material zuerst in die Warteschlange, dann die Nachbarn vorladen
+        self.preview_token += 1
+        requests = self.request_preview(self.current_texture_index)
+        wanted = {request for request in requests.values() if isinstance(request, Future)}
+        for offset in range(1, PREVIEW_PREFETCH + 1):
+            for index in (self.current_texture_index + offset, self.current_texture_index - offset):
+                wanted.update(self.prefetch_preview(index % len(self.materials)))
+        
+        # Veraltete Vorlade-Aufträge abbrechen
+        for key, future in list(self.preview_jobs.items()):
+            if future not in wanted:
+                future.cancel()
+                del self.preview_jobs[key]
+        
+        # Sofort Platzhalter oder fertige Bilder zeigen, der Rest folgt per Polling
+        for slot, request in list(requests.items()):
+            widget = self.preview_widget(slot)
+            if request is None:
+                widget.config(image='', text=PREVIEW_FALLBACK_TEXTS[slot])
+            elif isinstance(request, tuple):
+                self.show_preview_image(request, widget)
+                del requests[slot]
+            elif not request.done():
+                widget.config(image='', text="Lade...")
+        self.poll_preview(self.preview_token, requests)
+        self.update_preview_cache_label()
+    
+    def preview_widget(self, slot):
+        return getattr(self, f"{slot}_preview")
+    
+    def poll_preview(self, token, requests):
+        """Zeigt fertige Vorschauen an (Tk-Hauptthread), solange kein anderes Material gewählt wurde"""
+        if token != self.preview_token:
+            return
+        for slot, future in list(requests.items()):
+            if future is None or not future.done():
+                continue
+            del requests[slot]
+            try:
+                self.show_preview_image(future.result(), self.preview_widget(slot))
+            except Exception as e:
+                self.preview_widget(slot).config(image='', text=f"Fehler: {str(e)[:20]}")
+            self.update_preview_cache_label()
+        if any(requests.values()):
+            self.root.after(PREVIEW_POLL_MS, self.poll_preview, token, requests)
+    
+    def update_preview_cache_label(self):
+        """Zähler des Vorschau-Caches unter der Vorschau"""
+        stats = self.preview_cache.stats()
+        self.preview_cache_label.config(
+            text=f"Vorschau-Cache: {stats['hits']} Treffer · {stats['misses']} geladen · "
+                 f"{stats['evictions']} verdrängt · {stats['invalidations']} veraltet · "
+                 f"{stats['bytes'] / 2**20:.1f}/{self.preview_cache.budget / 2**20:.0f} MB")
+    
+    def show_preview_image(self, result, label_widget):
         try:
-            # Cache-Key
-            cache_key = f"{file_path}_{self.zoom_level}"
-            
-            # Prüfe Cache
-            if cache_key in self.preview_cache:
-                photo = self.preview_cache[cache_key]
-            else:
-                img = Image.open(file_path)
-                base_size = int(200 * self.zoom_level)
-                img.thumbnail((base_size, base_size), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                
-                # In Cache speichern (max 50 Bilder)
-                if len(self.preview_cache) > 50:
-                    # Älteste Einträge entfernen
-                    self.preview_cache.pop(next(iter(self.preview_cache)))
-                self.preview_cache[cache_key] = photo
+            img, source_size = result
+            photo = ImageTk.PhotoImage(img)
             
             # Speichere Referenz
             label_widget.image = photo
@@ -1196,82 +4575,21 @@ class ORMGeneratorGUI:
             
             # Validierung
             if self.validate_resolution.get():
-                img_for_check = Image.open(file_path)
-                if img_for_check.size[0] != img_for_check.size[1]:
-                    label_widget.config(text=f"⚠️ Nicht quadratisch\n{img_for_check.size[0]}x{img_for_check.size[1]}")
+                if source_size[0] != source_size[1]:
+                    label_widget.config(text=f"⚠️ Nicht quadratisch\n{source_size[0]}x{source_size[1]}")
         except Exception as e:
             label_widget.config(image='', text=f"Fehler: {str(e)[:20]}")
     
-    def create_combined_preview(self, albedo_file, normal_file, ao_file, 
-                               roughness_file, metallic_file, height_file, emission_file=None):
-        """Erstellt eine kombinierte Vorschau - zeigt wie das Material aussehen würde"""
-        try:
-            # Lade Basis-Textur (Albedo)
-            if not albedo_file or not os.path.exists(albedo_file):
-                self.combined_preview.config(image='', text="Albedo fehlt")
-                return
-            
-            base_img = Image.open(albedo_file).convert('RGB')
-            width, height = base_img.size
-            
-            # Erstelle Pixel-Arrays für Verarbeitung
-            import numpy as np
-            albedo_data = np.array(base_img, dtype=np.float32) / 255.0
-            
-            # Lade AO und multipliziere mit Albedo (dunkelt Schatten ab)
-            if ao_file and os.path.exists(ao_file):
-                ao_img = Image.open(ao_file).convert('L').resize((width, height), Image.Resampling.LANCZOS)
-                ao_data = np.array(ao_img, dtype=np.float32) / 255.0
-                albedo_data *= ao_data[:, :, np.newaxis]
-            
-            # Simuliere Roughness-Effekt (weichere Albedo bei hoher Roughness)
-            if roughness_file and os.path.exists(roughness_file):
-                rough_img = Image.open(roughness_file).convert('L').resize((width, height), Image.Resampling.LANCZOS)
-                rough_data = np.array(rough_img, dtype=np.float32) / 255.0
-                # Leichtes Blur für raue Bereiche simulieren
-                roughness_factor = 0.85 + (rough_data * 0.15)
-                albedo_data *= roughness_factor[:, :, np.newaxis]
-            
-            # Simuliere Metallic-Effekt (metallische Bereiche reflektieren mehr)
-            if metallic_file and os.path.exists(metallic_file):
-                metal_img = Image.open(metallic_file).convert('L').resize((width, height), Image.Resampling.LANCZOS)
-                metal_data = np.array(metal_img, dtype=np.float32) / 255.0
-                # Metallische Bereiche sind glänzender (heller)
-                metallic_boost = 1.0 + (metal_data * 0.3)
-                albedo_data *= metallic_boost[:, :, np.newaxis]
-            
-            # Addiere Emission (selbstleuchtend, unabhängig von Beleuchtung)
-            if emission_file and os.path.exists(emission_file):
-                emission_img = Image.open(emission_file).convert('RGB').resize((width, height), Image.Resampling.LANCZOS)
-                emission_data = np.array(emission_img, dtype=np.float32) / 255.0
-                # Emission wird addiert (nicht multipliziert) - leuchtet selbst
-                albedo_data += emission_data * 0.5  # 50% Stärke für bessere Sichtbarkeit
-            
-            # Konvertiere zurück zu Bild
-            result_data = np.clip(albedo_data * 255.0, 0, 255).astype(np.uint8)
-            result_img = Image.fromarray(result_data, mode='RGB')
-            
-            # Skaliere für Vorschau
-            result_img.thumbnail((200, 200), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(result_img)
-            
-            # Speichere Referenz (verhindert Garbage Collection)
-            self.combined_preview.image = photo  # type: ignore
-            self.combined_preview.config(image=photo, text='')
-            
-        except Exception as e:
-            self.combined_preview.config(image='', text=f"Fehler: {str(e)[:30]}")
-    
     def prev_texture(self):
-        if not self.texture_list:
+        if not self.materials:
             return
-        self.current_texture_index = (self.current_texture_index - 1) % len(self.texture_list)
+        self.current_texture_index = (self.current_texture_index - 1) % len(self.materials)
         self.show_current_texture()
     
     def next_texture(self):
-        if not self.texture_list:
+        if not self.materials:
             return
-        self.current_texture_index = (self.current_texture_index + 1) % len(self.texture_list)
+        self.current_texture_index = (self.current_texture_index + 1) % len(self.materials)
         self.show_current_texture()
     
     def start_generation(self):
@@ -1279,376 +4597,81 @@ class ORMGeneratorGUI:
             messagebox.showerror("Fehler", "Bitte Eingabe- und Ausgabe-Verzeichnis auswählen!")
             return
         
-        if not self.texture_list:
+        if not self.materials:
             messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
             return
         
-        thread = threading.Thread(target=self.generate_orm_maps)
-        thread.daemon = True
-        thread.start()
+        self.submit_job("ORM-Maps", self.generate_orm_maps, [self.create_pipeline().orm_output_dir()])
     
-    def generate_missing_maps(self):
-        """Generiert nur fehlende Einzeltexturen (AO, Roughness, Metallic) als separate Dateien"""
-        if not self.texture_list:
-            messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
-            return
-        
-        if not self.input_dir.get():
-            messagebox.showerror("Fehler", "Bitte Eingabe-Verzeichnis auswählen!")
+    def regenerate_current_orm(self):
+        """ORM-Map des angezeigten Materials als interaktiver Job (vor laufenden Batch-Jobs)"""
+        if not self.output_dir.get():
+            messagebox.showerror("Fehler", "Bitte Ausgabe-Verzeichnis auswählen!")
             return
         
-        thread = threading.Thread(target=self._generate_missing_maps_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def _generate_missing_maps_thread(self):
-        """Thread-Funktion für Generierung fehlender Maps"""
-        try:
-            self.status.set("Generiere fehlende Maps...")
-            self.progress.set(0)
-            
-            generated = 0
-            skipped = 0
-            log_data = []
-            
-            for i, texture_info in enumerate(self.texture_list):
-                base_name = texture_info['base_name']
-                texture_dir = texture_info['dir']
-                output_dir = self.output_dir.get() or texture_dir
-                
-                progress_percent = (i / len(self.texture_list)) * 100
-                self.progress.set(progress_percent)
-                self.status.set(f"Prüfe: {base_name}")
-                
-                # Prüfe welche Maps fehlen
-                ao_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("ao"))
-                roughness_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("roughness"))
-                metallic_file = self.find_texture_file(texture_dir, base_name, self.get_suffixes("metallic"))
-                
-                # Bestimme Zielgröße
-                reference_img = None
-                if texture_info['albedo_file']:
-                    reference_img = Image.open(texture_info['albedo_file'])
-                
-                if reference_img:
-                    target_size = reference_img.size
-                else:
-                    target_size = (1024, 1024)
-                
-                created_maps = []
-                
-                # Erstelle fehlende AO
-                if not ao_file:
-                    ao_value = self.default_ao_value.get()
-                    ao_img = Image.new("L", target_size, ao_value)
-                    ao_path = os.path.join(output_dir, f"{base_name}_ao.{self.output_format.get().lower()}")
-                    os.makedirs(output_dir, exist_ok=True)
-                    self.save_image_with_format(ao_img, ao_path)
-                    created_maps.append("AO")
-                
-                # Erstelle fehlende Roughness oder invertiere Gloss
-                if not roughness_file or (roughness_file and "gloss" in os.path.basename(roughness_file).lower() and self.invert_gloss.get()):
-                    if roughness_file and "gloss" in os.path.basename(roughness_file).lower():
-                        # Invertiere Gloss zu Roughness
-                        gloss_img = Image.open(roughness_file).convert("L")
-                        from PIL import ImageOps
-                        rough_img = ImageOps.invert(gloss_img)
-                        created_maps.append("Roughness (invertiert)")
-                    else:
-                        # Erstelle neue
-                        rough_value = self.default_roughness_value.get()
-                        rough_img = Image.new("L", target_size, rough_value)
-                        created_maps.append("Roughness")
-                    
-                    rough_path = os.path.join(output_dir, f"{base_name}_roughness.{self.output_format.get().lower()}")
-                    os.makedirs(output_dir, exist_ok=True)
-                    self.save_image_with_format(rough_img, rough_path)
-                
-                # Erstelle fehlende Metallic
-                if not metallic_file:
-                    metal_value = self.default_metallic_value.get()
-                    metal_img = Image.new("L", target_size, metal_value)
-                    metal_path = os.path.join(output_dir, f"{base_name}_metallic.{self.output_format.get().lower()}")
-                    os.makedirs(output_dir, exist_ok=True)
-                    self.save_image_with_format(metal_img, metal_path)
-                    created_maps.append("Metallic")
-                
-                if created_maps:
-                    self.log(f"Erstellt für {base_name}: {', '.join(created_maps)}")
-                    generated += 1
-                    log_data.append({"material": base_name, "created": ", ".join(created_maps)})
-                else:
-                    skipped += 1
-            
-            self.progress.set(100)
-            self.status.set("Fehlende Maps generiert!")
-            self.log("=" * 50)
-            self.log(f"Materialien mit erstellten Maps: {generated}, Vollständig: {skipped}")
-            
-            # Export Log
-            if self.export_log.get() and log_data:
-                self.export_process_log(log_data, "missing_maps")
-            
-            messagebox.showinfo("Fertig", f"Fehlende Maps generiert!\nBearbeitet: {generated}\nVollständig: {skipped}")
-            
-        except Exception as e:
-            self.log(f"FEHLER: {str(e)}")
-            self.status.set("Fehler aufgetreten")
-            messagebox.showerror("Fehler", f"Fehler bei Map-Generierung:\n{str(e)}")
-    
-    def save_image_with_format(self, img, path):
-        """Speichert Bild im gewählten Format mit Kompression"""
-        format_ext = self.output_format.get()
+        if not self.materials:
+            messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
+            return
         
-        if format_ext == "PNG":
-            img.save(path, "PNG", optimize=True)
-        elif format_ext == "JPEG":
-            if img.mode != "RGB":
-                img = img.convert("RGB")
-            img.save(path, "JPEG", quality=self.compression_quality.get(), optimize=True)
-        elif format_ext == "JP2":
-            if img.mode != "RGB":
-                img = img.convert("RGB")
-            img.save(path, "JPEG2000", quality_mode="dB", quality_layers=[self.compression_quality.get()])
+        material = self.materials[self.current_texture_index]
+        output_dir = self.create_pipeline().orm_output_dir()
+        self.submit_job(f"ORM {material.base_name}",
+                        lambda pipeline: self._regenerate_orm_thread(pipeline, material, output_dir),
+                        [output_dir], lane="interactive")
     
-    def export_process_log(self, log_data, operation_name):
-        """Exportiert Verarbeitungslog"""
+    def _regenerate_orm_thread(self, pipeline, material, output_dir):
+        """Thread-Funktion für die ORM-Map eines einzelnen Materials"""
         try:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = self.output_dir.get() or self.input_dir.get()
-            log_file = None
-            
-            if self.log_format.get() == "CSV":
-                log_file = os.path.join(output_dir, f"log_{operation_name}_{timestamp}.csv")
-                with open(log_file, 'w', newline='', encoding='utf-8') as f:
-                    if log_data:
-                        writer = csv.DictWriter(f, fieldnames=log_data[0].keys())
-                        writer.writeheader()
-                        writer.writerows(log_data)
-                        
-            elif self.log_format.get() == "JSON":
-                log_file = os.path.join(output_dir, f"log_{operation_name}_{timestamp}.json")
-                with open(log_file, 'w', encoding='utf-8') as f:
-                    json.dump(log_data, f, indent=2, ensure_ascii=False)
-                    
-            elif self.log_format.get() == "TXT":
-                log_file = os.path.join(output_dir, f"log_{operation_name}_{timestamp}.txt")
-                with open(log_file, 'w', encoding='utf-8') as f:
-                    for entry in log_data:
-                        f.write(f"{entry}\n")
-            
-            if log_file:
-                self.log(f"Log gespeichert: {os.path.basename(log_file)}")
-            
+            os.makedirs(output_dir, exist_ok=True)
+            if pipeline.create_single_orm_map(material, output_dir, pipeline.target_size()):
+                self.log(f"ORM neu erzeugt: {material.base_name}")
+            self.post(self.show_current_texture)
         except Exception as e:
-            self.log(f"Log-Export-Fehler: {str(e)}")
+            self.log(f"FEHLER ORM {material.base_name}: {str(e)}")
     
-    def generate_orm_maps(self):
+    def generate_missing_maps(self):
+        """Generiert nur fehlende Einzeltexturen (AO, Roughness, Metallic) als separate Dateien"""
+        if not self.materials:
+            messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
+            return
+        
+        if not self.input_dir.get():
+            messagebox.showerror("Fehler", "Bitte Eingabe-Verzeichnis auswählen!")
+            return
+        
+        self.submit_job("Fehlende Maps", self._generate_missing_maps_thread,
+                        [self.output_dir.get() or self.input_dir.get()])
+    
+    def _generate_missing_maps_thread(self, pipeline):
+        """Thread-Funktion für Generierung fehlender Maps"""
         try:
-            base_output_dir = self.output_dir.get()
-            
-            # Wenn Zielauflösung gesetzt ist, erstelle Unterordner
-            if self.target_resolution.get() != "original":
-                output_dir = os.path.join(base_output_dir, self.target_resolution.get())
-            else:
-                output_dir = base_output_dir
-            
-            os.makedirs(output_dir, exist_ok=True)
-            
-            self.status.set("Generiere ORM-Maps...")
-            self.progress.set(0)
-            
-            processed = 0
-            errors = 0
-            
-            for i, texture_info in enumerate(self.texture_list):
-                base_name = texture_info['base_name']
-                texture_dir = texture_info['dir']
-                
-                progress_percent = (i / len(self.texture_list)) * 100
-                self.progress.set(progress_percent)
-                self.status.set(f"Verarbeite: {base_name}")
-                
-                # Verwende Skalierung wenn gesetzt
-                target_size = None
-                if self.target_resolution.get() != "original":
-                    target_size = int(self.target_resolution.get())
-                
-                success = self.create_single_orm_map(texture_dir, output_dir, base_name, target_size)
-                
-                if success:
-                    processed += 1
-                else:
-                    errors += 1
-            
-            self.progress.set(100)
-            self.status.set("Fertig!")
-            self.log("=" * 50)
-            self.log(f"Erfolgreich: {processed}, Fehler: {errors}")
-            
-            # Zeige ORM Preview nach Generierung
-            if self.texture_list:
-                self.show_current_texture()
-            
-            messagebox.showinfo("Fertig", f"Verarbeitung abgeschlossen!\nErfolgreich: {processed}\nFehler: {errors}")
-            
+            summary = pipeline.generate_missing_maps()
+            self.post(messagebox.showinfo, "Fertig",
+                      f"Fehlende Maps generiert!\nBearbeitet: {summary['generated']}\nVollständig: {summary['complete']}")
         except Exception as e:
             self.log(f"FEHLER: {str(e)}")
-            self.status.set("Fehler aufgetreten")
-            messagebox.showerror("Fehler", f"Ein Fehler ist aufgetreten:\n{str(e)}")
+            self.set_status("Fehler aufgetreten")
+            self.post(messagebox.showerror, "Fehler", f"Fehler bei Map-Generierung:\n{str(e)}")
     
-    def create_single_orm_map(self, input_dir, output_dir, base_name, target_size=None):
+    def generate_orm_maps(self, pipeline):
         try:
-            # Lade Suffix-Definitionen aus JSON
-            ao_suffixes = self.get_suffixes("ao")
-            roughness_suffixes = self.get_suffixes("roughness")
-            metallic_suffixes = self.get_suffixes("metallic")
-            height_suffixes = self.get_suffixes("height")
+            summary = pipeline.generate_orm_maps()
             
-            def find_texture_file(base, suffix_list):
-                extensions = self.get_extensions()
-                separators = self.get_separators()
-                resolutions = self.get_resolutions()
-                
-                for suffix in suffix_list:
-                    for sep in separators:
-                        for ext in extensions:
-                            # Standard: material_rough.jpg
-                            path = os.path.join(input_dir, f"{base}{sep}{suffix}.{ext}")
-                            if os.path.exists(path):
-                                return path
-                            
-                            # Polyhaven: material_rough_1k.jpg
-                            for res in resolutions:
-                                path_res = os.path.join(input_dir, f"{base}{sep}{suffix}_{res}.{ext}")
-                                if os.path.exists(path_res):
-                                    return path_res
-                return None
-            
-            ao_file = find_texture_file(base_name, ao_suffixes)
-            roughness_file = find_texture_file(base_name, roughness_suffixes)
-            metallic_file = find_texture_file(base_name, metallic_suffixes)
-            height_file = find_texture_file(base_name, height_suffixes)
-            
-            # Ausgabeformat
-            output_ext = self.output_format.get().lower()
-            output_file = os.path.join(output_dir, f"{base_name}_ORM.{output_ext}")
-            
-            if os.path.exists(output_file) and not self.overwrite_existing.get():
-                self.log(f"Übersprungen: {base_name}")
-                return True
-            
-            if self.use_height_for_ao.get() and not ao_file and height_file:
-                ao_file = height_file
-            
-            # Prüfe ob fehlende Maps automatisch aufgefüllt werden sollen
-            if not self.fill_missing_maps.get():
-                # Alte Logik: Fehlende Maps führen zu Fehler
-                missing_files = []
-                if not ao_file:
-                    missing_files.append("ao")
-                if not roughness_file:
-                    missing_files.append("roughness")
-                if not metallic_file:
-                    missing_files.append("metallic")
-                
-                if missing_files:
-                    self.log(f"FEHLER {base_name}: Fehlende Dateien - {', '.join(missing_files)}")
-                    return False
-            
-            # Bestimme Zielgröße
-            if target_size:
-                # Explizite Zielgröße übergeben
-                final_size = (target_size, target_size)
-            else:
-                # Bestimme aus vorhandenen Dateien
-                reference_img = None
-                if ao_file:
-                    reference_img = Image.open(ao_file)
-                elif roughness_file:
-                    reference_img = Image.open(roughness_file)
-                elif metallic_file:
-                    reference_img = Image.open(metallic_file)
-                
-                # Falls alle fehlen, verwende Standardgröße
-                if reference_img:
-                    final_size = reference_img.size
-                else:
-                    final_size = (1024, 1024)  # Standardgröße
-            
-            # Validierung: Auflösungskonsistenz (nur wenn nicht skaliert wird)
-            if self.validate_resolution.get() and not target_size:
-                sizes = []
-                for f in [ao_file, roughness_file, metallic_file]:
-                    if f and os.path.exists(f):
-                        img = Image.open(f)
-                        sizes.append(img.size)
-                
-                if len(set(sizes)) > 1:
-                    self.log(f"WARNUNG {base_name}: Inkonsistente Auflösungen - {sizes}")
-            
-            # Lade oder erstelle AO (Standard: Weiß = keine Verdeckung)
-            if ao_file and os.path.exists(ao_file):
-                ao_img = Image.open(ao_file).convert("L")
-                if ao_img.size != final_size:
-                    resample = Image.Resampling.LANCZOS if ao_img.size[0] > final_size[0] else Image.Resampling.BICUBIC
-                    ao_img = ao_img.resize(final_size, resample)
-            elif self.fill_missing_maps.get():
-                ao_value = self.default_ao_value.get()
-                ao_img = Image.new("L", final_size, ao_value)
-                self.log(f"INFO {base_name}: AO fehlt - verwende Wert {ao_value}")
-            else:
-                raise Exception("AO-Map fehlt")
-            
-            # Lade oder erstelle Roughness (Standard: Mittelgrau = semi-rough)
-            if roughness_file and os.path.exists(roughness_file):
-                roughness_img = Image.open(roughness_file).convert("L")
-                
-                # Prüfe ob es Gloss ist und invertieren
-                if self.invert_gloss.get() and "gloss" in os.path.basename(roughness_file).lower():
-                    from PIL import ImageOps
-                    roughness_img = ImageOps.invert(roughness_img)
-                    self.log(f"INFO {base_name}: Gloss zu Roughness invertiert")
-                
-                if roughness_img.size != final_size:
-                    resample = Image.Resampling.LANCZOS if roughness_img.size[0] > final_size[0] else Image.Resampling.BICUBIC
-                    roughness_img = roughness_img.resize(final_size, resample)
-            elif self.fill_missing_maps.get():
-                rough_value = self.default_roughness_value.get()
-                roughness_img = Image.new("L", final_size, rough_value)
-                self.log(f"INFO {base_name}: Roughness fehlt - verwende Wert {rough_value}")
-            else:
-                raise Exception("Roughness-Map fehlt")
-            
-            # Lade oder erstelle Metallic (Standard: Schwarz = nicht-metallisch)
-            if metallic_file and os.path.exists(metallic_file):
-                metallic_img = Image.open(metallic_file).convert("L")
-                if metallic_img.size != final_size:
-                    resample = Image.Resampling.LANCZOS if metallic_img.size[0] > final_size[0] else Image.Resampling.BICUBIC
-                    metallic_img = metallic_img.resize(final_size, resample)
-            elif self.fill_missing_maps.get():
-                metal_value = self.default_metallic_value.get()
-                metallic_img = Image.new("L", final_size, metal_value)
-                self.log(f"INFO {base_name}: Metallic fehlt - verwende Wert {metal_value}")
-            else:
-                raise Exception("Metallic-Map fehlt")
-            
-            orm_map = Image.merge("RGB", (ao_img, roughness_img, metallic_img))
-            
-            os.makedirs(output_dir, exist_ok=True)
-            self.save_image_with_format(orm_map, output_file)
+            # Zeige ORM Preview nach Generierung
+            if self.materials:
+                self.post(self.show_current_texture)
             
-            self.log(f"ERFOLG: {base_name}")
-            return True
+            self.post(messagebox.showinfo, "Fertig",
+                      f"Verarbeitung abgeschlossen!\nErfolgreich: {summary['processed']}\nFehler: {summary['errors']}")
             
         except Exception as e:
-            self.log(f"FEHLER {base_name}: {str(e)}")
-            return False
+            self.log(f"FEHLER: {str(e)}")
+            self.set_status("Fehler aufgetreten")
+            self.post(messagebox.showerror, "Fehler", f"Ein Fehler ist aufgetreten:\n{str(e)}")
     
     def generate_gltf(self):
         """Generiert GLTF-Dateien mit allen PBR-Texturen"""
-        if not self.texture_list:
+        if not self.materials:
             messagebox.showwarning("Warnung", "Bitte zuerst Texturen laden!")
             return
         
@@ -1656,243 +4679,179 @@ class ORMGeneratorGUI:
             messagebox.showerror("Fehler", "Bitte Eingabe-Verzeichnis auswählen!")
             return
         
-        thread = threading.Thread(target=self._generate_gltf_thread)
-        thread.daemon = True
-        thread.start()
+        self.submit_job("GLTF", self._generate_gltf_thread, [self.output_dir.get() or os.getcwd()])
     
-    def _generate_gltf_thread(self):
+    def _generate_gltf_thread(self, pipeline):
         """Thread-Funktion für GLTF-Generierung (immer ins Ausgabeverzeichnis)"""
         try:
-            import shutil
-            import json
-            self.status.set("Generiere GLTF-Dateien...")
-            self.progress.set(0)
-            output_dir = self.output_dir.get() or os.getcwd()
-            os.makedirs(output_dir, exist_ok=True)
-            generated = 0
-            errors = 0
-            for i, texture_info in enumerate(self.texture_list):
-                base_name = texture_info['base_name']
-                texture_dir = texture_info['dir']
-                progress_percent = (i / len(self.texture_list)) * 100
-                self.progress.set(progress_percent)
-                self.status.set(f"GLTF: {base_name}")
-                try:
-                    # Alle relevanten Texturen suchen und ins Ausgabeverzeichnis kopieren
-                    map_types = [
-                        ("albedo", self.get_suffixes("albedo")),
-                        ("normal", self.get_suffixes("normal")),
-                        ("ao", self.get_suffixes("ao")),
-                        ("roughness", self.get_suffixes("roughness")),
-                        ("metallic", self.get_suffixes("metallic")),
-                        ("height", self.get_suffixes("height")),
-                        ("emission", self.get_suffixes("emission")),
-                    ]
-                    texture_files = {}
-                    for map_type, suffixes in map_types:
-                        if map_type == "albedo":
-                            src = texture_info.get('albedo_file')
-                        elif map_type == "normal":
-                            src = self.find_texture_file_with_ogl(texture_dir, base_name, suffixes)
-                        else:
-                            src = self.find_texture_file(texture_dir, base_name, suffixes)
-                        if src and os.path.exists(src):
-                            dst = os.path.join(output_dir, f"{base_name}_{map_type}.{self.output_format.get().lower()}")
-                            if not os.path.abspath(src) == os.path.abspath(dst):
-                                try:
-                                    shutil.copy2(src, dst)
-                                except Exception as copy_err:
-                                    self.log(f"WARNUNG: Konnte {src} nicht kopieren: {copy_err}")
-                            texture_files[map_type] = dst
-                    # ORM Map ggf. erzeugen oder kopieren
-                    orm_file = os.path.join(output_dir, f"{base_name}_ORM.{self.output_format.get().lower()}")
-                    if not os.path.exists(orm_file):
-                        # Versuche ORM zu erzeugen
-                        self.create_single_orm_map(output_dir, output_dir, base_name)
-                    if os.path.exists(orm_file):
-                        texture_files['orm'] = orm_file
-                    # Erstelle Texture-Dictionary für GLTF
-                    gltf_textures = {}
-                    if 'albedo' in texture_files:
-                        gltf_textures['baseColor'] = f"./{os.path.basename(texture_files['albedo'])}"
-                    if 'normal' in texture_files:
-                        gltf_textures['normal'] = f"./{os.path.basename(texture_files['normal'])}"
-                    if 'emission' in texture_files:
-                        gltf_textures['emission'] = f"./{os.path.basename(texture_files['emission'])}"
-                    if 'orm' in texture_files:
-                        gltf_textures['orm'] = f"./{os.path.basename(texture_files['orm'])}"
-                    # GLTF-Datei schreiben
-                    gltf_data = self._create_gltf_structure(base_name, gltf_textures)
-                    gltf_file = os.path.join(output_dir, f"{base_name}.gltf")
-                    with open(gltf_file, 'w', encoding='utf-8') as f:
-                        json.dump(gltf_data, f, indent=2)
-                    self.log(f"GLTF: {os.path.basename(gltf_file)}")
-                    generated += 1
-                except Exception as e:
-                    self.log(f"FEHLER GLTF {base_name}: {str(e)}")
-                    errors += 1
-            self.progress.set(100)
-            self.status.set("GLTF-Generierung abgeschlossen!")
-            self.log("=" * 50)
-            self.log(f"GLTF: {generated} erstellt, {errors} Fehler")
-            messagebox.showinfo("Fertig", f"GLTF-Generierung abgeschlossen!\nErstellt: {generated}\nFehler: {errors}")
+            summary = pipeline.generate_gltf()
+            self.post(messagebox.showinfo, "Fertig",
+                      f"GLTF-Generierung abgeschlossen!\nErstellt: {summary['generated']}\nFehler: {summary['errors']}")
         except Exception as e:
             self.log(f"FEHLER: {str(e)}")
-            self.status.set("Fehler bei GLTF-Generierung")
-            messagebox.showerror("Fehler", f"GLTF-Generierung fehlgeschlagen:\n{str(e)}")
+            self.set_status("Fehler bei GLTF-Generierung")
+            self.post(messagebox.showerror, "Fehler", f"GLTF-Generierung fehlgeschlagen:\n{str(e)}")
+
+# Exit-Codes des Batch-Modus
+EXIT_OK = 0
+EXIT_ERRORS = 1        # mindestens ein Material fehlgeschlagen
+EXIT_USAGE = 2         # ungültige Argumente (argparse)
+EXIT_NO_TEXTURES = 3
+EXIT_FAILED = 4        # Abbruch durch unerwarteten Fehler
+
+# Kurzformen einzelner Einstellungen auf der Kommandozeile
+SETTING_ALIASES = {
+    "target_resolution": ["--resolution"],
+    "output_format": ["--format"],
+    "orm_workers": ["--jobs"],
+    "resume_batch": ["--resume"],
+}
+
+def create_batch_parser():
+    """Argumente des Batch-Modus; jede Einstellung aus SETTING_DEFAULTS wird zu einer Option"""
+    parser = argparse.ArgumentParser(
+        prog="orm-maps-tools-ng.py batch",
+        description="ORM-Maps ohne GUI erzeugen: Laden → fehlende Maps → ORM → Skalierung → glTF")
+    parser.add_argument("--input", required=True, help="Eingabe-Verzeichnis mit den Texturen")
+    parser.add_argument("--output", default="", help="Ausgabe-Verzeichnis (Standard: Eingabe-Verzeichnis)")
+    parser.add_argument("--missing-maps", action="store_true", help="fehlende AO/Roughness/Metallic-Maps erzeugen")
+    parser.add_argument("--no-orm", action="store_true", help="keine ORM-Maps erzeugen")
+    parser.add_argument("--scale", action="store_true",
+                        help="Texturen, ORM und glTF in --resolution in einen Unterordner skalieren "
+                             "(ersetzt den ORM-Schritt)")
+    parser.add_argument("--gltf", action="store_true", help="glTF-Dateien erzeugen")
+    parser.add_argument("--summary", metavar="DATEI",
+                        help="Zusammenfassung als JSON schreiben ('-' für stdout)")
+    parser.add_argument("--quiet", action="store_true", help="kein Log auf stderr")
     
-    def _create_gltf_structure(self, material_name, textures):
-        """Erstellt GLTF 2.0 JSON-Struktur - kompatibel mit SecondLife/OpenSim"""
-        gltf = {
-            "asset": {
-                "generator": "ORM-Maps-Tools NG - Advanced Edition",
-                "version": "2.0"
-            },
-            "scene": 0,
-            "scenes": [{"nodes": [0]}],
-            "nodes": [{"mesh": 0}],
-            "meshes": [{
-                "primitives": [{
-                    "attributes": {
-                        "POSITION": 1,
-                        "TEXCOORD_0": 2
-                    },
-                    "indices": 0,
-                    "material": 0
-                }]
-            }],
-            "materials": [{
-                "doubleSided": self.gltf_double_sided.get(),
-                "name": material_name,
-                "pbrMetallicRoughness": {
-                    "metallicFactor": self.gltf_metallic_factor.get(),
-                    "roughnessFactor": self.gltf_roughness_factor.get()
-                },
-                "alphaMode": self.gltf_alpha_mode.get()
-            }],
-            "textures": [],
-            "images": [],
-            "samplers": [{
-                "magFilter": 9729,
-                "minFilter": 9987,
-                "wrapS": 33648,
-                "wrapT": 33648
-            }],
-            "buffers": [{
-                "uri": "data:application/gltf-buffer;base64,AAABAAIAAQADAAIAAAAAAAAAAAAAAAAAAACAPwAAAAAAAAAAAAAAAAAAgD8AAAAAAACAPwAAgD8AAAAAAAAAAAAAgD8AAAAAAACAPwAAgD8AAAAAAAAAAAAAAAAAAAAAAACAPwAAAAAAAAAA",
-                "byteLength": 108
-            }],
-            "bufferViews": [
-                {
-                    "buffer": 0,
-                    "byteOffset": 0,
-                    "byteLength": 12,
-                    "target": 34963
-                },
-                {
-                    "buffer": 0,
-                    "byteOffset": 12,
-                    "byteLength": 96,
-                    "byteStride": 12,
-                    "target": 34962
-                }
-            ],
-            "accessors": [
-                {
-                    "bufferView": 0,
-                    "byteOffset": 0,
-                    "componentType": 5123,
-                    "count": 6,
-                    "type": "SCALAR",
-                    "max": [3],
-                    "min": [0]
-                },
-                {
-                    "bufferView": 1,
-                    "byteOffset": 0,
-                    "componentType": 5126,
-                    "count": 4,
-                    "type": "VEC3",
-                    "max": [1.0, 1.0, 0.0],
-                    "min": [0.0, 0.0, 0.0]
-                },
-                {
-                    "bufferView": 1,
-                    "byteOffset": 48,
-                    "componentType": 5126,
-                    "count": 4,
-                    "type": "VEC2",
-                    "max": [1.0, 1.0],
-                    "min": [0.0, 0.0]
-                }
-            ]
-        }
-        
-        # Füge Texturen in richtiger Reihenfolge hinzu (wie C# Reference)
-        image_index = 0
-        texture_index = 0
-        
-        # 1. Normal Map (Index 0)
-        if 'normal' in textures:
-            gltf['images'].append({
-                "mimeType": "image/png",
-                "name": f"{material_name}_normal",
-                "uri": textures['normal']
-            })
-            gltf['textures'].append({"source": image_index})
-            gltf['materials'][0]['normalTexture'] = {"index": texture_index}
-            image_index += 1
-            texture_index += 1
-        
-        # 2. Base Color / Albedo (Index 1)
-        if 'baseColor' in textures:
-            gltf['images'].append({
-                "mimeType": "image/png",
-                "name": f"{material_name}_baseColor",
-                "uri": textures['baseColor']
-            })
-            gltf['textures'].append({"source": image_index})
-            gltf['materials'][0]['pbrMetallicRoughness']['baseColorTexture'] = {"index": texture_index}
-            image_index += 1
-            texture_index += 1
-        
-        # 3. ORM Map (Index 2) - WICHTIG: Wird für metallicRoughness UND occlusion verwendet
-        if 'orm' in textures:
-            gltf['images'].append({
-                "mimeType": "image/png",
-                "name": f"{material_name}_orm",
-                "uri": textures['orm']
-            })
-            gltf['textures'].append({"source": image_index})
-            
-            # ORM Format: R=Occlusion, G=Roughness, B=Metallic
-            # MetallicRoughness nutzt G+B Kanäle
-            gltf['materials'][0]['pbrMetallicRoughness']['metallicRoughnessTexture'] = {"index": texture_index}
-            # Occlusion nutzt R Kanal
-            gltf['materials'][0]['occlusionTexture'] = {"index": texture_index}
-            image_index += 1
-            texture_index += 1
-        
-        # 4. Emission Map (optional)
-        if 'emission' in textures:
-            gltf['images'].append({
-                "mimeType": "image/png",
-                "name": f"{material_name}_emission",
-                "uri": textures['emission']
-            })
-            gltf['textures'].append({"source": image_index})
-            gltf['materials'][0]['emissiveTexture'] = {"index": texture_index}
-            
-            # Emission Strength
-            strength = self.gltf_emission_strength.get()
-            gltf['materials'][0]['emissiveFactor'] = [strength, strength, strength]
-        
-        return gltf
+    settings = parser.add_argument_group("Einstellungen (entsprechen den Optionen der GUI)")
+    for name, default in SETTING_DEFAULTS.items():
+        flags = ["--" + name.replace("_", "-")] + SETTING_ALIASES.get(name, [])
+        if isinstance(default, bool):
+            settings.add_argument(*flags, dest=name, action=argparse.BooleanOptionalAction, default=None,
+                                  help=f"(Standard: {'an' if default else 'aus'})")
+        else:
+            settings.add_argument(*flags, dest=name, type=type(default), choices=SETTING_CHOICES.get(name),
+                                  default=None, help=f"(Standard: {default})")
+    return parser
+
+def run_batch(argv):
+    """Batch-Modus ohne tkinter; gibt einen Exit-Code zurück"""
+    args = create_batch_parser().parse_args(argv)
+    settings = {name: getattr(args, name) for name in SETTING_DEFAULTS if getattr(args, name) is not None}
+    
+    # Ein Preset setzt die Standardwerte, explizit angegebene Werte haben Vorrang
+    preset = MATERIAL_PRESETS.get(settings.get("material_preset"))
+    if preset:
+        for key, value in preset.items():
+            settings.setdefault(f"default_{key}_value", value)
+    
+    if args.scale and settings.get("target_resolution", "original") == "original":
+        print("Fehler: --scale benötigt --resolution", file=sys.stderr)
+        return EXIT_USAGE
+    if not os.path.isdir(args.input):
+        print(f"Fehler: Eingabe-Verzeichnis nicht gefunden: {args.input}", file=sys.stderr)
+        return EXIT_USAGE
+    
+    def log(message):
+        if not args.quiet:
+            print(message, file=sys.stderr)
+    
+    output_dir = args.output or args.input
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.time()
+    pipeline = ORMPipeline(args.input, output_dir, settings, log=log)
+    summary = {"input_dir": args.input, "output_dir": output_dir, "settings": pipeline.settings, "steps": {}}
+    steps = summary["steps"]
+    try:
+        steps["load"] = pipeline.load_textures()
+        if not pipeline.materials:
+            exit_code = EXIT_NO_TEXTURES
+        else:
+            if args.missing_maps:
+                steps["missing_maps"] = pipeline.generate_missing_maps()
+            # Mit --scale entstehen die ORM-Maps in batch_scale im Zielordner - nicht doppelt bauen
+            if not args.no_orm and not args.scale:
+                steps["orm"] = pipeline.generate_orm_maps()
+            if args.scale:
+                steps["scale"] = pipeline.batch_scale(int(pipeline.settings["target_resolution"]))
+            if args.gltf:
+                steps["gltf"] = pipeline.generate_gltf()
+            failed = any(step.get("errors") for step in steps.values())
+            exit_code = EXIT_ERRORS if failed else EXIT_OK
+    except Exception as e:
+        log(f"FEHLER: {str(e)}")
+        summary["error"] = str(e)
+        exit_code = EXIT_FAILED
+    
+    summary["exit_code"] = exit_code
+    summary["duration"] = round(time.time() - started, 3)
+    if args.summary:
+        text = json.dumps(summary, indent=2, ensure_ascii=False)
+        if args.summary == "-":
+            print(text)
+        else:
+            with open(args.summary, 'w', encoding='utf-8') as f:
+                f.write(text + "\n")
+    return exit_code
+
+def run_benchmark(argv):
+    """Vergleicht die Pack-Engines an synthetischen Texturen; gibt einen Exit-Code zurück"""
+    parser = argparse.ArgumentParser(prog="orm-maps-tools-ng.py benchmark",
+                                     description="ORM-Pack-Engines (Pillow, NumPy) vergleichen")
+    parser.add_argument("--size", type=int, default=2048, help="Kantenlänge der Testtexturen (Standard: 2048)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Wiederholungen, gewertet wird der schnellste Lauf (Standard: 3)")
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Typische Quellen: AO als L, Gloss als RGB (wird invertiert), Metallic als RGBA
+        noise = Image.effect_noise((args.size, args.size), 64)
+        paths = {}
+        for name, mode in (("ao", "L"), ("gloss", "RGB"), ("metallic", "RGBA")):
+            paths[name] = os.path.join(directory, f"bench_{name}.png")
+            noise.convert(mode).save(paths[name], compress_level=1)
+        channels = [(paths["ao"], None, None), (paths["gloss"], None, INVERT_LUT), (paths["metallic"], None, None)]
+        
+        print(f"Pack-Engines, Quellen {args.size}x{args.size}, bester von {args.repeat} Läufen (ohne Encoder)")
+        for label, target in (("gleiche Größe", args.size), ("auf 1/2 verkleinert", max(1, args.size // 2))):
+            results = {}
+            for engine, pack in PACKING_ENGINES.items():
+                times = []
+                try:
+                    for _ in range(max(1, args.repeat)):
+                        started = time.perf_counter()
+                        results[engine] = pack(channels, (target, target))
+                        times.append(time.perf_counter() - started)
+                except ImportError:
+                    print(f"  {label:<20} {engine:<7} nicht verfügbar")
+                    continue
+                print(f"  {label:<20} {engine:<7} {min(times) * 1000:9.1f} ms")
+            if len(results) == len(PACKING_ENGINES):
+                identical = len({img.tobytes() for img in results.values()}) == 1
+                print(f"  {label:<20} Ergebnis {'identisch' if identical else 'ABWEICHEND'}")
+    return EXIT_OK
 
-def main():
+def import_gui_modules():
+    """Lädt tkinter und ImageTk für die GUI"""
+    global tk, filedialog, messagebox, ttk, ImageTk
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+    from PIL import ImageTk
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["batch"]:
+        return run_batch(argv[1:])
+    if argv[:1] == ["benchmark"]:
+        return run_benchmark(argv[1:])
+    
+    import_gui_modules()
     root = tk.Tk()
     ORMGeneratorGUI(root)
     root.mainloop()
+    return EXIT_OK
 
 if __name__ == "__main__":
-    main()
+    multiprocessing.freeze_support()  # Worker-Prozesse in der PyInstaller-EXE
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Tests für den Batch-Modus: Exit-Codes und JSON-Zusammenfassung"""
+
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from test_pipeline import PipelineTestCase, ormtool
+
+
+class RunBatchTest(PipelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.summary_path = os.path.join(self.tmp, "summary.json")
+
+    def write_material(self, base="wood"):
+        self.write_map(f"{base}_albedo.png", (200, 100, 50), mode="RGB")
+        self.write_map(f"{base}_ao.png", 90)
+        self.write_map(f"{base}_roughness.png", 40)
+        self.write_map(f"{base}_metallic.png", 10)
+
+    def run_batch(self, *args):
+        """Exit-Code, stdout und stderr eines Batch-Laufs"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = ormtool.run_batch(["--input", self.src, "--output", self.out, *args])
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def read_summary(self):
+        with open(self.summary_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_success_writes_summary(self):
+        self.write_material()
+        code, stdout, stderr = self.run_batch("--gltf", "--summary", self.summary_path, "--quiet")
+        self.assertEqual(code, ormtool.EXIT_OK)
+        self.assertEqual((stdout, stderr), ("", ""))
+        summary = self.read_summary()
+        self.assertEqual(summary["exit_code"], ormtool.EXIT_OK)
+        self.assertEqual(list(summary["steps"]), ["load", "orm", "gltf"])
+        self.assertEqual(summary["steps"]["orm"]["processed"], 1)
+        self.assertEqual(summary["output_dir"], self.out)
+        self.assertTrue(os.path.exists(os.path.join(self.out, "wood_ORM.png")))
+
+    def test_summary_to_stdout(self):
+        self.write_material()
+        code, stdout, stderr = self.run_batch("--summary", "-", "--format", "JPEG", "--no-fold-uniform-maps")
+        self.assertEqual(code, ormtool.EXIT_OK)
+        summary = json.loads(stdout)
+        self.assertEqual(summary["settings"]["output_format"], "JPEG")
+        self.assertFalse(summary["settings"]["fold_uniform_maps"])
+        self.assertIn("ERFOLG: wood", stderr)
+
+    def test_scale_replaces_orm_step(self):
+        self.write_material()
+        code, stdout, stderr = self.run_batch("--scale", "--resolution", "128", "--summary", self.summary_path,
+                                              "--quiet")
+        self.assertEqual(code, ormtool.EXIT_OK)
+        self.assertEqual(list(self.read_summary()["steps"]), ["load", "scale"])
+
+    def test_usage_errors(self):
+        self.write_material()
+        code, stdout, stderr = self.run_batch("--scale")
+        self.assertEqual(code, ormtool.EXIT_USAGE)
+        self.assertIn("--resolution", stderr)
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = ormtool.run_batch(["--input", os.path.join(self.tmp, "fehlt")])
+        self.assertEqual(code, ormtool.EXIT_USAGE)
+
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as raised:
+            self.run_batch("--format", "BMP")
+        self.assertEqual(raised.exception.code, ormtool.EXIT_USAGE)
+
+    def test_no_textures(self):
+        code, stdout, stderr = self.run_batch("--summary", self.summary_path, "--quiet")
+        self.assertEqual(code, ormtool.EXIT_NO_TEXTURES)
+        self.assertEqual(self.read_summary()["exit_code"], ormtool.EXIT_NO_TEXTURES)
+
+    def test_failed_material(self):
+        self.write_material()
+        self.write_material("stone")
+        with open(os.path.join(self.src, "stone_roughness.png"), "wb") as f:
+            f.write(b"kein PNG")
+        code, stdout, stderr = self.run_batch("--summary", self.summary_path, "--quiet")
+        self.assertEqual(code, ormtool.EXIT_ERRORS)
+        summary = self.read_summary()
+        self.assertEqual(summary["exit_code"], ormtool.EXIT_ERRORS)
+        self.assertEqual((summary["steps"]["orm"]["processed"], summary["steps"]["orm"]["errors"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
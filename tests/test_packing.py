@@ -0,0 +1,139 @@
+"""Tests für Packing-Layouts (ORM, ARM, MaskMap, MRAO) und Kanal-Transformationen"""
+
+import os
+import unittest
+
+from PIL import Image
+
+from test_pipeline import PipelineTestCase, ormtool
+
+
+class ResolvePackingLayoutsTest(unittest.TestCase):
+
+    def resolve(self, names, config=None):
+        self.logs = []
+        return ormtool.resolve_packing_layouts(config or {}, names, self.logs.append)
+
+    def test_builtin_layouts(self):
+        layouts = {layout["name"]: layout for layout in self.resolve("ORM, MaskMap,MRAO")}
+        self.assertEqual(list(layouts), ["ORM", "MaskMap", "MRAO"])
+        self.assertEqual(layouts["ORM"]["channels"],
+                         [("ao", None, False), ("roughness", None, False), ("metallic", None, False)])
+        # Unity: Smoothness im Alpha ist die invertierte Roughness
+        self.assertEqual(layouts["MaskMap"]["channels"],
+                         [("metallic", None, False), ("ao", None, False), (None, 0, False), ("roughness", None, True)])
+        self.assertEqual(layouts["MRAO"]["suffix"], "MRAO")
+
+    def test_invalid_layouts_fall_back_to_orm(self):
+        config = {"packing_layouts": {
+            "TooShort": {"channels": ["ao", "roughness"]},
+            "BadSource": {"channels": ["ao", "albedo", "metallic"]},
+        }}
+        layouts = self.resolve("Unknown,TooShort,BadSource", config)
+        self.assertEqual([layout["name"] for layout in layouts], ["ORM"])
+        self.assertEqual(len(self.logs), 4)
+
+    def test_custom_layout_with_fixed_values(self):
+        config = {"packing_layouts": {"Custom": {"suffix": "RMA", "channels": [
+            "roughness", {"source": "metallic", "invert": True}, {"value": 20, "invert": True}, 128]}}}
+        layout, = self.resolve("Custom", config)
+        self.assertEqual(layout["suffix"], "RMA")
+        self.assertEqual(layout["channels"],
+                         [("roughness", None, False), ("metallic", None, True), (None, 235, False), (None, 128, False)])
+        self.assertEqual(ormtool.layout_format(layout, "JPEG"), "PNG")
+
+    def test_gltf_layout_needs_orm_channel_order(self):
+        layouts = self.resolve("MaskMap,MRAO,ARM,ORM")
+        self.assertEqual(ormtool.gltf_layout(layouts)["name"], "ARM")
+        self.assertIsNone(ormtool.gltf_layout(self.resolve("MaskMap,MRAO")))
+
+
+class ChannelLutTest(unittest.TestCase):
+
+    def test_identity_is_none(self):
+        for steps in (None, [], [{"invert": False}], [{"gamma": 1}], [{"levels": [0, 255, 0, 255]}]):
+            with self.subTest(steps=steps):
+                self.assertIsNone(ormtool.compile_channel_lut(steps))
+
+    def test_single_steps(self):
+        self.assertEqual(ormtool.compile_channel_lut([{"invert": True}]), ormtool.INVERT_LUT)
+        self.assertEqual(ormtool.compile_channel_lut([{"curve": [[0, 255], [255, 0]]}]), ormtool.INVERT_LUT)
+        levels = ormtool.compile_channel_lut([{"levels": [50, 200, 0, 255]}])
+        self.assertEqual((levels[0], levels[50], levels[125], levels[200], levels[255]), (0, 0, 128, 255, 255))
+        clamp = ormtool.compile_channel_lut([{"clamp": [10, 200]}])
+        self.assertEqual((clamp[0], clamp[100], clamp[255]), (10, 100, 200))
+        gamma = ormtool.compile_channel_lut([{"gamma": 2.2}])
+        self.assertEqual((gamma[0], gamma[128], gamma[255]), (0, round(255 * (128 / 255) ** (1 / 2.2)), 255))
+
+    def test_chain_is_rounded_once(self):
+        lut = ormtool.compile_channel_lut([{"levels": [0, 255, 0, 100]}, {"levels": [0, 100, 0, 255]}])
+        self.assertIsNone(lut)  # getrennt gerundet gingen Zwischenwerte verloren
+
+    def test_invalid_steps(self):
+        for step in ({"levels": [10, 10, 0, 255]}, {"gamma": 0}, {"curve": []}, {"blur": 2},
+                     {"invert": True, "gamma": 2}):
+            with self.subTest(step=step), self.assertRaises(ValueError):
+                ormtool.compile_channel_lut([step])
+
+    def test_chain_luts(self):
+        double = tuple(min(255, 2 * i) for i in range(256))
+        self.assertIsNone(ormtool.chain_luts(ormtool.INVERT_LUT, ormtool.INVERT_LUT))
+        self.assertIsNone(ormtool.chain_luts(None, None))
+        self.assertEqual(ormtool.chain_luts(None, double), double)
+        # Reihenfolge: erst invertieren, dann verdoppeln
+        self.assertEqual(ormtool.chain_luts(ormtool.INVERT_LUT, double)[200], 110)
+
+    def test_resolve_channel_transforms(self):
+        logs = []
+        config = {"channel_transforms": {"roughness": [{"gamma": 2.2}], "metallic": [{"gamma": -1}],
+                                         "albedo": [{"invert": True}], "ao": []}}
+        self.assertEqual(ormtool.resolve_channel_transforms(config, logs.append), {"roughness": [{"gamma": 2.2}]})
+        self.assertEqual(len(logs), 2)
+
+
+class MultiLayoutPackingTest(PipelineTestCase):
+
+    def test_all_layouts_from_one_set_of_sources(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.write_map("wood_ao.png", 90)
+        self.write_map("wood_gloss.png", 200)
+        self.write_map("wood_metallic.png", 10)
+        pipeline = self.pipeline({"packing_layouts": "ORM,ARM,MaskMap,MRAO", "fold_uniform_maps": False,
+                                  "output_format": "JPEG"})
+        pipeline.load_textures()
+        self.assertEqual(pipeline.generate_orm_maps()["processed"], 1)
+
+        expected = {
+            "wood_ORM.jpeg": (90, 55, 10),
+            "wood_ARM.jpeg": (90, 55, 10),
+            # Gloss -> Roughness -> Smoothness ergibt wieder den Gloss-Wert
+            "wood_MaskMap.png": (10, 90, 0, 200),
+            "wood_MRAO.jpeg": (10, 55, 90),
+        }
+        for name, pixel in expected.items():
+            with self.subTest(name), Image.open(os.path.join(self.out, name)) as img:
+                self.assertEqual(img.size, (64, 64))
+                if name.endswith(".png"):
+                    self.assertEqual(img.mode, "RGBA")
+                    self.assertEqual(img.getpixel((32, 32)), pixel)
+                else:
+                    # JPEG: nur bis auf Kompressionsfehler
+                    for got, want in zip(img.getpixel((32, 32)), pixel):
+                        self.assertAlmostEqual(got, want, delta=2)
+
+    def test_channel_transforms_apply_after_gloss_inversion(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.write_map("wood_ao.png", 90)
+        self.write_map("wood_gloss.png", 200)
+        self.write_map("wood_metallic.png", 10)
+        self.suffix_config = dict(self.suffix_config, channel_transforms={
+            "roughness": [{"levels": [0, 110, 0, 220]}], "metallic": [{"invert": True}]})
+        pipeline = self.pipeline()
+        pipeline.load_textures()
+        self.assertEqual(pipeline.generate_orm_maps()["processed"], 1)
+        with Image.open(os.path.join(self.out, "wood_ORM.png")) as img:
+            self.assertEqual(img.convert("RGB").getpixel((0, 0)), (90, 110, 245))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+"""Tests für ORMPipeline ohne GUI (python -m unittest discover tests)"""
+
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_spec = importlib.util.spec_from_file_location("orm_maps_tools_ng", os.path.join(ROOT, "orm-maps-tools-ng.py"))
+ormtool = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ormtool)
+
+
+class PipelineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, "src")
+        self.out = os.path.join(self.tmp, "out")
+        os.makedirs(self.src)
+        self.suffix_config = ormtool.load_suffix_config(lambda msg: None)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write_map(self, name, value, size=64, mode="L"):
+        path = os.path.join(self.src, name)
+        Image.new(mode, (size, size), value).save(path)
+        return path
+
+    def pipeline(self, settings=None):
+        self.logs = []
+        return ormtool.ORMPipeline(self.src, self.out, settings=settings, suffix_config=self.suffix_config,
+                                   log=self.logs.append)
+
+
+class InPlaceEditTest(PipelineTestCase):
+
+    def test_edited_source_is_rebuilt(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.write_map("wood_ao.png", 90)
+        roughness = self.write_map("wood_roughness.png", 40)
+        self.write_map("wood_metallic.png", 10)
+
+        pipeline = self.pipeline()
+        pipeline.load_textures()
+        self.assertEqual(pipeline.generate_orm_maps()["processed"], 1)
+
+        # In-place überschreiben: Verzeichnis-mtime bleibt gleich, Datei-mtime nicht
+        old = os.stat(roughness)
+        self.write_map("wood_roughness.png", 220)
+        os.utime(roughness, ns=(old.st_atime_ns, old.st_mtime_ns + 1_000_000_000))
+
+        pipeline = self.pipeline()
+        pipeline.load_textures()
+        summary = pipeline.generate_orm_maps()
+        self.assertEqual((summary["processed"], summary["skipped"]), (1, 0))
+        with Image.open(os.path.join(self.out, "wood_ORM.png")) as img:
+            self.assertEqual(img.convert("RGB").getpixel((0, 0)), (90, 220, 10))
+
+    def test_existing_output_without_manifest_is_kept(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.write_map("wood_ao.png", 90)
+        roughness = self.write_map("wood_roughness.png", 40)
+        self.write_map("wood_metallic.png", 10)
+        os.makedirs(self.out)
+        Image.new("RGB", (64, 64), (1, 2, 3)).save(os.path.join(self.out, "wood_ORM.png"))
+
+        pipeline = self.pipeline()
+        pipeline.load_textures()
+        summary = pipeline.generate_orm_maps()
+        self.assertEqual((summary["processed"], summary["skipped"]), (0, 1))
+        with Image.open(os.path.join(self.out, "wood_ORM.png")) as img:
+            self.assertEqual(img.getpixel((0, 0)), (1, 2, 3))
+
+        # Übernommen heißt: Änderungen an den Quellen bauen danach trotzdem neu
+        old = os.stat(roughness)
+        self.write_map("wood_roughness.png", 220)
+        os.utime(roughness, ns=(old.st_atime_ns, old.st_mtime_ns + 1_000_000_000))
+        pipeline = self.pipeline()
+        pipeline.load_textures()
+        self.assertEqual(pipeline.generate_orm_maps()["processed"], 1)
+
+
+class BatchScaleTest(PipelineTestCase):
+
+    def test_gltf_skips_outputs_that_failed_to_save(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.write_map("wood_ao.png", 90)
+        self.write_map("wood_roughness.png", 40)
+        self.write_map("wood_metallic.png", 10)
+        save_image = ormtool.save_image
+
+        def failing_save(img, path, *args):
+            if path.endswith("_ORM.png"):
+                raise OSError("Datenträger voll")
+            return save_image(img, path, *args)
+
+        pipeline = self.pipeline({"fold_uniform_maps": False})
+        pipeline.load_textures()
+        ormtool.save_image = failing_save
+        try:
+            summary = pipeline.batch_scale(32)
+        finally:
+            ormtool.save_image = save_image
+        self.assertEqual(summary["errors"], 1)
+        with open(os.path.join(summary["output_dir"], "wood.gltf"), encoding="utf-8") as f:
+            uris = [image["uri"] for image in json.load(f)["images"]]
+        self.assertIn("./32/wood_albedo.png", uris)
+        self.assertFalse(any("_ORM" in uri for uri in uris))
+
+
+class ScanCatalogTest(PipelineTestCase):
+
+    def scan(self, config):
+        catalog = ormtool.ScanCatalog(self.out, config)
+        try:
+            index = ormtool.TextureIndex(ormtool.SuffixMatcher(config))
+            return index.scan(self.src, catalog=catalog)
+        finally:
+            catalog.close()
+
+    def test_catalog_survives_layout_changes(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.assertEqual(self.scan(self.suffix_config), 1)
+        changed = dict(self.suffix_config, packing_layouts={"custom": {"suffix": "X", "channels": ["ao"]}},
+                       channel_transforms={"roughness": [{"gamma": 2.2}]})
+        self.assertEqual(self.scan(changed), 0)
+
+    def test_catalog_is_dropped_when_suffixes_change(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.scan(self.suffix_config)
+        changed = dict(self.suffix_config, extensions=self.suffix_config["extensions"] + ["tga"])
+        self.assertEqual(self.scan(changed), 1)
+
+
+class UniformFoldTest(PipelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.suffix_config = dict(self.suffix_config, extensions=self.suffix_config["extensions"] + ["tif"])
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        self.write_map("wood_ao.tif", 90)  # ohne verkleinertes Dekodieren: erst beim Packen bestätigt
+        self.write_map("wood_roughness.jpg", 40)
+        self.write_map("wood_metallic.png", 0x8000, mode="I;16")
+
+    def build(self, **settings):
+        full_decodes = []
+        gray_image = ormtool.gray_image
+
+        def counting_gray_image(img):
+            if getattr(img, "filename", None) and img.size == (64, 64):
+                full_decodes.append(os.path.basename(img.filename))
+            return gray_image(img)
+
+        pipeline = self.pipeline(dict(settings, overwrite_existing=True))
+        pipeline.load_textures()
+        ormtool.gray_image = counting_gray_image
+        try:
+            self.assertEqual(pipeline.generate_orm_maps()["errors"], 0)
+        finally:
+            ormtool.gray_image = gray_image
+        with Image.open(os.path.join(self.out, "wood_ORM.png")) as img:
+            return img.convert("RGB"), full_decodes
+
+    def test_uniform_maps_fold_without_double_decode(self):
+        img, full_decodes = self.build()
+        self.assertEqual(img.size, (ormtool.UNIFORM_TEXTURE_SIZE,) * 2)
+        self.assertEqual(img.getpixel((0, 0)), (90, 40, 128))
+        self.assertEqual(sorted(full_decodes), ["wood_ao.tif", "wood_roughness.jpg"])
+
+    def test_streamed_uniform_maps_fold_afterwards(self):
+        img, full_decodes = self.build(orm_memory_budget=0.01)
+        self.assertTrue(any("in Streifen" in message for message in self.logs))
+        self.assertEqual(img.size, (ormtool.UNIFORM_TEXTURE_SIZE,) * 2)
+        self.assertEqual(img.getpixel((0, 0)), (90, 40, 128))
+
+    def test_non_uniform_candidate_is_packed(self):
+        Image.effect_noise((64, 64), 50).save(os.path.join(self.src, "wood_ao.tif"))
+        for budget in (1024, 0.01):
+            with self.subTest(budget=budget):
+                img, full_decodes = self.build(orm_memory_budget=budget)
+                self.assertEqual(img.size, (64, 64))
+                self.assertEqual(img.getpixel((0, 0))[1:], (40, 128))
+                self.assertEqual(full_decodes.count("wood_ao.tif"), 1)
+
+
+class ResolutionVariantTest(PipelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_map("brick_albedo_1k.png", (200, 100, 50), size=32, mode="RGB")
+        self.write_map("brick_albedo_2k.png", (200, 100, 50), size=64, mode="RGB")
+        self.write_map("brick_albedo_4k.png", (200, 100, 50), size=128, mode="RGB")
+
+    def selected(self, **settings):
+        pipeline = self.pipeline(settings)
+        pipeline.load_textures()
+        return os.path.basename(pipeline.materials[0].path("albedo"))
+
+    def test_original_uses_largest_variant(self):
+        self.assertEqual(self.selected(), "brick_albedo_4k.png")
+
+    def test_target_uses_smallest_sufficient_variant(self):
+        self.assertEqual(self.selected(target_resolution="64"), "brick_albedo_2k.png")
+        self.assertEqual(self.selected(target_resolution="256"), "brick_albedo_4k.png")
+
+
+class ResumeTest(PipelineTestCase):
+
+    def test_resume_removes_stale_parts(self):
+        self.write_map("wood_albedo.png", (200, 100, 50), mode="RGB")
+        os.makedirs(self.out)
+        # Rest eines per kill -9 beendeten Laufs und eine Datei dieses Prozesses
+        stale = os.path.join(self.out, ".wood_ORM.png.4194305.140.part")
+        own = os.path.join(self.out, f".other_ORM.png.{os.getpid()}.1.part")
+        for path in (stale, own):
+            with open(path, "wb") as f:
+                f.write(b"halb")
+
+        pipeline = self.pipeline({"resume_batch": True, "fill_missing_maps": True})
+        pipeline.load_textures()
+        self.assertEqual(pipeline.generate_orm_maps()["processed"], 1)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(own))
+
+
+if __name__ == "__main__":
+    unittest.main()
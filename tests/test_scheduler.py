@@ -0,0 +1,128 @@
+"""Tests für JobScheduler: Ausgabekonflikte, Vorrang interaktiver Jobs, Abbruch"""
+
+import os
+import threading
+import time
+import unittest
+
+from test_pipeline import ormtool
+
+
+class JobSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = ormtool.JobScheduler(batch_lanes=2)
+        self.releases = []
+
+    def tearDown(self):
+        for release in self.releases:
+            release.set()
+
+    def wait_for(self, predicate, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("Zeitüberschreitung beim Warten auf den Scheduler")
+            time.sleep(0.01)
+
+    def blocking(self, log=None, name=None):
+        """Job-Funktion, die bis release.set() wartet und dann einen Checkpoint passiert"""
+        release = threading.Event()
+        self.releases.append(release)
+
+        def function(control):
+            release.wait(5)
+            control.checkpoint()
+            if log is not None:
+                log.append(name)
+            return name
+
+        return function, release
+
+    def test_overlapping_outputs_wait(self):
+        first, release_first = self.blocking()
+        a = self.scheduler.submit("A", first, [os.path.join("out", "wood")])
+        b = self.scheduler.submit("B", self.blocking()[0], [os.path.join("out", "wood", "1024")])
+        c = self.scheduler.submit("C", self.blocking()[0], [os.path.join("out", "stone")])
+        self.assertEqual((a.state, b.state, c.state), ("läuft", "wartet", "läuft"))
+        self.assertIs(b.blocked_by, a)
+        self.assertIn("Ausgabe belegt von #1", b.describe())
+
+        release_first.set()
+        self.wait_for(lambda: a.state == "fertig" and b.state == "läuft")
+
+    def test_conflict_keeps_submission_order(self):
+        # D überlappt nur mit dem eingereihten B und darf nicht an ihm vorbei starten
+        a = self.scheduler.submit("A", self.blocking()[0], ["x"])
+        b = self.scheduler.submit("B", self.blocking()[0], [os.path.join("x", "y"), "z"])
+        d = self.scheduler.submit("D", self.blocking()[0], ["z"])
+        self.assertEqual((a.state, b.state, d.state), ("läuft", "wartet", "wartet"))
+        self.assertIs(d.blocked_by, b)
+
+    def test_interactive_job_runs_before_batch(self):
+        log = []
+        batch, release_batch = self.blocking(log, "batch")
+        interactive, release_interactive = self.blocking(log, "interaktiv")
+        batch_job = self.scheduler.submit("Batch", batch, ["out"])
+        interactive_job = self.scheduler.submit("Material", interactive, ["out"], lane="interactive")
+        self.assertEqual(interactive_job.state, "läuft")
+
+        release_batch.set()
+        self.wait_for(lambda: batch_job.state == "zurückgestellt")
+        release_interactive.set()
+        self.wait_for(lambda: batch_job.state == "fertig")
+        self.assertEqual(log, ["interaktiv", "batch"])
+
+    def test_interactive_jobs_are_queued_first(self):
+        scheduler = ormtool.JobScheduler(batch_lanes=1)
+        scheduler.submit("A", self.blocking()[0], ["a"])
+        batch = scheduler.submit("B", self.blocking()[0], ["b"])
+        first = scheduler.submit("M1", self.blocking()[0], ["m"], lane="interactive")
+        second = scheduler.submit("M2", self.blocking()[0], ["m"], lane="interactive")
+        self.assertEqual(first.state, "läuft")
+        self.assertEqual(scheduler.queue_order(), [second, batch])
+
+    def test_unknown_lane(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.submit("X", self.blocking()[0], lane="sofort")
+
+    def test_cancel_pending_job(self):
+        log = []
+        self.scheduler.submit("A", self.blocking()[0], ["out"])
+        function, release = self.blocking(log, "B")
+        release.set()
+        b = self.scheduler.submit("B", function, ["out"])
+        self.scheduler.cancel(b)
+        self.assertEqual(b.state, "abgebrochen")
+        self.assertNotIn(b, self.scheduler.active())
+        self.assertEqual(log, [])
+
+    def test_cancel_running_job_starts_next(self):
+        first, release_first = self.blocking()
+        a = self.scheduler.submit("A", first, ["out"])
+        b = self.scheduler.submit("B", self.blocking()[0], ["out"])
+        self.scheduler.cancel(a)
+        release_first.set()
+        self.wait_for(lambda: a.state == "abgebrochen" and b.state == "läuft")
+        self.assertIsNone(a.result)
+
+    def test_cancel_wakes_paused_job(self):
+        function, release = self.blocking()
+        job = self.scheduler.submit("A", function, ["out"])
+        job.control.pause()
+        release.set()
+        self.assertIn("pausiert", job.describe())
+        self.scheduler.cancel(job)
+        self.wait_for(lambda: job.state == "abgebrochen")
+
+
+class PathsOverlapTest(unittest.TestCase):
+
+    def test_nested_and_separate_paths(self):
+        self.assertTrue(ormtool.paths_overlap("out", os.path.join("out", "1024")))
+        self.assertTrue(ormtool.paths_overlap(os.path.join("out", "."), "out"))
+        self.assertFalse(ormtool.paths_overlap("out", "output"))
+
+
+if __name__ == "__main__":
+    unittest.main()
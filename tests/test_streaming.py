@@ -0,0 +1,185 @@
+"""Tests für das streifenweise Lesen, Schreiben und Packen großer Maps"""
+
+import os
+import struct
+import unittest
+import zlib
+
+from PIL import Image, ImageChops, ImageFilter
+
+from test_pipeline import PipelineTestCase, ormtool
+
+WIDTH, HEIGHT = 123, 77
+
+
+def noise(mode="L"):
+    img = Image.effect_noise((WIDTH, HEIGHT), 70).filter(ImageFilter.GaussianBlur(1))
+    if mode == "RGB":
+        return Image.merge("RGB", [img, img.transpose(Image.Transpose.FLIP_LEFT_RIGHT), img.rotate(180)])
+    return img.convert(mode) if mode != "L" else img
+
+
+def write_filtered_png(path, depth, color_type, rows, pixel_bytes):
+    """PNG mit allen fünf Zeilenfiltern reihum (Pillow wählt sie selbst nicht gezielt)"""
+    def paeth(a, b, c):
+        p = a + b - c
+        pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+        return a if pa <= pb and pa <= pc else b if pb <= pc else c
+
+    filtered = bytearray()
+    prev = bytes(len(rows[0]))
+    for y, row in enumerate(rows):
+        kind = y % 5
+        filtered.append(kind)
+        for i, value in enumerate(row):
+            a = row[i - pixel_bytes] if i >= pixel_bytes else 0
+            c = prev[i - pixel_bytes] if i >= pixel_bytes else 0
+            predictor = (0, a, prev[i], (a + prev[i]) // 2, paeth(a, prev[i], c))[kind]
+            filtered.append((value - predictor) % 256)
+        prev = row
+    data = zlib.compress(bytes(filtered))
+    with open(path, "wb") as f:
+        f.write(ormtool.PNG_SIGNATURE)
+        f.write(ormtool.png_chunk(b"IHDR", struct.pack(">IIBBBBB", WIDTH, HEIGHT, depth, color_type, 0, 0, 0)))
+        for start in range(0, len(data), 1000):  # mehrere IDAT-Chunks
+            f.write(ormtool.png_chunk(b"IDAT", data[start:start + 1000]))
+        f.write(ormtool.png_chunk(b"IEND", b""))
+
+
+def raw_rows(row_bytes):
+    return [bytes((x * 3 + y * 5 + (x * y) % 7) % 256 for x in range(row_bytes)) for y in range(HEIGHT)]
+
+
+class PNGStripReaderTest(PipelineTestCase):
+
+    def read_in_strips(self, path):
+        reader = ormtool.PNGStripReader(path)
+        try:
+            data = b""
+            y = 0
+            for step in (1, 5, 30, 2, 64):
+                y1 = min(HEIGHT, y + step)
+                data += reader.read(y, y1).tobytes()
+                y = y1
+            return data + reader.read(y, HEIGHT).tobytes() if y < HEIGHT else data
+        finally:
+            reader.close()
+
+    def assert_matches_full_decode(self, path):
+        with Image.open(path) as img:
+            expected = ormtool.gray_image(img).tobytes()
+        self.assertEqual(self.read_in_strips(path), expected)
+
+    def test_pillow_written_variants(self):
+        variants = {
+            "l": lambda path: noise().save(path),
+            "bilevel": lambda path: noise().convert("1").save(path),
+            "palette4": lambda path: noise("RGB").quantize(16).save(path, bits=4),
+            "palette8": lambda path: noise("RGB").quantize(200).save(path),
+            "gray16": lambda path: noise().convert("I").point(lambda v: v * 257).convert("I;16").save(path),
+            "la": lambda path: Image.merge("LA", [noise(), noise()]).save(path),
+            "rgb": lambda path: noise("RGB").save(path),
+            "rgba": lambda path: Image.merge("RGBA", [*noise("RGB").split(), noise()]).save(path),
+        }
+        for name, save in variants.items():
+            with self.subTest(name):
+                path = os.path.join(self.src, f"{name}.png")
+                save(path)
+                self.assert_matches_full_decode(path)
+
+    def test_all_filters_with_wide_pixels(self):
+        # (Bittiefe, Farbtyp, Bytes pro Zeile, Bytes pro Pixel): 16-Bit-Grau, 16-Bit-Grau+Alpha, 4-Bit-Grau
+        for depth, color_type, row_bytes, pixel_bytes in ((16, 0, WIDTH * 2, 2), (16, 4, WIDTH * 4, 4),
+                                                          (4, 0, (WIDTH * 4 + 7) // 8, 1)):
+            with self.subTest(depth=depth, color_type=color_type):
+                path = os.path.join(self.src, f"filtered_{depth}_{color_type}.png")
+                write_filtered_png(path, depth, color_type, raw_rows(row_bytes), pixel_bytes)
+                self.assert_matches_full_decode(path)
+
+    def test_16bit_gray_is_scaled_not_clipped(self):
+        path = os.path.join(self.src, "height.png")
+        Image.new("I;16", (WIDTH, HEIGHT), 0x8000).save(path)
+        self.assertEqual(set(self.read_in_strips(path)), {0x80})
+
+    def test_16bit_rgb_falls_back_to_spooled_reader(self):
+        path = os.path.join(self.src, "rgb16.png")
+        write_filtered_png(path, 16, 2, raw_rows(WIDTH * 6), 6)
+        with self.assertRaises(ValueError):
+            ormtool.PNGStripReader(path)
+        reader = ormtool.open_strip_reader(path, (WIDTH, HEIGHT))
+        try:
+            self.assertIsInstance(reader, ormtool.SpooledStripReader)
+            with Image.open(path) as img:
+                self.assertEqual(reader.read(10, 20).tobytes(), img.convert("L").crop((0, 10, WIDTH, 20)).tobytes())
+        finally:
+            reader.close()
+
+
+class SpooledStripReaderTest(PipelineTestCase):
+
+    def test_jpeg_is_reduced_to_fit_the_budget(self):
+        path = os.path.join(self.src, "scan.jpg")
+        Image.new("L", (1024, 1024), 128).save(path)
+        messages = []
+        reader = ormtool.SpooledStripReader(path, (1024, 1024), budget=300 * 1024, messages=messages)
+        reader.close()
+        self.assertLessEqual(reader.size[0] * reader.size[1], 300 * 1024)
+        self.assertTrue(any("reduziert dekodiert" in message for message in messages))
+
+    def test_unreducible_source_over_budget_warns(self):
+        path = os.path.join(self.src, "scan.tif")
+        noise().save(path)
+        messages = []
+        ormtool.SpooledStripReader(path, (WIDTH, HEIGHT), budget=1024, messages=messages).close()
+        self.assertTrue(any("nicht streifenweise" in message for message in messages))
+
+
+class PNGStripWriterTest(PipelineTestCase):
+
+    def test_round_trip(self):
+        for mode in ("RGB", "RGBA"):
+            with self.subTest(mode):
+                img = noise("RGB") if mode == "RGB" else Image.merge("RGBA", [*noise("RGB").split(), noise()])
+                path = os.path.join(self.src, f"written_{mode}.png")
+                writer = ormtool.PNGStripWriter(path, img.size, mode)
+                for y0 in range(0, HEIGHT, 20):
+                    writer.write(img.crop((0, y0, WIDTH, min(HEIGHT, y0 + 20))))
+                writer.close()
+                with Image.open(path) as written:
+                    self.assertEqual(written.mode, mode)
+                    self.assertEqual(written.tobytes(), img.tobytes())
+
+
+class StreamedPackingTest(PipelineTestCase):
+
+    def build(self, budget, output_format="PNG"):
+        pipeline = self.pipeline({"orm_memory_budget": budget, "overwrite_existing": True,
+                                  "output_format": output_format, "fold_uniform_maps": False,
+                                  "packing_layouts": "ORM,MaskMap"})
+        pipeline.load_textures()
+        self.assertEqual(pipeline.generate_orm_maps()["errors"], 0)
+        outputs = {}
+        for name in sorted(os.listdir(self.out)):
+            if name.startswith("wood_") and name.split("_")[-1].split(".")[0] in ("ORM", "MaskMap"):
+                with Image.open(os.path.join(self.out, name)) as img:
+                    outputs[name] = img.copy()
+        return outputs
+
+    def test_streamed_output_matches_full_packing(self):
+        noise("RGB").save(os.path.join(self.src, "wood_albedo.png"))
+        noise().save(os.path.join(self.src, "wood_ao.png"))
+        noise("RGB").save(os.path.join(self.src, "wood_gloss.jpg"), quality=95)
+        Image.merge("LA", [noise(), noise()]).save(os.path.join(self.src, "wood_metallic.png"))
+        full = self.build(budget=1024)
+        # Unter der Schätzung fürs Packen im Ganzen, aber genug, um das JPEG unverkleinert auszulagern
+        streamed = self.build(budget=0.1)
+        self.assertTrue(any("in Streifen" in message for message in self.logs))
+        self.assertEqual(sorted(full), sorted(streamed))
+        self.assertEqual(len(full), 2)
+        for name in full:
+            with self.subTest(name):
+                self.assertIsNone(ImageChops.difference(full[name], streamed[name]).getbbox())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Tests für SuffixMatcher: Zerlegen von Dateinamen, Rangfolge, mehrdeutige Suffixe"""
+
+import unittest
+
+from test_pipeline import ormtool
+
+CONFIG = {
+    "suffixes": {
+        "albedo": ["albedo", "color", "col"],
+        "normal": ["normal", "nor"],
+        "roughness": ["roughness", "rough", "gloss"],
+        "metallic": ["metallic", "metal"],
+    },
+    "extensions": ["png", "jpg"],
+    "separators": ["_", "-", "_2K-JPG_"],
+    "resolutions": ["1024", "2048"],
+}
+
+
+class SuffixMatcherParseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = ormtool.SuffixMatcher(CONFIG)
+
+    def parse(self, filename):
+        parsed = self.matcher.parse(filename)
+        self.assertIsNotNone(parsed, filename)
+        return parsed
+
+    def test_base_and_map_type(self):
+        parsed = self.parse("Old_Wood-Planks_Roughness.PNG")
+        self.assertEqual((parsed.base, parsed.map_type, parsed.suffix), ("Old_Wood-Planks", "roughness", "roughness"))
+        self.assertEqual(self.parse("brick-metal.jpg").map_type, "metallic")
+
+    def test_longest_suffix_wins(self):
+        # "col" ist Präfix von "color": der Regex muss das längere Suffix nehmen
+        self.assertEqual(self.parse("wood_color.png").suffix, "color")
+        self.assertEqual(self.parse("wood_normal.png").suffix, "normal")
+
+    def test_resolution(self):
+        self.assertEqual(self.parse("wood_albedo_2048.png").resolution, "2048")
+        self.assertEqual(self.parse("wood_albedo_4k.png").resolution, "4k")
+        # ambientCG: Auflösung im Trennzeichen
+        parsed = self.parse("Wood049_2K-JPG_Color.jpg")
+        self.assertEqual((parsed.base, parsed.map_type, parsed.resolution), ("Wood049", "albedo", "2k"))
+
+    def test_variants(self):
+        for filename, variant in (("wood_normal-ogl.png", "-ogl"), ("wood_normal_gl.png", "_gl"),
+                                  ("wood_normal_dx.png", "_dx"), ("wood_nor2.png", "2"),
+                                  ("wood_normal_opengl-ogl.png", "_opengl-ogl")):
+            with self.subTest(filename):
+                parsed = self.parse(filename)
+                self.assertEqual((parsed.base, parsed.variant), ("wood", variant))
+
+    def test_no_match(self):
+        for filename in ("wood.png", "wood_albedo.tga", "wood_diffuse.png", "_albedo.png", "wood_albedo.png.bak"):
+            with self.subTest(filename):
+                self.assertIsNone(self.matcher.parse(filename))
+
+    def test_rank_follows_config_order(self):
+        names = ["wood_gloss.png", "wood-roughness.png", "wood_rough.png", "wood_roughness.jpg",
+                 "wood_roughness.png", "wood_roughness_2048.png", "wood_roughness_1024.png",
+                 "wood_roughness_4k.png", "wood_roughness_8k.png"]
+        ranked = sorted(names, key=lambda name: self.parse(name).rank)
+        self.assertEqual(ranked, ["wood_roughness.png", "wood_roughness_1024.png", "wood_roughness_2048.png",
+                                  "wood_roughness_4k.png", "wood_roughness_8k.png", "wood_roughness.jpg",
+                                  "wood-roughness.png", "wood_rough.png", "wood_gloss.png"])
+
+    def test_variant_ranks_after_plain_name(self):
+        self.assertLess(self.parse("wood_nor.png").rank, self.parse("wood_normal-ogl.png").rank)
+        self.assertLess(self.parse("wood_normal_2048.png").rank, self.parse("wood_normal_gl.png").rank)
+
+
+class SuffixAmbiguityTest(unittest.TestCase):
+
+    def test_ambiguities(self):
+        config = dict(CONFIG, suffixes={
+            "albedo": ["albedo", "col", "color", "2048"],
+            "roughness": ["roughness", "spec"],
+            "metallic": ["metallic", "specular", "spec"],
+        })
+        matcher = ormtool.SuffixMatcher(config)
+        self.assertEqual(sorted(matcher.ambiguities), sorted([
+            "'2048' ist gleichzeitig eine Auflösungsangabe",
+            "'col' ist Präfix von 'color'",
+            "'spec' ist mehreren Map-Typen zugeordnet: metallic, roughness",
+            "'spec' ist Präfix von 'specular'",
+            f"'specular' (metallic): {ormtool.SUFFIX_HINTS['specular']}",
+        ]))
+        # Doppelt vergebene Suffixe gehören dem ersten Map-Typ
+        self.assertEqual(matcher.parse("wood_spec.png").map_type, "roughness")
+
+    def test_compile_logs_ambiguities(self):
+        logs = []
+        ormtool.compile_suffix_matcher(CONFIG, logs.append)
+        self.assertEqual(logs, ["⚠ 4 mehrdeutige Suffixe in der Konfiguration:",
+                                "  - 'col' ist Präfix von 'color'", "  - 'metal' ist Präfix von 'metallic'",
+                                "  - 'nor' ist Präfix von 'normal'", "  - 'rough' ist Präfix von 'roughness'"])
+        logs.clear()
+        ormtool.compile_suffix_matcher(dict(CONFIG, suffixes={"albedo": ["albedo"]}), logs.append)
+        self.assertEqual(logs, [])
+
+
+if __name__ == "__main__":
+    unittest.main()